@@ -1,6 +1,49 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR
 
-from finances.models import Currency, Fund, Transaction
+from finances.models import Currency, ExchangeRate, Fund, Transaction
+from finances.pagination import EstimatedCountPaginator
+from utils.replicas import ReplicaChangeListMixin
+
+
+class IDInputFilter(admin.SimpleListFilter):
+    """Filters by an ID typed into a text field instead of listing every related object in the sidebar."""
+    template = 'admin/finances/id_input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'params': [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, PAGE_VAR)
+            ],
+        }
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f'Invalid {self.title}')
+
+        return queryset.filter(**{self.parameter_name: value})
+
+
+class ProfileIDFilter(IDInputFilter):
+    title = 'profile ID'
+    parameter_name = 'user_profile_id'
+
+
+class FundIDFilter(IDInputFilter):
+    title = 'fund ID'
+    parameter_name = 'fund_id'
 
 
 class CurrencyAdmin(admin.ModelAdmin):
@@ -9,7 +52,15 @@ class CurrencyAdmin(admin.ModelAdmin):
     ordering = ('name',)
 
 
-class FundAdmin(admin.ModelAdmin):
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ('id', 'base_currency', 'quote_currency', 'date', 'rate')
+    list_filter = ('base_currency', 'quote_currency')
+    date_hierarchy = 'date'
+    ordering = ('-date', 'base_currency', 'quote_currency')
+    list_per_page = 50
+
+
+class FundAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'name',
@@ -24,21 +75,44 @@ class FundAdmin(admin.ModelAdmin):
     list_select_related = True
 
 
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    """
+    Changelist of the huge transactions table.
+
+    Counts are estimated, profiles and funds are filtered by typed IDs, the date filter and the ordering
+    use the `date_created` index and the comment search uses the trigram index. There is no date hierarchy,
+    it lists the years, months and days with transactions by scanning the whole table.
+    """
     list_display = (
         'id',
+        'type',
         'amount',
         'fund',
         'date_created',
         'user_profile',
         'comment',
     )
-    search_fields = ('id', 'comment',)
-    list_filter = ('date_created', 'user_profile__id', 'fund__id')
+    search_fields = ('comment',)
+    search_help_text = 'Comment text or transaction ID'
+    list_filter = ('type', 'date_created', ProfileIDFilter, FundIDFilter)
+    ordering = ('-date_created', '-id')
     list_per_page = 50
-    list_select_related = True
+    list_select_related = ('fund', 'user_profile')
+    raw_id_fields = ('fund', 'user_profile')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        # Digits are also looked up as an ID, unless they overflow the ID column
+        if search_term.isdigit() and int(search_term) < 2 ** 63:
+            results |= queryset.filter(id=int(search_term))
+
+        return results, may_have_duplicates
 
 
 admin.site.register(Currency, CurrencyAdmin)
+admin.site.register(ExchangeRate, ExchangeRateAdmin)
 admin.site.register(Fund, FundAdmin)
 admin.site.register(Transaction, TransactionAdmin)
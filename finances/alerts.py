@@ -0,0 +1,193 @@
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import groupby
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from finances.budgets import get_budgets_status
+from finances.models import BudgetAlert, FundBudget, UserBudget
+from finances.notifiers import BaseNotifier, Notification, get_notifier
+
+logger = logging.getLogger(__name__)
+
+
+def get_alert_level(spent: Decimal, amount: Decimal) -> Optional[str]:
+    """Returns the level of the alert about the budget spending, `None` while the spending is far from the amount."""
+    if amount <= 0:
+        return None
+    if spent > amount:
+        return BudgetAlert.LevelChoices.EXCEEDED
+    if spent >= amount * Decimal(str(settings.BUDGET_ALERTS_WARNING_RATIO)):
+        return BudgetAlert.LevelChoices.WARNING
+
+    return None
+
+
+def evaluate_budget_alerts(profile_ids: Iterable[int], today: date = None) -> None:
+    """
+    Creates alerts about the current periods of the profiles budgets which spending reached an alert level.
+
+    Alerts which were already created for the budget period and level are skipped.
+    """
+    today = today or timezone.localdate()
+    alerts = []
+    for profile_id in sorted(set(profile_ids)):
+        status = get_budgets_status(profile_id)
+        for key, budget_field in (('user_budgets', 'user_budget_id'), ('fund_budgets', 'fund_budget_id')):
+            for budget in status[key]:
+                level = get_alert_level(budget.spent, budget.amount)
+                if level is not None and budget.start_date <= today <= budget.end_date:
+                    alerts.append(
+                        BudgetAlert(
+                            level=level,
+                            end_date=budget.end_date,
+                            amount=budget.amount,
+                            spent=budget.spent,
+                            user_profile_id=profile_id,
+                            **{budget_field: budget.id},
+                        )
+                    )
+
+    BudgetAlert.objects.bulk_create(alerts, ignore_conflicts=True)
+
+
+def _claim_alerts(batch_size: int) -> tuple[list[BudgetAlert], datetime]:
+    """
+    Claims a batch of the pending alerts which are not claimed by another sender, or which claim timed out.
+
+    The claim is committed before the alerts are sent, so no lock or DB transaction is held over the network
+    calls. Returns the claimed alerts and the date of the claim.
+    """
+    claimed_at = timezone.now()
+    with db_transaction.atomic():
+        alerts = list(
+            BudgetAlert.objects
+            .filter(date_sent__isnull=True)
+            .filter(
+                Q(date_claimed__isnull=True)
+                | Q(date_claimed__lt=claimed_at - timedelta(seconds=settings.BUDGET_ALERTS_CLAIM_TIMEOUT))
+            )
+            .select_related('user_profile__user', 'user_budget', 'fund_budget__fund')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('user_profile_id', 'id')[:batch_size]
+        )
+        BudgetAlert.objects.filter(id__in=[alert.id for alert in alerts]).update(date_claimed=claimed_at)
+
+    return alerts, claimed_at
+
+
+def send_budget_alerts(notifier: BaseNotifier = None, batch_size: int = None) -> int:
+    """
+    Sends the pending alerts with one notification per user, in batches of at most `batch_size` alerts.
+
+    Alerts of a batch are claimed first, so concurrent senders skip them, and the alerts of every notification
+    are marked sent as soon as the notifier sends it. Claims of the alerts left unsent by a failure are
+    released, so they stay pending. Returns the amount of sent alerts.
+    """
+    notifier = notifier or get_notifier()
+    batch_size = batch_size or settings.BUDGET_ALERTS_BATCH_SIZE
+    sent = 0
+
+    def mark_sent(notification: Notification) -> None:
+        nonlocal sent
+        BudgetAlert.objects.filter(id__in=[alert.id for alert in notification.alerts]).update(
+            date_sent=timezone.now(),
+        )
+        sent += len(notification.alerts)
+
+    while True:
+        alerts, claimed_at = _claim_alerts(batch_size)
+        if not alerts:
+            return sent
+
+        notifications = [
+            Notification(profile_alerts[0].user_profile.user.telegram_id, profile_alerts)
+            for profile_alerts in (
+                list(group) for _, group in groupby(alerts, key=lambda alert: alert.user_profile_id)
+            )
+        ]
+        try:
+            notifier.send(notifications, mark_sent)
+        except Exception:
+            BudgetAlert.objects.filter(
+                id__in=[alert.id for alert in alerts],
+                date_claimed=claimed_at,
+                date_sent__isnull=True,
+            ).update(date_claimed=None)
+            raise
+
+
+class AlertDispatcher:
+    """
+    Collects profiles with new expenses and evaluates their budgets once `BUDGET_ALERTS_DELAY` seconds
+    after the first of them, in a background thread.
+
+    Writes of the same user during the delay are coalesced into one evaluation and one notification,
+    and the write requests do not wait for the evaluation. Profiles collected by a process that exits
+    before the delay are evaluated by the `send_budget_alerts` command.
+    """
+
+    def __init__(self):
+        self._profile_ids = set()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending_profile_ids(self) -> set[int]:
+        with self._lock:
+            return set(self._profile_ids)
+
+    def schedule(self, profile_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._profile_ids.update(profile_ids)
+            if self._profile_ids and self._timer is None:
+                self._timer = threading.Timer(settings.BUDGET_ALERTS_DELAY, self._run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Evaluates the budgets of the collected profiles and sends the pending alerts right away."""
+        with self._lock:
+            profile_ids, self._profile_ids = self._profile_ids, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if profile_ids:
+            evaluate_budget_alerts(profile_ids)
+            send_budget_alerts()
+
+    def _run(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Budget alerts failed')
+        finally:
+            connection.close()
+
+
+dispatcher = AlertDispatcher()
+
+
+def schedule_budget_alerts(profile_ids: Iterable[int]) -> None:
+    """Schedules budget alerts of the profiles once the current DB transaction is committed."""
+    if not settings.BUDGET_ALERTS_ENABLED:
+        return
+
+    profile_ids = set(profile_ids)
+    if profile_ids:
+        db_transaction.on_commit(lambda: dispatcher.schedule(profile_ids))
+
+
+def get_budget_profile_ids() -> set[int]:
+    """Returns IDs of the profiles that have user or fund budgets."""
+    return (
+        set(UserBudget.objects.values_list('user_profile_id', flat=True).distinct())
+        | set(FundBudget.objects.values_list('fund__user_profile_id', flat=True).distinct())
+    )
@@ -0,0 +1,169 @@
+from datetime import date
+from typing import NamedTuple, Optional
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth
+
+from finances.models import TransactionDailyTotal
+
+GRANULARITY_DAY = 'day'
+GRANULARITY_MONTH = 'month'
+
+# Period functions of the grouping in the DB and the matching NumPy date units
+GRANULARITIES = {
+    GRANULARITY_DAY: (TruncDay, 'D'),
+    GRANULARITY_MONTH: (TruncMonth, 'M'),
+}
+
+
+class SpendingSeries(NamedTuple):
+    """
+    Fields:
+        fund (int): fund ID
+        type (str): transaction type
+        amounts (list): totals of every period, zero for periods without transactions
+        moving_average (list): trailing average over the window, `None` until the window is filled
+        deltas (list): change from the previous period, `None` for the first one
+        delta_percents (list): change from the previous period in percent, `None` after an empty period
+        slope (float): change per period of the least squares linear trend
+        forecast (list): trend values of the periods following the requested ones, never negative
+    """
+    fund: int
+    type: str
+    amounts: list
+    moving_average: list
+    deltas: list
+    delta_percents: list
+    slope: float
+    forecast: list
+
+
+def get_periods(date_from: date, date_to: date, granularity: str) -> np.ndarray:
+    """Returns starts of all the periods from the period of `date_from` to the one of `date_to` inclusive."""
+    unit = GRANULARITIES[granularity][1]
+    start, end = np.datetime64(date_from, unit), np.datetime64(date_to, unit)
+
+    return np.arange(start, end + 1, dtype=f'datetime64[{unit}]')
+
+
+def get_spending_matrix(
+        profile_id: int,
+        periods: np.ndarray,
+        granularity: str,
+        fund_id: Optional[int] = None,
+) -> tuple[list[tuple[int, str]], np.ndarray]:
+    """
+    Returns `(fund ID, type)` keys of the profile series and the matrix of their totals per period.
+
+    Totals are grouped by fund, type and period in the DB from the daily totals,
+    so the amount of fetched rows does not depend on the amount of transactions.
+    """
+    trunc, unit = GRANULARITIES[granularity]
+    daily_totals = TransactionDailyTotal.objects.filter(
+        user_profile_id=profile_id,
+        day__gte=periods[0].astype('datetime64[D]').item(),
+        day__lt=(periods[-1] + 1).astype('datetime64[D]').item(),
+    )
+    if fund_id is not None:
+        daily_totals = daily_totals.filter(fund_id=fund_id)
+
+    rows = list(
+        daily_totals
+        .values('fund_id', 'type', period=trunc('day'))
+        .annotate(total=Sum('amount'))
+        .values_list('fund_id', 'type', 'period', 'total')
+        .order_by('fund_id', 'type')
+    )
+    keys = list(dict.fromkeys((fund, transaction_type) for fund, transaction_type, *_ in rows))
+    matrix = np.zeros((len(keys), len(periods)))
+    if rows:
+        key_indexes = {key: index for index, key in enumerate(keys)}
+        funds, types, row_periods, totals = zip(*rows)
+        row_indexes = [key_indexes[key] for key in zip(funds, types)]
+        period_indexes = (np.array(row_periods, dtype=f'datetime64[{unit}]') - periods[0]).astype(int)
+        np.add.at(matrix, (row_indexes, period_indexes), np.array(totals, dtype=float))
+
+    return keys, matrix
+
+
+def get_moving_averages(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Returns trailing averages over the window of every row, NaN until the window is filled."""
+    averages = np.full(matrix.shape, np.nan)
+    if window <= matrix.shape[1]:
+        sums = np.cumsum(np.pad(matrix, ((0, 0), (1, 0))), axis=1)
+        averages[:, window - 1:] = (sums[:, window:] - sums[:, :-window]) / window
+
+    return averages
+
+
+def get_deltas(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns changes of every row from the previous period, absolute and in percent, NaN where undefined."""
+    previous = np.pad(matrix[:, :-1], ((0, 0), (1, 0)), constant_values=np.nan)
+    deltas = matrix - previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percents = np.where(previous > 0, deltas / previous * 100, np.nan)
+
+    return deltas, percents
+
+
+def get_trends(matrix: np.ndarray, forecast: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fits a least squares line to every row, returns the slopes and the forecasts of the next `forecast` periods.
+
+    All the rows are fitted at once, a row of a single period has a flat trend.
+    """
+    rows, periods = matrix.shape
+    if periods < 2:
+        return np.zeros(rows), np.repeat(matrix[:, -1:], forecast, axis=1)
+
+    slopes, intercepts = np.polyfit(np.arange(periods), matrix.T, 1)
+    future = np.arange(periods, periods + forecast)
+    forecasts = intercepts[:, np.newaxis] + slopes[:, np.newaxis] * future
+
+    return slopes, np.clip(forecasts, 0, None)
+
+
+def _to_list(values: np.ndarray) -> list:
+    return [None if np.isnan(value) else round(float(value), 2) for value in values]
+
+
+def get_spending_analytics(
+        profile_id: int,
+        date_from: date,
+        date_to: date,
+        granularity: str = GRANULARITY_MONTH,
+        window: int = 3,
+        forecast: int = 3,
+        fund_id: Optional[int] = None,
+) -> dict:
+    """
+    Returns the profile totals per fund, transaction type and period with their moving averages,
+    period over period changes and linear trends.
+
+    The totals are aggregated in the DB, the statistics of all the series are computed at once over
+    the matrix of totals, so no transaction is loaded.
+    """
+    periods = get_periods(date_from, date_to, granularity)
+    keys, matrix = get_spending_matrix(profile_id, periods, granularity, fund_id)
+    averages = get_moving_averages(matrix, window)
+    deltas, percents = get_deltas(matrix)
+    slopes, forecasts = get_trends(matrix, forecast)
+
+    return {
+        'granularity': granularity,
+        'periods': [period.astype('datetime64[D]').item() for period in periods],
+        'series': [
+            SpendingSeries(
+                fund=fund,
+                type=transaction_type,
+                amounts=_to_list(matrix[index]),
+                moving_average=_to_list(averages[index]),
+                deltas=_to_list(deltas[index]),
+                delta_percents=_to_list(percents[index]),
+                slope=round(float(slopes[index]), 2),
+                forecast=_to_list(forecasts[index]),
+            )
+            for index, (fund, transaction_type) in enumerate(keys)
+        ],
+    }
@@ -0,0 +1,69 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+from finances.budgets import get_budgets_status
+from finances.cache import aget_profile_cached
+from finances.models import Fund
+from finances.serializers import BudgetsStatusSerializer
+from users.models import Profile
+from utils.async_views import async_registered_user_view
+
+User = get_user_model()
+
+
+async def aget_profile_id(user: User) -> int:
+    """Returns ID of the user profile, reusing the profile loaded together with a cached user."""
+    if User.profile.is_cached(user) and getattr(user, 'profile', None) is not None:
+        return user.profile.id
+
+    profile_id = await Profile.objects.filter(user=user).values_list('id', flat=True).afirst()
+    if profile_id is None:
+        raise Http404
+
+    return profile_id
+
+
+@async_registered_user_view
+async def fund_balances_async_view(request):
+    """Returns the non-distributed balance of the requesting user and the balances of the user funds."""
+    profile = await Profile.objects.filter(user=request.user).values('id', 'balance', 'currency__iso_code').afirst()
+    if profile is None:
+        raise Http404
+
+    funds = Fund.objects.filter(user_profile_id=profile['id']).order_by('id').values(
+        'id',
+        'name',
+        'balance',
+        'currency__iso_code',
+    )
+
+    return {
+        'balance': profile['balance'],
+        'currency': profile['currency__iso_code'],
+        'funds': [
+            {
+                'id': fund['id'],
+                'name': fund['name'],
+                'balance': fund['balance'],
+                'currency': fund['currency__iso_code'] or profile['currency__iso_code'],
+            }
+            async for fund in funds
+        ],
+    }
+
+
+@async_registered_user_view
+async def budgets_status_async_view(request):
+    """
+    Returns the budgets status cached by `BudgetsStatusAPIView`.
+
+    The cache is read without leaving the event loop, only a miss is computed in a worker thread.
+    """
+    profile_id = await aget_profile_id(request.user)
+
+    return await aget_profile_cached(
+        profile_id,
+        'budgets-status',
+        sync_to_async(lambda: BudgetsStatusSerializer(get_budgets_status(profile_id)).data),
+    )
@@ -0,0 +1,225 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import NamedTuple, Optional, Union
+
+from django.db import transaction as db_transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from finances.cache import invalidate_all_profile_caches
+from finances.currencies import convert_totals
+from finances.models import BudgetPeriodChoices, FundBudget, Transaction, TransactionDailyTotal, UserBudget
+from users.models import Profile
+
+
+def _shift_months(value: date, months: int, day: Optional[int] = None) -> date:
+    """
+    Returns the `day` (the day of `value` by default) of the month `months` months later (or earlier),
+    clamped to the length of the target month.
+    """
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    day = min(day or value.day, calendar.monthrange(year, month + 1)[1])
+
+    return date(year, month + 1, day)
+
+
+def get_period_start(period: str, end_date: date, anchor_day: Optional[int] = None) -> date:
+    """
+    Returns the first day of the budget period that ends on `end_date` (inclusive).
+
+    Monthly and annual periods start the day after the previous period end, which falls on `anchor_day`
+    (the day of `end_date` by default) clamped to its month, so consecutive periods never overlap.
+    """
+    if period == BudgetPeriodChoices.DAILY:
+        return end_date
+    if period == BudgetPeriodChoices.WEEKLY:
+        return end_date - timedelta(days=6)
+    if period == BudgetPeriodChoices.MONTHLY:
+        return _shift_months(end_date, -1, anchor_day) + timedelta(days=1)
+    if period == BudgetPeriodChoices.ANNUALLY:
+        return _shift_months(end_date, -12, anchor_day) + timedelta(days=1)
+
+    raise ValueError(f'Unknown budget period "{period}"')
+
+
+def get_next_end_date(period: str, end_date: date, today: date, anchor_day: Optional[int] = None) -> date:
+    """
+    Returns the end date of the first period following `end_date` that includes `today`.
+
+    Monthly and annual periods end on `anchor_day` (the day of `end_date` by default) clamped to the month,
+    so a period clamped to a short month does not move the later ones off the month end.
+    """
+    if period == BudgetPeriodChoices.DAILY:
+        return today
+    if period == BudgetPeriodChoices.WEEKLY:
+        return end_date + timedelta(days=-(-(today - end_date).days // 7) * 7)
+
+    step = 1 if period == BudgetPeriodChoices.MONTHLY else 12
+    months = step
+    while _shift_months(end_date, months, anchor_day) < today:
+        months += step
+
+    return _shift_months(end_date, months, anchor_day)
+
+
+def get_spending(
+        profile_id: int,
+        start_date: date,
+        end_date: date,
+        fund_id: Optional[int] = None,
+        transaction_type: str = Transaction.TransactionTypeChoices.EXPENSE,
+) -> Decimal:
+    """Returns the total of the profile (or fund) transactions of the type made from `start_date` to `end_date`."""
+    daily_totals = TransactionDailyTotal.objects.filter(
+        user_profile_id=profile_id,
+        type=transaction_type,
+        day__range=(start_date, end_date),
+    )
+    if fund_id is not None:
+        daily_totals = daily_totals.filter(fund_id=fund_id)
+
+    return daily_totals.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+
+def _get_profile_currency(profile_id: int) -> Optional[str]:
+    return Profile.objects.filter(id=profile_id).values_list('currency__iso_code', flat=True).first()
+
+
+def _sum_in_profile_currency(
+        totals: list[tuple[Optional[str], date, Decimal]],
+        profile_currency: Optional[str],
+) -> Decimal:
+    """
+    Sums `(ISO code, day, amount)` spending totals of the profile funds in the profile currency.
+
+    Funds without a currency are in the profile currency, the others are converted at the rates of the days.
+    Without a profile currency there is nothing to convert into, so the amounts are summed as they are.
+    """
+    if profile_currency is None:
+        return sum((amount for _, _, amount in totals), Decimal('0.00'))
+
+    return convert_totals(
+        ((iso_code or profile_currency, day, amount) for iso_code, day, amount in totals),
+        profile_currency,
+    )
+
+
+def get_budget_spending(budget: Union[FundBudget, UserBudget]) -> Decimal:
+    """Returns the amount spent during the current period of the budget, in the profile currency for user budgets."""
+    start_date = get_period_start(budget.period, budget.end_date, budget.anchor_day)
+    if isinstance(budget, FundBudget):
+        return get_spending(budget.fund.user_profile_id, start_date, budget.end_date, fund_id=budget.fund_id)
+
+    totals = list(
+        TransactionDailyTotal.objects
+        .filter(
+            user_profile_id=budget.user_profile_id,
+            type=Transaction.TransactionTypeChoices.EXPENSE,
+            day__range=(start_date, budget.end_date),
+        )
+        .values('fund__currency__iso_code', 'day')
+        .annotate(total=Sum('amount'))
+        .values_list('fund__currency__iso_code', 'day', 'total')
+        .order_by()
+    )
+    profile_currency = _get_profile_currency(budget.user_profile_id) if any(row[0] for row in totals) else None
+
+    return _sum_in_profile_currency(totals, profile_currency)
+
+
+class BudgetStatus(NamedTuple):
+    id: int
+    fund: Optional[int]
+    period: str
+    amount: Decimal
+    start_date: date
+    end_date: date
+    spent: Decimal
+    remaining: Decimal
+
+
+def get_budgets_status(profile_id: int) -> dict[str, list[BudgetStatus]]:
+    """
+    Returns spent and remaining amounts of every user and fund budget of the profile.
+
+    Daily totals of all the budget periods are fetched with a single query. User budgets are in the profile
+    currency, the spending of funds in other currencies is converted at the rates of the spending days.
+    """
+    user_budgets = list(UserBudget.objects.filter(user_profile_id=profile_id).order_by('id'))
+    fund_budgets = list(FundBudget.objects.filter(fund__user_profile_id=profile_id).order_by('fund_id', 'id'))
+    budgets = user_budgets + fund_budgets
+    if not budgets:
+        return {'user_budgets': [], 'fund_budgets': []}
+
+    start_dates = {budget: get_period_start(budget.period, budget.end_date, budget.anchor_day) for budget in budgets}
+    daily_totals = TransactionDailyTotal.objects.filter(
+        user_profile_id=profile_id,
+        type=Transaction.TransactionTypeChoices.EXPENSE,
+        day__range=(min(start_dates.values()), max(budget.end_date for budget in budgets)),
+    ).values_list('fund_id', 'fund__currency__iso_code', 'day', 'amount')
+
+    spending = defaultdict(Decimal)
+    fund_currencies = {}
+    for fund_id, iso_code, day, amount in daily_totals:
+        spending[(fund_id, day)] += amount
+        fund_currencies[fund_id] = iso_code
+
+    # The profile currency is only needed when user budgets sum funds in their own currencies
+    profile_currency = None
+    if user_budgets and any(fund_currencies.values()):
+        profile_currency = _get_profile_currency(profile_id)
+
+    def get_status(budget: Union[FundBudget, UserBudget], fund_id: Optional[int]) -> BudgetStatus:
+        start_date = start_dates[budget]
+        totals = [
+            (fund_currencies[spending_fund_id], day, amount)
+            for (spending_fund_id, day), amount in spending.items()
+            if start_date <= day <= budget.end_date and fund_id in (None, spending_fund_id)
+        ]
+        # Fund budgets are in the currency of their fund
+        spent = _sum_in_profile_currency(totals, profile_currency if fund_id is None else None)
+
+        return BudgetStatus(
+            id=budget.id,
+            fund=fund_id,
+            period=budget.period,
+            amount=budget.amount,
+            start_date=start_date,
+            end_date=budget.end_date,
+            spent=spent,
+            remaining=budget.amount - spent,
+        )
+
+    return {
+        'user_budgets': [get_status(budget, None) for budget in user_budgets],
+        'fund_budgets': [get_status(budget, budget.fund_id) for budget in fund_budgets],
+    }
+
+
+def renew_expired_budgets(today: Optional[date] = None) -> int:
+    """
+    Rolls expired auto-renewed budgets forward to the period that includes `today`.
+
+    Expired budgets are grouped by period, end date and anchor day, and every group is renewed with a single UPDATE,
+    so the amount of statements depends on the amount of distinct end dates instead of budgets.
+    Renewed budgets are not expired anymore, so running the renewal again is a no-op.
+
+    Returns amount of renewed budgets.
+    """
+    today = today or timezone.localdate()
+    renewed = 0
+    for model in (UserBudget, FundBudget):
+        expired = model.objects.filter(auto_renew=True, end_date__lt=today)
+        groups = expired.order_by().values_list('period', 'end_date', 'anchor_day').distinct()
+        for period, end_date, anchor_day in groups:
+            # Each group is committed separately, a crash loses at most the current group
+            with db_transaction.atomic():
+                renewed += expired.filter(period=period, end_date=end_date, anchor_day=anchor_day).update(
+                    end_date=get_next_end_date(period, end_date, today, anchor_day),
+                )
+                invalidate_all_profile_caches()
+
+    return renewed
@@ -0,0 +1,102 @@
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+PROFILE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Bumped by set-based operations that change the data of too many profiles to invalidate them one by one
+GLOBAL_VERSION_KEY = 'finances:profiles:version'
+
+
+def _get_version_key(profile_id: int) -> str:
+    return f'finances:profile:{profile_id}:version'
+
+
+def _get_value_key(profile_id: int, version: str, name: str) -> str:
+    return f'finances:profile:{profile_id}:{version}:{name}'
+
+
+def get_profile_cache_version(profile_id: int) -> Optional[str]:
+    """
+    Returns the current version of the profile cache, combined from the global and the profile versions.
+
+    Versions are random tokens rather than counters, so a version evicted from the cache
+    can never make entries of an earlier version reachable again.
+    """
+    keys = (GLOBAL_VERSION_KEY, _get_version_key(profile_id))
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+            if versions[key] is None:
+                return None
+
+    return ':'.join(versions[key] for key in keys)
+
+
+async def aget_profile_cache_version(profile_id: int) -> Optional[str]:
+    """Async version of `get_profile_cache_version`."""
+    keys = (GLOBAL_VERSION_KEY, _get_version_key(profile_id))
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, uuid4().hex, timeout=None)
+            versions[key] = await cache.aget(key)
+            if versions[key] is None:
+                return None
+
+    return ':'.join(versions[key] for key in keys)
+
+
+def get_profile_cached(profile_id: int, name: str, compute: Callable[[], Any], timeout=PROFILE_CACHE_TIMEOUT) -> Any:
+    """Returns the value cached for the profile under `name`, computing and caching it on a miss."""
+    version = get_profile_cache_version(profile_id)
+    if version is None:
+        return compute()
+
+    key = _get_value_key(profile_id, version, name)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+
+    return value
+
+
+async def aget_profile_cached(
+    profile_id: int,
+    name: str,
+    compute: Callable[[], Awaitable[Any]],
+    timeout=PROFILE_CACHE_TIMEOUT,
+) -> Any:
+    """Async version of `get_profile_cached`, awaiting `compute` on a miss."""
+    version = await aget_profile_cache_version(profile_id)
+    if version is None:
+        return await compute()
+
+    key = _get_value_key(profile_id, version, name)
+    value = await cache.aget(key)
+    if value is None:
+        value = await compute()
+        await cache.aset(key, value, timeout=timeout)
+
+    return value
+
+
+def invalidate_profile_cache(profile_ids: Iterable[int]) -> None:
+    """
+    Drops everything cached for the profiles once the current DB transaction is committed.
+
+    Invalidating before the commit would let a concurrent reader cache data the transaction is about to change.
+    """
+    versions = {_get_version_key(profile_id): uuid4().hex for profile_id in set(profile_ids)}
+    if versions:
+        db_transaction.on_commit(lambda: cache.set_many(versions, timeout=None))
+
+
+def invalidate_all_profile_caches() -> None:
+    """Drops everything cached for all the profiles once the current DB transaction is committed."""
+    db_transaction.on_commit(lambda: cache.set(GLOBAL_VERSION_KEY, uuid4().hex, timeout=None))
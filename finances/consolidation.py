@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from finances.currencies import CurrencyConversionError, convert_totals
+from finances.models import Fund, TransactionDailyTotal
+from finances.services import FUND_BALANCE_SIGNS, get_balance_change_sum
+from users.models import Profile
+
+
+def _get_profile_currency(profile: Profile, currency: Optional[str]) -> tuple[str, str]:
+    """Returns the profile currency and the target currency, which defaults to the profile one."""
+    profile_currency = profile.currency.iso_code if profile.currency_id else None
+    currency = currency or profile_currency
+    if currency is None:
+        raise CurrencyConversionError('Neither the target nor the profile currency is set')
+
+    return profile_currency or currency, currency
+
+
+def get_consolidated_balance(profile: Profile, currency: str = None, day: date = None) -> Decimal:
+    """
+    Returns the non-distributed profile balance plus the balances of all the profile funds in one currency.
+
+    Fund balances are summed per currency in the DB, funds without a currency are in the profile currency.
+    The profile balance is read by the same query rather than from the passed profile, which can be cached.
+    The target currency defaults to the profile currency, rates are taken on the day, today by default.
+    """
+    profile_currency, currency = _get_profile_currency(profile, currency)
+    day = day or timezone.localdate()
+
+    fund_totals = (
+        Fund.objects
+        .filter(user_profile_id=profile.id)
+        .values('currency__iso_code')
+        .annotate(total=Sum('balance'))
+        .values_list('currency__iso_code', 'total')
+        .order_by()
+    )
+    profile_balance = Profile.objects.filter(id=profile.id).values_list('currency__iso_code', 'balance').order_by()
+    totals = [
+        (iso_code or profile_currency, day, total)
+        for iso_code, total in fund_totals.union(profile_balance, all=True)
+    ]
+
+    return convert_totals(totals, currency)
+
+
+def get_consolidated_change(profile: Profile, date_from: date, date_to: date, currency: str = None) -> Decimal:
+    """
+    Returns the change of the profile funds balances over `[date_from, date_to]` in one currency.
+
+    Daily totals are summed per day and currency in the DB and converted at the rates of their days.
+    """
+    profile_currency, currency = _get_profile_currency(profile, currency)
+
+    daily_changes = (
+        TransactionDailyTotal.objects
+        .filter(user_profile=profile, day__gte=date_from, day__lte=date_to)
+        .values('fund__currency__iso_code', 'day')
+        .annotate(change=get_balance_change_sum(FUND_BALANCE_SIGNS))
+        .values_list('fund__currency__iso_code', 'day', 'change')
+        .order_by()
+    )
+
+    return convert_totals(
+        ((iso_code or profile_currency, day, change) for iso_code, day, change in daily_changes),
+        currency,
+    )
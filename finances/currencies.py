@@ -0,0 +1,133 @@
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, localcontext
+from typing import Iterable, Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+from finances.models import ExchangeRate
+
+# Changed whenever exchange rates are written, so every process reloads its rate index
+EXCHANGE_RATES_VERSION_KEY = 'finances:exchange-rates:version'
+
+CONVERSION_PRECISION = 28
+
+
+class CurrencyConversionError(Exception):
+    """Raised when there is no exchange rate to convert between two currencies."""
+
+
+class RateIndex:
+    """
+    Exchange rates of every currency pair sorted by date.
+
+    A pair is looked up with the rate of the nearest date on or before the requested one,
+    falling back to the earliest later rate, and with the inverted rate of the reverse pair.
+    """
+
+    def __init__(self, rates: Iterable[tuple[str, str, date, Decimal]]):
+        self._pairs = defaultdict(lambda: ([], []))
+        for base_currency, quote_currency, day, rate in sorted(rates):
+            dates, values = self._pairs[(base_currency, quote_currency)]
+            dates.append(day)
+            values.append(rate)
+        self._pairs = dict(self._pairs)
+
+    def _get_pair_rate(self, base_currency: str, quote_currency: str, day: date) -> Optional[Decimal]:
+        pair = self._pairs.get((base_currency, quote_currency))
+        if pair is None:
+            return None
+
+        dates, values = pair
+        position = bisect_right(dates, day)
+        return values[position - 1] if position else values[0]
+
+    def get_rate(self, base_currency: str, quote_currency: str, day: date) -> Decimal:
+        """Returns the amount of the quote currency for one unit of the base currency on the day."""
+        if base_currency == quote_currency:
+            return Decimal(1)
+
+        rate = self._get_pair_rate(base_currency, quote_currency, day)
+        if rate is not None:
+            return rate
+
+        rate = self._get_pair_rate(quote_currency, base_currency, day)
+        if rate is not None:
+            with localcontext() as context:
+                context.prec = CONVERSION_PRECISION
+                return 1 / rate
+
+        raise CurrencyConversionError(f'No exchange rate from {base_currency} to {quote_currency}')
+
+
+_local_rate_index = {'version': None, 'index': None}
+_local_rate_index_lock = threading.Lock()
+
+
+def _get_rates_version() -> Optional[str]:
+    version = cache.get(EXCHANGE_RATES_VERSION_KEY)
+    if version is None:
+        cache.add(EXCHANGE_RATES_VERSION_KEY, uuid4().hex, timeout=None)
+        version = cache.get(EXCHANGE_RATES_VERSION_KEY)
+
+    return version
+
+
+def get_rate_index() -> RateIndex:
+    """
+    Returns the in-process index of all the exchange rates.
+
+    The index is loaded with one query and kept until the shared rates version changes,
+    so every conversion costs a single cache read. Without a shared version the index is reloaded.
+    """
+    version = _get_rates_version()
+    with _local_rate_index_lock:
+        if version is None or _local_rate_index['version'] != version:
+            rates = ExchangeRate.objects.values_list('base_currency_id', 'quote_currency_id', 'date', 'rate')
+            _local_rate_index['index'] = RateIndex(rates)
+            _local_rate_index['version'] = version
+
+        return _local_rate_index['index']
+
+
+def invalidate_rate_index() -> None:
+    """Makes every process reload the exchange rates once the current DB transaction is committed."""
+    db_transaction.on_commit(lambda: cache.set(EXCHANGE_RATES_VERSION_KEY, uuid4().hex, timeout=None))
+
+
+def save_exchange_rates(rates: Iterable[ExchangeRate]) -> None:
+    """Inserts the rates with one statement per batch, replacing the existing rates of the same pairs and dates."""
+    ExchangeRate.objects.bulk_create(
+        rates,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=('base_currency', 'quote_currency', 'date'),
+        update_fields=('rate',),
+    )
+    invalidate_rate_index()
+
+
+def convert_totals(totals: Iterable[tuple[str, date, Decimal]], currency: str, index: RateIndex = None) -> Decimal:
+    """
+    Converts `(ISO code, day, amount)` totals into the currency and returns their sum rounded to cents.
+
+    Amounts are summed per currency and day before the conversion, so a rate is looked up and applied
+    once per group rather than once per row, and the result is rounded only once.
+    """
+    groups = defaultdict(Decimal)
+    for iso_code, day, amount in totals:
+        groups[(iso_code, day)] += amount
+
+    index = index or get_rate_index()
+    with localcontext() as context:
+        context.prec = CONVERSION_PRECISION
+        total = sum(
+            (amount * index.get_rate(iso_code, currency, day) for (iso_code, day), amount in groups.items()),
+            Decimal(0),
+        )
+
+    return total.quantize(Decimal('0.01'))
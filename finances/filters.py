@@ -0,0 +1,14 @@
+from django_filters import rest_framework as filters
+
+from finances.models import Transaction
+
+
+class TransactionFilterSet(filters.FilterSet):
+    fund = filters.NumberFilter(field_name='fund_id')
+    type = filters.ChoiceFilter(choices=Transaction.TransactionTypeChoices.choices)
+    date_from = filters.IsoDateTimeFilter(field_name='date_created', lookup_expr='gte')
+    date_to = filters.IsoDateTimeFilter(field_name='date_created', lookup_expr='lt')
+
+    class Meta:
+        model = Transaction
+        fields = ('fund', 'type', 'date_from', 'date_to')
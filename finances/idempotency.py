@@ -0,0 +1,99 @@
+import hashlib
+import json
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction as db_transaction
+from django.utils import timezone
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
+
+from finances.models import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_REPLAYED_HEADER = 'Idempotent-Replayed'
+IDEMPOTENCY_KEY_MAX_LENGTH = IdempotencyKey._meta.get_field('key').max_length
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'Idempotency key was already used for another request.'
+    default_code = 'idempotency_key_reused'
+
+
+def get_request_fingerprint(request) -> str:
+    payload = json.dumps([request.method, request.path, request.data], sort_keys=True, cls=DjangoJSONEncoder)
+
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_expiration_date():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def get_idempotency_key(user_id: int, key: str) -> Optional[IdempotencyKey]:
+    """
+    Returns the record of the user key, looked up with the unique index.
+
+    A key that expired but was not deleted yet is deleted, so it can be used again.
+    """
+    record = IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+    if record is not None and record.date_created < get_expiration_date():
+        record.delete()
+        return None
+
+    return record
+
+
+def delete_expired_idempotency_keys() -> int:
+    """Deletes the keys older than `IDEMPOTENCY_KEY_TTL` hours and returns the amount of deleted keys."""
+    deleted, _ = IdempotencyKey.objects.filter(date_created__lt=get_expiration_date()).delete()
+
+    return deleted
+
+
+class IdempotentCreateMixin:
+    """
+    Makes the `create` of a view idempotent for requests with the `Idempotency-Key` header.
+
+    The write and the key with its successful response are committed in one transaction. A request repeating
+    a key gets the stored response with the `Idempotent-Replayed` header and does not write again. Of concurrent
+    requests with one key, the one committing last waits for the first on the unique index, rolls back its write
+    and gets the response of the first. Failed requests do not store the key and can be retried with it.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValidationError(
+                {IDEMPOTENCY_KEY_HEADER: [f'Should have 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters.']}
+            )
+
+        fingerprint = get_request_fingerprint(request)
+        record = get_idempotency_key(request.user.id, key)
+        if record is None:
+            try:
+                with db_transaction.atomic():
+                    response = super().create(request, *args, **kwargs)
+                    IdempotencyKey.objects.create(
+                        key=key,
+                        fingerprint=fingerprint,
+                        status_code=response.status_code,
+                        response=response.data,
+                        user_id=request.user.id,
+                    )
+                return response
+            except IntegrityError:
+                record = get_idempotency_key(request.user.id, key)
+                if record is None:
+                    raise
+
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyReused
+
+        return Response(record.response, status=record.status_code, headers={IDEMPOTENCY_REPLAYED_HEADER: 'true'})
@@ -0,0 +1,283 @@
+import csv
+import hashlib
+import io
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import BinaryIO, Callable, Iterator, NamedTuple, Optional
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from finances.models import Fund, Transaction, TransactionImport
+from finances.services import bulk_create_transactions
+from users.models import Profile
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_DEFAULT_FUND_NAME = 'Imported'
+CHECKSUM_READ_SIZE = 64 * 1024
+
+OFX_TAG_PATTERN = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+OFX_DATE_PATTERN = re.compile(r'^(\d{8})(\d{6})?')
+
+
+class ImportFormatError(ValueError):
+    """Raised when a row of the imported file cannot be mapped to a transaction."""
+
+    def __init__(self, row_number: Optional[int], message: str):
+        self.row_number = row_number
+        super().__init__(message if row_number is None else f'row {row_number}: {message}')
+
+
+class ImportedRow(NamedTuple):
+    date_created: datetime
+    type: str
+    amount: Decimal
+    fund_name: Optional[str]
+    comment: str
+
+
+def get_file_checksum(file: BinaryIO) -> str:
+    """Returns SHA-256 checksum of the binary file, reading it in fixed size blocks."""
+    checksum = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(CHECKSUM_READ_SIZE), b''):
+        checksum.update(block)
+    file.seek(0)
+
+    return checksum.hexdigest()
+
+
+def get_file_format(file_name: str) -> str:
+    """Returns import file format guessed by the file extension."""
+    if file_name.lower().endswith(('.ofx', '.qfx')):
+        return TransactionImport.FileFormatChoices.OFX
+
+    return TransactionImport.FileFormatChoices.CSV
+
+
+def _parse_amount(row_number: int, value: str) -> Decimal:
+    try:
+        return Decimal(value.strip()).quantize(Decimal('0.01'))
+    except (InvalidOperation, AttributeError):
+        raise ImportFormatError(row_number, f'invalid amount "{value}"')
+
+
+def _get_type(row_number: int, value: Optional[str], amount: Decimal) -> str:
+    if not value:
+        if amount < 0:
+            return Transaction.TransactionTypeChoices.EXPENSE
+        return Transaction.TransactionTypeChoices.INCOME
+
+    value = value.strip().upper()
+    for choice in Transaction.TransactionTypeChoices:
+        if value in (choice.value, choice.label.upper()):
+            return choice
+
+    raise ImportFormatError(row_number, f'invalid transaction type "{value}"')
+
+
+def _make_aware(value: datetime) -> datetime:
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def parse_csv(file: io.TextIOBase) -> Iterator[ImportedRow]:
+    """
+    Yields transactions from a CSV file with a header row.
+
+    Required columns are `date` (ISO 8601) and `amount`. Optional columns are `type` (`IN`, `EX`, `TR`
+    or their labels), `fund` (fund name) and `comment`. Without the `type` column a negative amount
+    is treated as an expense and a positive one as an income.
+    """
+    reader = csv.DictReader(file)
+    missing_columns = {'date', 'amount'} - set(reader.fieldnames or ())
+    if missing_columns:
+        raise ImportFormatError(None, f'missing columns: {", ".join(sorted(missing_columns))}')
+
+    for row_number, row in enumerate(reader, start=1):
+        raw_date = (row['date'] or '').strip()
+        date_created = parse_datetime(raw_date)
+        if date_created is None:
+            date = parse_date(raw_date)
+            if date is None:
+                raise ImportFormatError(row_number, f'invalid date "{raw_date}"')
+            date_created = datetime(date.year, date.month, date.day)
+
+        amount = _parse_amount(row_number, row['amount'])
+        yield ImportedRow(
+            date_created=_make_aware(date_created),
+            type=_get_type(row_number, row.get('type'), amount),
+            amount=abs(amount),
+            fund_name=(row.get('fund') or '').strip() or None,
+            comment=(row.get('comment') or '').strip(),
+        )
+
+
+def parse_ofx(file: io.TextIOBase) -> Iterator[ImportedRow]:
+    """
+    Yields transactions from the `<STMTTRN>` blocks of an OFX file.
+
+    The file is tokenized line by line, so both SGML (OFX 1.x) and XML (OFX 2.x) files are supported.
+    Funds are not represented in OFX, all the transactions are mapped to the default fund.
+    """
+    row_number = 0
+    block = None
+    for line in file:
+        for closing, tag, value in OFX_TAG_PATTERN.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if not closing:
+                    block = {}
+                    continue
+
+                row_number += 1
+                yield _map_ofx_block(row_number, block or {})
+                block = None
+            elif block is not None and not closing:
+                block[tag] = value.strip()
+
+
+def _map_ofx_block(row_number: int, block: dict) -> ImportedRow:
+    match = OFX_DATE_PATTERN.match(block.get('DTPOSTED', ''))
+    if match is None:
+        raise ImportFormatError(row_number, f'invalid date "{block.get("DTPOSTED", "")}"')
+    date_created = datetime.strptime(match.group(1) + (match.group(2) or '000000'), '%Y%m%d%H%M%S')
+
+    amount = _parse_amount(row_number, block.get('TRNAMT', ''))
+    comment = ' '.join(value for value in (block.get('NAME'), block.get('MEMO')) if value)
+
+    return ImportedRow(
+        date_created=_make_aware(date_created),
+        type=_get_type(row_number, None, amount),
+        amount=abs(amount),
+        fund_name=None,
+        comment=comment,
+    )
+
+
+PARSERS = {
+    TransactionImport.FileFormatChoices.CSV: parse_csv,
+    TransactionImport.FileFormatChoices.OFX: parse_ofx,
+}
+
+
+class FundResolver:
+    """Maps fund names to the profile funds, creating missing ones. Lookups are case-insensitive."""
+
+    def __init__(self, profile: Profile, default_fund_name: str):
+        self.profile = profile
+        self.default_fund_name = default_fund_name
+        self.funds = {fund.name.lower(): fund for fund in Fund.objects.filter(user_profile=profile)}
+
+    def get_fund(self, row_number: int, name: Optional[str]) -> Fund:
+        name = name or self.default_fund_name
+        if len(name) > Fund._meta.get_field('name').max_length:
+            raise ImportFormatError(row_number, f'fund name "{name}" is too long')
+
+        fund = self.funds.get(name.lower())
+        if fund is None:
+            fund = Fund.objects.create(
+                name=name,
+                balance=Decimal('0.00'),
+                goal=Decimal('0.00'),
+                budget=Decimal('0.00'),
+                user_profile=self.profile,
+            )
+            self.funds[name.lower()] = fund
+
+        return fund
+
+
+def start_import(profile: Profile, file: BinaryIO, file_name: str, file_format: str = None) -> TransactionImport:
+    """
+    Returns the import record of the file, creating it if the file was never imported by the profile.
+
+    Failed imports are switched back to "in progress" to be resumed.
+    """
+    transaction_import, _ = TransactionImport.objects.get_or_create(
+        user_profile=profile,
+        checksum=get_file_checksum(file),
+        defaults={
+            'file_name': file_name[:255],
+            'file_format': file_format or get_file_format(file_name),
+        },
+    )
+    if transaction_import.status == TransactionImport.StatusChoices.FAILED:
+        transaction_import.status = TransactionImport.StatusChoices.IN_PROGRESS
+        transaction_import.error = ''
+        transaction_import.save(update_fields=('status', 'error', 'date_updated'))
+
+    return transaction_import
+
+
+def run_import(
+        transaction_import: TransactionImport,
+        file: BinaryIO,
+        default_fund_name: str = IMPORT_DEFAULT_FUND_NAME,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        on_progress: Callable[[TransactionImport], None] = None,
+) -> TransactionImport:
+    """
+    Streams the file rows into transactions, committing them in chunks of `chunk_size` rows.
+
+    Rows committed by a previous run of the same import are skipped. Each chunk is saved together
+    with the import progress, so the memory usage does not depend on the file size and a crash
+    loses at most one uncommitted chunk. The import row is locked while a chunk is saved and its progress
+    is read again under the lock, so concurrent runs of the import never save the same rows twice.
+    """
+    if transaction_import.status == TransactionImport.StatusChoices.COMPLETED:
+        return transaction_import
+
+    profile = transaction_import.user_profile
+    funds = FundResolver(profile, default_fund_name)
+    text_file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        rows = islice(PARSERS[transaction_import.file_format](text_file), transaction_import.rows_committed, None)
+        row_number = transaction_import.rows_committed
+        while chunk := list(islice(rows, chunk_size)):
+            chunk_start = row_number
+            row_number += len(chunk)
+            with db_transaction.atomic():
+                # Another run of the same import could have committed the rows meanwhile
+                rows_committed = (
+                    TransactionImport.objects
+                    .select_for_update()
+                    .values_list('rows_committed', flat=True)
+                    .get(id=transaction_import.id)
+                )
+                transactions = [
+                    Transaction(
+                        type=row.type,
+                        amount=row.amount,
+                        comment=row.comment[:200],
+                        date_created=row.date_created,
+                        fund=funds.get_fund(chunk_start + offset + 1, row.fund_name),
+                        user_profile=profile,
+                    )
+                    for offset, row in enumerate(chunk)
+                    if chunk_start + offset >= rows_committed
+                ]
+                if transactions:
+                    bulk_create_transactions(transactions)
+                    TransactionImport.objects.filter(id=transaction_import.id).update(
+                        rows_committed=row_number,
+                        date_updated=timezone.now(),
+                    )
+            transaction_import.rows_committed = max(rows_committed, row_number)
+
+            if on_progress is not None:
+                on_progress(transaction_import)
+    except ImportFormatError as error:
+        transaction_import.status = TransactionImport.StatusChoices.FAILED
+        transaction_import.error = str(error)[:255]
+        transaction_import.save(update_fields=('status', 'error', 'date_updated'))
+        raise
+    finally:
+        text_file.detach()
+
+    transaction_import.status = TransactionImport.StatusChoices.COMPLETED
+    transaction_import.save(update_fields=('status', 'date_updated'))
+
+    return transaction_import
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finances.partitions import PartitioningError, archive_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves transactions of the monthly partitions that end on or before the date to the archive, '
+        'keeping balances reconciled.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=date.fromisoformat, required=True, help='cutoff date, YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        try:
+            archived = archive_partitions(options['before'])
+        except PartitioningError as error:
+            raise CommandError(f'{error}.')
+
+        for name, count in archived.items():
+            self.stdout.write(f'{name}: {count} transactions')
+        self.stdout.write(self.style.SUCCESS(f'Archived {sum(archived.values())} transactions.'))
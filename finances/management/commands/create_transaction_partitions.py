@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finances.partitions import PartitioningError, create_upcoming_partitions, split_legacy_partition
+
+
+class Command(BaseCommand):
+    help = 'Creates monthly transaction partitions of the current month and the next ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3, help='amount of next months to create')
+        parser.add_argument(
+            '--split-legacy',
+            action='store_true',
+            help='move the transactions made before partitioning to monthly partitions first',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            partitions = split_legacy_partition() if options['split_legacy'] else []
+            partitions += create_upcoming_partitions(options['months_ahead'])
+        except PartitioningError as error:
+            raise CommandError(f'{error}.')
+
+        for partition in partitions:
+            self.stdout.write(f'{partition.name}: [{partition.start}, {partition.end})')
+        self.stdout.write(self.style.SUCCESS(f'Created {len(partitions)} partitions.'))
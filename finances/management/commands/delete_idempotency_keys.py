@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from finances.idempotency import delete_expired_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = 'Deletes idempotency keys older than IDEMPOTENCY_KEY_TTL hours, meant to be run periodically.'
+
+    def handle(self, *args, **options):
+        deleted = delete_expired_idempotency_keys()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys.'))
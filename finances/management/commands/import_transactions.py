@@ -0,0 +1,60 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finances.importers import IMPORT_CHUNK_SIZE, IMPORT_DEFAULT_FUND_NAME, ImportFormatError, run_import, start_import
+from finances.models import TransactionImport
+from users.models import Profile
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports transaction history of a user from a CSV or OFX bank export. '
+        'Running the command again for the same file resumes the import from the last committed chunk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='path to the CSV or OFX file')
+        parser.add_argument('--user-id', type=int, required=True, help='ID of the user whose history is imported')
+        parser.add_argument(
+            '--format',
+            choices=TransactionImport.FileFormatChoices.values,
+            help='file format, guessed by the file extension by default',
+        )
+        parser.add_argument(
+            '--default-fund',
+            default=IMPORT_DEFAULT_FUND_NAME,
+            help='name of the fund for rows without a fund',
+        )
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='rows committed at once')
+
+    def handle(self, *args, **options):
+        try:
+            profile = Profile.objects.get(user_id=options['user_id'])
+        except Profile.DoesNotExist:
+            raise CommandError(f'Profile of user {options["user_id"]} does not exist.')
+
+        with open(options['path'], 'rb') as file:
+            transaction_import = start_import(profile, file, os.path.basename(options['path']), options['format'])
+            if transaction_import.rows_committed:
+                self.stdout.write(
+                    f'Resuming import #{transaction_import.id} after row {transaction_import.rows_committed}.'
+                )
+
+            try:
+                run_import(
+                    transaction_import,
+                    file,
+                    default_fund_name=options['default_fund'],
+                    chunk_size=options['chunk_size'],
+                    on_progress=self.report_progress,
+                )
+            except ImportFormatError as error:
+                raise CommandError(f'Import #{transaction_import.id} failed: {error}.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Import #{transaction_import.id} completed: {transaction_import.rows_committed} rows.'
+        ))
+
+    def report_progress(self, transaction_import: TransactionImport) -> None:
+        self.stdout.write(f'Import #{transaction_import.id}: {transaction_import.rows_committed} rows committed.')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from finances.rollups import rebuild_daily_totals
+
+
+class Command(BaseCommand):
+    help = 'Recomputes daily transaction totals from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile-id', type=int, help='rebuild totals of a single profile only')
+        parser.add_argument('--batch-size', type=int, default=1000, help='daily totals inserted at once')
+
+    def handle(self, *args, **options):
+        created = rebuild_daily_totals(options['profile_id'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} daily totals.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from finances.reconciliation import RECONCILIATION_CHUNK_SIZE, reconcile_balances
+
+
+class Command(BaseCommand):
+    help = (
+        'Checks fund and profile balances against their opening balances plus the transactions, '
+        'reporting or repairing the drifted ones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='set drifted balances to the expected ones')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECONCILIATION_CHUNK_SIZE,
+            help='width of the profile ID range checked at once',
+        )
+        parser.add_argument('--workers', type=int, default=1, help='amount of ranges checked in parallel')
+
+    def handle(self, *args, **options):
+        drifts_count = 0
+        for drifts in reconcile_balances(options['repair'], options['chunk_size'], options['workers']):
+            for drift in drifts:
+                self.stdout.write(
+                    f'{drift.model} #{drift.id} (profile #{drift.profile_id}): balance {drift.balance}, '
+                    f'expected {drift.expected_balance}, drift {drift.drift}'
+                )
+            drifts_count += len(drifts)
+
+        if not drifts_count:
+            self.stdout.write(self.style.SUCCESS('All balances are reconciled.'))
+        elif options['repair']:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {drifts_count} drifted balances.'))
+        else:
+            self.stdout.write(self.style.WARNING(f'Found {drifts_count} drifted balances.'))
@@ -0,0 +1,16 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from finances.budgets import renew_expired_budgets
+
+
+class Command(BaseCommand):
+    help = 'Rolls expired auto-renewed user and fund budgets forward to the current period. Safe to run repeatedly.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='renew as of the date (ISO 8601), today by default')
+
+    def handle(self, *args, **options):
+        renewed = renew_expired_budgets(options['date'])
+        self.stdout.write(self.style.SUCCESS(f'Renewed {renewed} budgets.'))
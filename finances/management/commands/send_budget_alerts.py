@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from finances.alerts import evaluate_budget_alerts, get_budget_profile_ids, send_budget_alerts
+
+
+class Command(BaseCommand):
+    help = 'Checks budgets of all the users and sends the pending budget alerts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile-id', type=int, help='check budgets of a single profile only')
+        parser.add_argument('--batch-size', type=int, help='alerts sent at once')
+
+    def handle(self, *args, **options):
+        profile_ids = [options['profile_id']] if options['profile_id'] else get_budget_profile_ids()
+        evaluate_budget_alerts(profile_ids)
+        sent = send_budget_alerts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} budget alerts.'))
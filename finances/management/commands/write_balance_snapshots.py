@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from finances.snapshots import SNAPSHOTS_CHUNK_SIZE, delete_old_balance_snapshots, write_balance_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes snapshots of fund and profile balances at the end of yesterday, or of several past days, '
+        'and thins out the old ones. Meant to be run daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--day',
+            type=date.fromisoformat,
+            help='last snapshotted day, YYYY-MM-DD (yesterday by default)',
+        )
+        parser.add_argument('--days', type=int, default=1, help='amount of days up to the last one to snapshot')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=SNAPSHOTS_CHUNK_SIZE,
+            help='width of the profile ID range snapshotted at once',
+        )
+
+    def handle(self, *args, **options):
+        last_day = options['day'] or timezone.localdate() - timedelta(days=1)
+        written = 0
+        try:
+            for days_back in range(options['days']):
+                written += write_balance_snapshots(last_day - timedelta(days=days_back), options['chunk_size'])
+        except ValueError as error:
+            raise CommandError(f'{error}.')
+
+        deleted = delete_old_balance_snapshots()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} balance snapshots, deleted {deleted} old ones.'))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_email_alter_user_role_and_more'),
+        ('finances', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='date_created',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='date created'),
+        ),
+        migrations.CreateModel(
+            name='TransactionImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255, verbose_name='file name')),
+                ('checksum', models.CharField(max_length=64, verbose_name='checksum')),
+                ('file_format', models.CharField(choices=[('CSV', 'CSV'), ('OFX', 'OFX')], max_length=3, verbose_name='file format')),
+                ('status', models.CharField(choices=[('P', 'In progress'), ('C', 'Completed'), ('F', 'Failed')], default='P', max_length=1, verbose_name='status')),
+                ('rows_committed', models.PositiveIntegerField(default=0, verbose_name='rows committed')),
+                ('error', models.CharField(blank=True, max_length=255, verbose_name='error')),
+                ('date_created', models.DateTimeField(auto_now_add=True, verbose_name='date created')),
+                ('date_updated', models.DateTimeField(auto_now=True, verbose_name='date updated')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transaction_imports', to='users.profile')),
+            ],
+            options={
+                'unique_together': {('user_profile', 'checksum')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0003_transaction_import'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user_profile', '-date_created', '-id'], name='transaction_profile_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user_profile', 'fund', '-date_created', '-id'], name='transaction_fund_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user_profile', 'type', '-date_created', '-id'], name='transaction_type_date_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_email_alter_user_role_and_more'),
+        ('finances', '0004_transaction_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionDailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('IN', 'Income'), ('EX', 'Expense'), ('TR', 'Transfer')], max_length=2, verbose_name='transaction type')),
+                ('day', models.DateField(verbose_name='day')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='total amount')),
+                ('transactions_count', models.PositiveIntegerField(verbose_name='transactions count')),
+                ('fund', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_totals', to='finances.fund')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_totals', to='users.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_profile', 'type', 'day'], name='daily_total_profile_day_idx')],
+                'unique_together': {('fund', 'type', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0005_transaction_daily_total'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fundbudget',
+            index=models.Index(fields=['auto_renew', 'end_date'], name='fund_budget_renew_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userbudget',
+            index=models.Index(fields=['auto_renew', 'end_date'], name='user_budget_renew_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_email_alter_user_role_and_more'),
+        ('finances', '0006_budget_renew_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='transferred amount')),
+                ('comment', models.CharField(blank=True, max_length=200, verbose_name='comment')),
+                ('date_created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date created')),
+                ('destination_fund', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='incoming_transfers', to='finances.fund')),
+                ('source_fund', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outgoing_transfers', to='finances.fund')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transfers', to='users.profile')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='transfer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='legs', to='finances.transfer'),
+        ),
+        migrations.AddConstraint(
+            model_name='transfer',
+            constraint=models.CheckConstraint(check=models.Q(('amount__gt', 0)), name='transfer_amount_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='transfer',
+            constraint=models.CheckConstraint(check=models.Q(('source_fund__isnull', False), ('destination_fund__isnull', False), _connector='OR'), name='transfer_has_fund'),
+        ),
+        migrations.AddConstraint(
+            model_name='transfer',
+            constraint=models.CheckConstraint(check=models.Q(('source_fund', models.F('destination_fund')), _negated=True), name='transfer_funds_differ'),
+        ),
+    ]
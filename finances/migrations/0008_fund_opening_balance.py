@@ -0,0 +1,43 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:40
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def set_opening_balances(apps, schema_editor):
+    """Sets opening balances of the existing funds, so their current balances are reconciled."""
+    Fund = apps.get_model('finances', 'Fund')
+    Transaction = apps.get_model('finances', 'Transaction')
+
+    decimal_field = models.DecimalField(decimal_places=2, max_digits=15)
+    changes = (
+        Transaction.objects
+        .filter(fund=OuterRef('pk'))
+        .order_by()
+        .values('fund')
+        .annotate(total=Sum(Case(When(type='EX', then=-F('amount')), default=F('amount'), output_field=decimal_field)))
+        .values('total')
+    )
+    Fund.objects.update(
+        opening_balance=F('balance') - Coalesce(Subquery(changes), Value(Decimal('0.00')), output_field=decimal_field),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0007_transfer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fund',
+            name='opening_balance',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=15, verbose_name='opening balance'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_opening_balances, migrations.RunPython.noop),
+    ]
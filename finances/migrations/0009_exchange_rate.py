@@ -0,0 +1,37 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0008_fund_opening_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fund',
+            name='currency',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='funds', to='finances.currency'),
+        ),
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=20, verbose_name='rate')),
+                ('base_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='base_exchange_rates', to='finances.currency', to_field='iso_code')),
+                ('quote_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quote_exchange_rates', to='finances.currency', to_field='iso_code')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='exchangerate',
+            constraint=models.CheckConstraint(check=models.Q(('rate__gt', 0)), name='exchange_rate_positive'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='exchangerate',
+            unique_together={('base_currency', 'quote_currency', 'date')},
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:45
+
+from datetime import date, timezone as dt_timezone
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _bound(day: date) -> str:
+    return f'{day.isoformat()} 00:00:00+00'
+
+
+def partition_transactions(apps, schema_editor):
+    """
+    Turns the transactions table into a table partitioned by month of `date_created` on PostgreSQL.
+
+    The existing table is attached as the partition of all the months before the current one, so its rows are
+    not copied. Only rows of the current and later months are moved to their monthly partitions, so archiving
+    the old months never takes the current one. `finances.partitions.split_legacy_partition` splits the old
+    months later. The primary key includes the partition key, as PostgreSQL requires, so `id` alone is not
+    unique anymore and IDs are only kept unique by the plain sequence they are taken from, since partitioned
+    tables do not support identity columns.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    table = 'finances_transaction'
+    legacy_table = f'{table}_legacy'
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = %s::regclass', [table])
+        if cursor.fetchone()[0] == 'p':
+            # Already partitioned, the table is kept when the migration is reversed
+            return
+        cursor.execute(f'SELECT max(date_created) FROM {table}')
+        last_date_created = cursor.fetchone()[0]
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            'WHERE conrelid = %s::regclass AND contype = %s',
+            [table, 'f'],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            'SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid '
+            'WHERE x.indrelid = %s::regclass AND NOT x.indisprimary',
+            [table],
+        )
+        indexes = cursor.fetchall()
+
+    today = timezone.now().astimezone(dt_timezone.utc).date()
+    last_day = max(today, last_date_created.astimezone(dt_timezone.utc).date() if last_date_created else today)
+    legacy_bound = _add_months(today, 0)
+
+    schema_editor.execute(f'ALTER TABLE {table} RENAME TO {legacy_table}')
+    schema_editor.execute(f'ALTER TABLE {legacy_table} DROP CONSTRAINT {table}_pkey')
+    for name, _ in indexes:
+        schema_editor.execute(f'ALTER INDEX {name} RENAME TO {name[:56]}_legacy')
+    schema_editor.execute(f'ALTER TABLE {legacy_table} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    schema_editor.execute(f'ALTER TABLE {legacy_table} ALTER COLUMN id DROP DEFAULT')
+    schema_editor.execute(f'DROP SEQUENCE IF EXISTS {table}_id_seq')
+
+    schema_editor.execute(
+        f'CREATE TABLE {table} (LIKE {legacy_table} INCLUDING DEFAULTS) PARTITION BY RANGE (date_created)'
+    )
+    schema_editor.execute(f'CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    schema_editor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+    schema_editor.execute(f"SELECT setval('{table}_id_seq', COALESCE(max(id), 0) + 1, false) FROM {legacy_table}")
+    schema_editor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, date_created)')
+    for name, definition in foreign_keys:
+        schema_editor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+    for name, definition in indexes:
+        schema_editor.execute(definition)
+
+    schema_editor.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    start, end = legacy_bound, max(_add_months(legacy_bound, 4), _add_months(last_day, 1))
+    while start < end:
+        schema_editor.execute(
+            f'CREATE TABLE {table}_p{start:%Y_%m} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)',
+            [_bound(start), _bound(_add_months(start, 1))],
+        )
+        start = _add_months(start, 1)
+    schema_editor.execute(
+        f'WITH moved AS (DELETE FROM {legacy_table} WHERE date_created >= %s RETURNING *) '
+        f'INSERT INTO {table} SELECT * FROM moved',
+        [_bound(legacy_bound)],
+    )
+    schema_editor.execute(
+        f'ALTER TABLE {table} ATTACH PARTITION {legacy_table} FOR VALUES FROM (MINVALUE) TO (%s)',
+        [_bound(legacy_bound)],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_profile_opening_balance'),
+        ('finances', '0009_exchange_rate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('IN', 'Income'), ('EX', 'Expense'), ('TR', 'Transfer')], max_length=2, verbose_name='transaction type')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='transferred amount')),
+                ('comment', models.CharField(blank=True, max_length=200, verbose_name='comment')),
+                ('date_created', models.DateTimeField(verbose_name='date created')),
+                ('fund', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finances.fund')),
+                ('transfer', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finances.transfer')),
+                ('user_profile', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_profile', 'date_created'], name='transaction_archive_date_idx')],
+            },
+        ),
+        # The partitioned table works with the previous migrations as is, so it is kept on the way back
+        migrations.RunPython(partition_transactions, migrations.RunPython.noop),
+    ]
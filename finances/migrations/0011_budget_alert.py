@@ -0,0 +1,45 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_profile_opening_balance'),
+        ('finances', '0010_transaction_partitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('W', 'Warning'), ('E', 'Exceeded')], max_length=1, verbose_name='alert level')),
+                ('end_date', models.DateField(verbose_name='end date')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='budget amount')),
+                ('spent', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='spent amount')),
+                ('date_created', models.DateTimeField(auto_now_add=True, verbose_name='date created')),
+                ('date_sent', models.DateTimeField(blank=True, null=True, verbose_name='date sent')),
+                ('fund_budget', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='finances.fundbudget')),
+                ('user_budget', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='finances.userbudget')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_alerts', to='users.profile')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('date_sent__isnull', True)), fields=['user_profile'], name='budget_alert_pending_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='budgetalert',
+            constraint=models.CheckConstraint(check=models.Q(('user_budget__isnull', True), ('fund_budget__isnull', True), _connector='XOR'), name='budget_alert_has_one_budget'),
+        ),
+        migrations.AddConstraint(
+            model_name='budgetalert',
+            constraint=models.UniqueConstraint(fields=('user_budget', 'end_date', 'level'), name='user_budget_alert_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='budgetalert',
+            constraint=models.UniqueConstraint(fields=('fund_budget', 'end_date', 'level'), name='fund_budget_alert_unique'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+def create_comment_trigram_index(apps, schema_editor):
+    """
+    Creates the trigram index of transaction comments searched by the admin on PostgreSQL with `pg_trgm`.
+
+    Django searches with `UPPER(comment::text) LIKE UPPER(%s)`, so the index is built on the same expression.
+    The index is skipped where the extension is not available.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS transaction_comment_trgm_idx '
+            'ON finances_transaction USING gin ((UPPER(comment::text)) gin_trgm_ops)'
+        )
+
+
+def drop_comment_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS transaction_comment_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0011_budget_alert'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['-date_created', '-id'], name='transaction_date_idx'),
+        ),
+        migrations.RunPython(create_comment_trigram_index, drop_comment_trigram_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:31
+
+from django.db import migrations
+
+
+def create_comment_search_index(apps, schema_editor):
+    """
+    Creates the full-text index of transaction comments on PostgreSQL.
+
+    The indexed expression is the one `finances.search` matches the comments with, so the planner can use it.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS transaction_comment_search_idx ON finances_transaction '
+        "USING gin (to_tsvector('simple'::regconfig, COALESCE(comment, '')))"
+    )
+
+
+def drop_comment_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS transaction_comment_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0012_transaction_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_comment_search_index, drop_comment_search_index),
+    ]
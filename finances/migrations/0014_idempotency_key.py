@@ -0,0 +1,37 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:20
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finances', '0013_transaction_comment_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, verbose_name='key')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='request fingerprint')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='response status code')),
+                ('response', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='response data')),
+                ('date_created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date created')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date_created'], name='idempotency_key_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='idempotency_key_unique'),
+        ),
+    ]
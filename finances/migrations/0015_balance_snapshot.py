@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_profile_opening_balance'),
+        ('finances', '0014_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='balance')),
+                ('fund', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='finances.fund')),
+                ('user_profile', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='users.profile')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='balancesnapshot',
+            constraint=models.UniqueConstraint(fields=('user_profile', 'fund', 'day'), name='balance_snapshot_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0015_balance_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budgetalert',
+            name='date_claimed',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='date claimed'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.1 on 2026-10-18 11:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0016_budget_alert_date_claimed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='transfer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='legs', to='finances.transfer'),
+        ),
+        migrations.AlterField(
+            model_name='transactionarchive',
+            name='transfer',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='finances.transfer'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.1 on 2026-10-18 12:05
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay
+
+
+def set_anchor_days(apps, schema_editor):
+    """Anchors the existing budgets to the day of their current end date."""
+    for model_name in ('FundBudget', 'UserBudget'):
+        apps.get_model('finances', model_name).objects.update(anchor_day=ExtractDay('end_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0017_restrict_transfer_legs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fundbudget',
+            name='anchor_day',
+            field=models.PositiveSmallIntegerField(blank=True, default=1, verbose_name='anchor day'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='userbudget',
+            name='anchor_day',
+            field=models.PositiveSmallIntegerField(blank=True, default=1, verbose_name='anchor day'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_anchor_days, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from users.models import Profile
@@ -23,6 +25,39 @@ class Currency(models.Model):
         verbose_name_plural = 'currencies'
 
 
+class ExchangeRate(models.Model):
+    """
+    Holds the exchange rate of a currency pair on a date.
+
+    Fields:
+        base_currency (fk): `Currency` converted from, referenced by the ISO code
+        quote_currency (fk): `Currency` converted to, referenced by the ISO code
+        date (date): date the rate is valid on
+        rate (dec): amount of the quote currency for one unit of the base currency
+    """
+
+    class Meta:
+        unique_together = ('base_currency', 'quote_currency', 'date')
+        constraints = (
+            models.CheckConstraint(check=models.Q(rate__gt=0), name='exchange_rate_positive'),
+        )
+
+    base_currency = models.ForeignKey(
+        Currency,
+        on_delete=models.CASCADE,
+        to_field='iso_code',
+        related_name='base_exchange_rates',
+    )
+    quote_currency = models.ForeignKey(
+        Currency,
+        on_delete=models.CASCADE,
+        to_field='iso_code',
+        related_name='quote_exchange_rates',
+    )
+    date = models.DateField(_('date'))
+    rate = models.DecimalField(_('rate'), decimal_places=8, max_digits=20)
+
+
 class Fund(models.Model):
     """
     Reflects a fund or budget category that a user can create.
@@ -31,8 +66,10 @@ class Fund(models.Model):
         name (str): fund name
         description (str): fund description (optional)
         balance (dec): fund current balance
+        opening_balance (dec): fund balance before its first transaction (the initial balance by default)
         goal (dec): fund goal balance (optional)
         budget (dec): planned fund budget for `self.user.profile.budget_period`
+        currency (fk): `Currency` OneToMany relation, the profile currency is used if it is not set
         date (dt): date and time budget was created
         user (fk): `User` OneToMany relation
     """
@@ -40,12 +77,25 @@ class Fund(models.Model):
     name = models.CharField(_('name'), max_length=32)
     description = models.CharField(_('description'), max_length=200, blank=True)
     balance = models.DecimalField(_('balance'), decimal_places=2, max_digits=15)
+    opening_balance = models.DecimalField(_('opening balance'), decimal_places=2, max_digits=15, blank=True)
     goal = models.DecimalField(_('goal'), decimal_places=2, max_digits=15, blank=True)
     budget = models.DecimalField(_('balance'), decimal_places=2, max_digits=15)
+    currency = models.ForeignKey(
+        Currency,
+        on_delete=models.PROTECT,
+        related_name='funds',
+        null=True,
+        blank=True,
+    )
     date_created = models.DateTimeField(_('date created'), auto_now_add=True)
     date_updated = models.DateTimeField(_('date updated'), auto_now=True)
     user_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='funds')
 
+    def save(self, *args, **kwargs):
+        if self.opening_balance is None:
+            self.opening_balance = self.balance
+        super().save(*args, **kwargs)
+
 
 class Transaction(models.Model):
     """
@@ -55,12 +105,18 @@ class Transaction(models.Model):
     either an income, an expense, or a transfer. The transaction is linked to a fund and
     the user's profile. It can optionally include a comment for additional details.
 
+    On PostgreSQL the table is partitioned by month of `date_created` (see `finances.partitions`),
+    so queries filtered by the date scan only the partitions of the requested months. The primary key
+    is `(id, date_created)` there, so `id` alone is not unique: IDs are only kept unique by the sequence
+    they are taken from, and a row saved with an explicit ID of another row is not rejected.
+
     Fields:
         amount (dec): the amount of money involved in the transaction
         comment (str): a comment providing more details about the transaction (optional)
-        date_created (dt): the date and time when the transaction was recorded
+        date_created (dt): the date and time when the transaction was made (defaults to now, set on import)
         fund (fk): `Fund` OneToMany relation
         user_profile (fk): `Profile` OneToMany relation
+        transfer (fk): `Transfer` OneToMany relation, set for transfer legs (optional)
     """
 
     class TransactionTypeChoices(models.TextChoices):
@@ -68,12 +124,260 @@ class Transaction(models.Model):
         EXPENSE = 'EX', _('Expense')
         TRANSFER = 'TR', _('Transfer')
 
+    class Meta:
+        # Match the keyset pagination order of the transaction list, optionally narrowed by fund or type,
+        # and the order and date hierarchy of the admin changelist. The admin comment search uses a trigram index
+        # created on PostgreSQL by a migration
+        indexes = (
+            models.Index(fields=('user_profile', '-date_created', '-id'), name='transaction_profile_date_idx'),
+            models.Index(fields=('user_profile', 'fund', '-date_created', '-id'), name='transaction_fund_date_idx'),
+            models.Index(fields=('user_profile', 'type', '-date_created', '-id'), name='transaction_type_date_idx'),
+            models.Index(fields=('-date_created', '-id'), name='transaction_date_idx'),
+        )
+
     type = models.CharField(_('transaction type'), max_length=2, choices=TransactionTypeChoices.choices)
     amount = models.DecimalField(_('transferred amount'), decimal_places=2, max_digits=15)
     comment = models.CharField(_('comment'), max_length=200, blank=True)
-    date_created = models.DateTimeField(_('date created'), auto_now_add=True)
+    date_created = models.DateTimeField(_('date created'), default=timezone.now)
     fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='transactions')
     user_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='transactions')
+    # Deleting a transfer alone would leave the balances changed by its legs, it goes only with its fund or profile
+    transfer = models.ForeignKey('Transfer', on_delete=models.RESTRICT, related_name='legs', null=True, blank=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Saved values, so the signal receivers can tell what a save of the loaded transaction changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        deferred_fields = self.get_deferred_fields()
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{
+                field.attname: getattr(self, field.attname)
+                for field in self._meta.concrete_fields
+                if field.attname not in deferred_fields
+            },
+        }
+
+
+class TransactionArchive(models.Model):
+    """
+    Holds transactions of archived months, moved out of the partitioned transactions table.
+
+    The table has no foreign key constraints and only one index to stay compact. Amounts of the archived
+    transactions are added to the opening balances of their funds and profiles, so balances stay reconciled.
+
+    Fields:
+        type (str): transaction type
+        amount (dec): the amount of money involved in the transaction
+        comment (str): transaction comment
+        date_created (dt): the date and time when the transaction was made
+        fund (fk): `Fund` OneToMany relation
+        user_profile (fk): `Profile` OneToMany relation
+        transfer (fk): `Transfer` OneToMany relation (optional)
+    """
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('user_profile', 'date_created'), name='transaction_archive_date_idx'),
+        )
+
+    id = models.BigIntegerField(primary_key=True)
+    type = models.CharField(_('transaction type'), max_length=2, choices=Transaction.TransactionTypeChoices.choices)
+    amount = models.DecimalField(_('transferred amount'), decimal_places=2, max_digits=15)
+    comment = models.CharField(_('comment'), max_length=200, blank=True)
+    date_created = models.DateTimeField(_('date created'))
+    fund = models.ForeignKey(
+        Fund,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_constraint=False,
+        db_index=False,
+    )
+    user_profile = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_constraint=False,
+        db_index=False,
+    )
+    transfer = models.ForeignKey(
+        'Transfer',
+        on_delete=models.RESTRICT,
+        related_name='+',
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+    )
+
+
+class Transfer(models.Model):
+    """
+    Represents a move of money between two funds, or between a fund and the non-distributed profile balance.
+
+    A transfer is recorded as `TRANSFER` transactions (legs) of the involved funds: the source fund leg
+    has a negative amount and the destination fund leg has a positive one. A missing fund means
+    the profile balance is the source or the destination of the transfer.
+
+    Fields:
+        amount (dec): transferred amount
+        comment (str): a comment providing more details about the transfer (optional)
+        date_created (dt): the date and time when the transfer was made
+        source_fund (fk): `Fund` OneToMany relation (optional)
+        destination_fund (fk): `Fund` OneToMany relation (optional)
+        user_profile (fk): `Profile` OneToMany relation
+    """
+
+    class Meta:
+        constraints = (
+            models.CheckConstraint(check=models.Q(amount__gt=0), name='transfer_amount_positive'),
+            models.CheckConstraint(
+                check=models.Q(source_fund__isnull=False) | models.Q(destination_fund__isnull=False),
+                name='transfer_has_fund',
+            ),
+            models.CheckConstraint(
+                check=~models.Q(source_fund=models.F('destination_fund')),
+                name='transfer_funds_differ',
+            ),
+        )
+
+    amount = models.DecimalField(_('transferred amount'), decimal_places=2, max_digits=15)
+    comment = models.CharField(_('comment'), max_length=200, blank=True)
+    date_created = models.DateTimeField(_('date created'), default=timezone.now)
+    source_fund = models.ForeignKey(
+        Fund,
+        on_delete=models.CASCADE,
+        related_name='outgoing_transfers',
+        null=True,
+        blank=True,
+    )
+    destination_fund = models.ForeignKey(
+        Fund,
+        on_delete=models.CASCADE,
+        related_name='incoming_transfers',
+        null=True,
+        blank=True,
+    )
+    user_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='transfers')
+
+
+class TransactionImport(models.Model):
+    """
+    Tracks an import of the user's transaction history from a bank export file.
+
+    The file is committed in chunks and `rows_committed` is updated together with each chunk,
+    so an interrupted import of the same file can be resumed from the last committed chunk.
+
+    Fields:
+        file_name (str): name of the imported file
+        checksum (str): SHA-256 checksum of the file content
+        file_format (str): format of the file
+        status (str): import status
+        rows_committed (int): amount of file rows that are already saved as transactions
+        error (str): reason of the last failure (optional)
+        date_created (dt): date and time import was started
+        date_updated (dt): date and time import was updated
+        user_profile (fk): `Profile` OneToMany relation
+    """
+
+    class FileFormatChoices(models.TextChoices):
+        CSV = 'CSV', _('CSV')
+        OFX = 'OFX', _('OFX')
+
+    class StatusChoices(models.TextChoices):
+        IN_PROGRESS = 'P', _('In progress')
+        COMPLETED = 'C', _('Completed')
+        FAILED = 'F', _('Failed')
+
+    class Meta:
+        unique_together = ('user_profile', 'checksum')
+
+    file_name = models.CharField(_('file name'), max_length=255)
+    checksum = models.CharField(_('checksum'), max_length=64)
+    file_format = models.CharField(_('file format'), max_length=3, choices=FileFormatChoices.choices)
+    status = models.CharField(
+        _('status'),
+        max_length=1,
+        choices=StatusChoices.choices,
+        default=StatusChoices.IN_PROGRESS,
+    )
+    rows_committed = models.PositiveIntegerField(_('rows committed'), default=0)
+    error = models.CharField(_('error'), max_length=255, blank=True)
+    date_created = models.DateTimeField(_('date created'), auto_now_add=True)
+    date_updated = models.DateTimeField(_('date updated'), auto_now=True)
+    user_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='transaction_imports')
+
+
+class TransactionDailyTotal(models.Model):
+    """
+    Holds the total of a fund transactions of one type made during one day.
+
+    Totals are kept current when transactions are written, so budget and period reports sum
+    daily buckets instead of scanning the transactions.
+
+    Fields:
+        type (str): transaction type
+        day (date): day the transactions were made
+        amount (dec): sum of the transaction amounts
+        transactions_count (int): amount of the transactions
+        fund (fk): `Fund` OneToMany relation
+        user_profile (fk): `Profile` OneToMany relation
+    """
+
+    class Meta:
+        unique_together = ('fund', 'type', 'day')
+        indexes = (
+            models.Index(fields=('user_profile', 'type', 'day'), name='daily_total_profile_day_idx'),
+        )
+
+    type = models.CharField(_('transaction type'), max_length=2, choices=Transaction.TransactionTypeChoices.choices)
+    day = models.DateField(_('day'))
+    amount = models.DecimalField(_('total amount'), decimal_places=2, max_digits=15)
+    transactions_count = models.PositiveIntegerField(_('transactions count'))
+    fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='daily_totals')
+    user_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='daily_totals')
+
+
+class BalanceSnapshot(models.Model):
+    """
+    Holds the balance of a fund, or the non-distributed balance of a profile, at the end of a day.
+
+    Snapshots of a profile and all its funds are written together by a batch job (see `finances.snapshots`),
+    so a historical balance is the nearest snapshot plus the transactions made after it.
+
+    Fields:
+        day (date): day at the end of which the balance was taken
+        balance (dec): fund balance, or profile balance if there is no fund
+        fund (fk): `Fund` OneToMany relation (optional)
+        user_profile (fk): `Profile` OneToMany relation
+    """
+
+    class Meta:
+        # Serves the lookups of the nearest snapshot of a profile (with no fund) or its fund
+        constraints = (
+            models.UniqueConstraint(fields=('user_profile', 'fund', 'day'), name='balance_snapshot_unique'),
+        )
+
+    day = models.DateField(_('day'))
+    balance = models.DecimalField(_('balance'), decimal_places=2, max_digits=15)
+    fund = models.ForeignKey(
+        Fund,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+        null=True,
+        blank=True,
+    )
+    user_profile = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+        db_index=False,
+    )
 
 
 class BudgetPeriodChoices(models.TextChoices):
@@ -92,18 +396,31 @@ class FundBudget(models.Model):
         amount (dec): budget amount
         date_created (dt): date and time budget was created
         fund (fk): `Fund` OneToMany relation
+        end_date (date): last day of the current budget period
+        anchor_day (int): day of month the monthly and annual periods end on, clamped to short months
+            (the day of the first end date by default)
+        auto_renew (bool): whether the budget is rolled forward to the next period when it ends
     """
 
     class Meta:
         unique_together = ('fund', 'period')
+        indexes = (
+            models.Index(fields=('auto_renew', 'end_date'), name='fund_budget_renew_idx'),
+        )
 
     period = models.CharField(_('budget period'), max_length=1, choices=BudgetPeriodChoices.choices)
     amount = models.DecimalField(_('budget amount'), decimal_places=2, max_digits=15)
     date_created = models.DateTimeField(_('date created'), auto_now_add=True)
     fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='budgets')
     end_date = models.DateField(_('end date'))
+    anchor_day = models.PositiveSmallIntegerField(_('anchor day'), blank=True)
     auto_renew = models.BooleanField(_('renew'), default=False)
 
+    def save(self, *args, **kwargs):
+        if self.anchor_day is None:
+            self.anchor_day = self.end_date.day
+        super().save(*args, **kwargs)
+
 
 class UserBudget(models.Model):
     """
@@ -114,13 +431,123 @@ class UserBudget(models.Model):
         amount (dec): budget amount
         date_created (dt): date and time budget was created
         user_profile (fk): `Profile` OneToMany relation
+        end_date (date): last day of the current budget period
+        anchor_day (int): day of month the monthly and annual periods end on, clamped to short months
+            (the day of the first end date by default)
+        auto_renew (bool): whether the budget is rolled forward to the next period when it ends
     """
     class Meta:
         unique_together = ('user_profile', 'period')
+        indexes = (
+            models.Index(fields=('auto_renew', 'end_date'), name='user_budget_renew_idx'),
+        )
 
     period = models.CharField(_('budget period'), max_length=1, choices=BudgetPeriodChoices.choices)
     amount = models.DecimalField(_('budget amount'), decimal_places=2, max_digits=15)
     date_created = models.DateTimeField(_('date created'), auto_now_add=True)
     user_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='budgets')
     end_date = models.DateField(_('end date'))
+    anchor_day = models.PositiveSmallIntegerField(_('anchor day'), blank=True)
     auto_renew = models.BooleanField(_('renew'), default=False)
+
+    def save(self, *args, **kwargs):
+        if self.anchor_day is None:
+            self.anchor_day = self.end_date.day
+        super().save(*args, **kwargs)
+
+
+class BudgetAlert(models.Model):
+    """
+    Records that spending of a user or fund budget period got close to or over the budget amount.
+
+    An alert is created once per budget, period and level, and is pending until it is sent to the user.
+
+    Fields:
+        level (str): whether the spending is close to or over the budget amount
+        end_date (date): last day of the budget period
+        amount (dec): budget amount
+        spent (dec): amount spent in the period when the alert was created
+        date_created (dt): date and time alert was created
+        date_claimed (dt): date and time alert was claimed by a sender (optional)
+        date_sent (dt): date and time alert was sent to the user (optional)
+        user_profile (fk): `Profile` OneToMany relation
+        user_budget (fk): `UserBudget` OneToMany relation (optional)
+        fund_budget (fk): `FundBudget` OneToMany relation (optional)
+    """
+
+    class LevelChoices(models.TextChoices):
+        WARNING = 'W', _('Warning')
+        EXCEEDED = 'E', _('Exceeded')
+
+    class Meta:
+        constraints = (
+            models.CheckConstraint(
+                check=models.Q(user_budget__isnull=True) ^ models.Q(fund_budget__isnull=True),
+                name='budget_alert_has_one_budget',
+            ),
+            models.UniqueConstraint(fields=('user_budget', 'end_date', 'level'), name='user_budget_alert_unique'),
+            models.UniqueConstraint(fields=('fund_budget', 'end_date', 'level'), name='fund_budget_alert_unique'),
+        )
+        indexes = (
+            models.Index(
+                fields=('user_profile',),
+                condition=models.Q(date_sent__isnull=True),
+                name='budget_alert_pending_idx',
+            ),
+        )
+
+    level = models.CharField(_('alert level'), max_length=1, choices=LevelChoices.choices)
+    end_date = models.DateField(_('end date'))
+    amount = models.DecimalField(_('budget amount'), decimal_places=2, max_digits=15)
+    spent = models.DecimalField(_('spent amount'), decimal_places=2, max_digits=15)
+    date_created = models.DateTimeField(_('date created'), auto_now_add=True)
+    date_claimed = models.DateTimeField(_('date claimed'), null=True, blank=True)
+    date_sent = models.DateTimeField(_('date sent'), null=True, blank=True)
+    user_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='budget_alerts')
+    user_budget = models.ForeignKey(
+        UserBudget,
+        on_delete=models.CASCADE,
+        related_name='alerts',
+        null=True,
+        blank=True,
+    )
+    fund_budget = models.ForeignKey(
+        FundBudget,
+        on_delete=models.CASCADE,
+        related_name='alerts',
+        null=True,
+        blank=True,
+    )
+
+
+class IdempotencyKey(models.Model):
+    """
+    Keeps the response of a finance write made with the `Idempotency-Key` header, so a retried request
+    gets the same response instead of repeating the write.
+
+    Keys are unique per user and expire after `IDEMPOTENCY_KEY_TTL` hours (see `finances.idempotency`).
+
+    Fields:
+        key (str): key sent by the client
+        fingerprint (str): SHA-256 of the method, path and data of the request made with the key
+        status_code (int): status code of the response
+        response (json): data of the response
+        date_created (dt): date and time the write was made
+        user (fk): `User` OneToMany relation
+    """
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'key'), name='idempotency_key_unique'),
+        )
+        indexes = (
+            models.Index(fields=('date_created',), name='idempotency_key_date_idx'),
+        )
+
+    key = models.CharField(_('key'), max_length=64)
+    fingerprint = models.CharField(_('request fingerprint'), max_length=64)
+    status_code = models.PositiveSmallIntegerField(_('response status code'))
+    response = models.JSONField(_('response data'), encoder=DjangoJSONEncoder, null=True)
+    date_created = models.DateTimeField(_('date created'), default=timezone.now)
+    # Covered by the unique constraint index
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys', db_index=False)
@@ -0,0 +1,110 @@
+import json
+import logging
+import threading
+from typing import Callable, NamedTuple
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from finances.models import BudgetAlert
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = 'https://api.telegram.org/bot{token}/sendMessage'
+TELEGRAM_TIMEOUT = 10
+
+
+class Notification(NamedTuple):
+    """
+    Fields:
+        telegram_id (str): Telegram ID of the notified user
+        alerts (list): budget alerts of the user sent in one message
+    """
+    telegram_id: str
+    alerts: list[BudgetAlert]
+
+
+def format_alert(alert: BudgetAlert) -> str:
+    """Returns a line of the alert message, the fund budget alerts must be fetched with their funds."""
+    budget = alert.fund_budget or alert.user_budget
+    subject = f'"{alert.fund_budget.fund.name}" fund' if alert.fund_budget else 'Total'
+    state = 'is over' if alert.level == BudgetAlert.LevelChoices.EXCEEDED else 'is close to'
+
+    return (
+        f'{subject} {budget.get_period_display().lower()} budget {state} the limit: '
+        f'{alert.spent} of {alert.amount} spent by {alert.end_date:%Y-%m-%d}.'
+    )
+
+
+def format_notification(notification: Notification) -> str:
+    return '\n'.join(format_alert(alert) for alert in notification.alerts)
+
+
+class BaseNotifier:
+    """
+    Sends budget alert notifications, every notification is a message to one user.
+
+    `on_sent` is called with every notification right after it is sent, so a failure of a later
+    notification of the batch does not send the earlier ones again.
+    """
+
+    def send(self, notifications: list[Notification], on_sent: Callable[[Notification], None]) -> None:
+        raise NotImplementedError
+
+
+class LogNotifier(BaseNotifier):
+    """Writes the notifications to the log."""
+
+    def send(self, notifications: list[Notification], on_sent: Callable[[Notification], None]) -> None:
+        for notification in notifications:
+            logger.info('Budget alerts of %s:\n%s', notification.telegram_id, format_notification(notification))
+            on_sent(notification)
+
+
+class LocalNotifier(BaseNotifier):
+    """Keeps the sent batches of notifications in memory, shared by all the instances."""
+
+    outbox = []
+    _lock = threading.Lock()
+
+    def send(self, notifications: list[Notification], on_sent: Callable[[Notification], None]) -> None:
+        with self._lock:
+            self.outbox.append(list(notifications))
+        for notification in notifications:
+            on_sent(notification)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls.outbox.clear()
+
+
+class TelegramNotifier(BaseNotifier):
+    """
+    Sends the notifications as Telegram messages from the bot with `TELEGRAM_BOT_TOKEN`.
+
+    The Bot API has no batch method, so the messages of a batch are sent one by one and
+    a failed message fails the rest of the batch, which is retried later.
+    Messages sent before the failure are reported through `on_sent` and are not retried.
+    """
+
+    def __init__(self):
+        self.url = TELEGRAM_API_URL.format(token=settings.TELEGRAM_BOT_TOKEN)
+
+    def send(self, notifications: list[Notification], on_sent: Callable[[Notification], None]) -> None:
+        for notification in notifications:
+            data = {'chat_id': notification.telegram_id, 'text': format_notification(notification)}
+            request = Request(
+                self.url,
+                data=json.dumps(data).encode(),
+                headers={'Content-Type': 'application/json'},
+            )
+            with urlopen(request, timeout=TELEGRAM_TIMEOUT):
+                pass
+            on_sent(notification)
+
+
+def get_notifier() -> BaseNotifier:
+    """Returns an instance of the `BUDGET_ALERTS_NOTIFIER` class."""
+    return import_string(settings.BUDGET_ALERTS_NOTIFIER)()
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """Returns the PostgreSQL planner estimate of the amount of rows of the queryset, `None` on other databases."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator of huge tables, which counts the objects with the planner estimate instead of COUNT(*).
+
+    Estimates below `exact_count_threshold` are replaced with the exact count, so small results are paginated
+    precisely and only the last pages of large ones may be empty or missing.
+    """
+
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+
+        return estimate
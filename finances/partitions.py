@@ -0,0 +1,203 @@
+import re
+from collections import defaultdict
+from datetime import date, timezone as dt_timezone
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+
+from finances.cache import invalidate_profile_cache
+from finances.models import Fund, Transaction, TransactionArchive
+from finances.services import FUND_BALANCE_SIGNS, PROFILE_BALANCE_SIGNS, lock_balances, update_balance_field
+from users.models import Profile
+
+TRANSACTIONS_TABLE = Transaction._meta.db_table
+DEFAULT_PARTITION = f'{TRANSACTIONS_TABLE}_default'
+TRANSACTION_COLUMNS = 'id, type, amount, comment, date_created, fund_id, user_profile_id, transfer_id'
+
+_RANGE_BOUND_RE = re.compile(r"FROM \((?:'(?P<start>[\d-]+)[^)]*|MINVALUE)\) TO \('(?P<end>[\d-]+)[^)]*\)")
+
+
+class PartitioningError(Exception):
+    """Raised when the transactions table is not partitioned by month."""
+
+
+class Partition(NamedTuple):
+    """
+    Fields:
+        name (str): partition table name
+        start (date): the first day of the partition range, `None` for the partition of all the earlier months
+        end (date): the day after the partition range
+    """
+    name: str
+    start: Optional[date]
+    end: date
+
+
+def add_months(day: date, months: int) -> date:
+    """Returns the first day of the month `months` after the month of the day."""
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _bound(day: date) -> str:
+    return f'{day.isoformat()} 00:00:00+00'
+
+
+def is_partitioned() -> bool:
+    """Returns whether the transactions table is a partitioned PostgreSQL table."""
+    if connection.vendor != 'postgresql':
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = %s::regclass', [TRANSACTIONS_TABLE])
+        return cursor.fetchone()[0] == 'p'
+
+
+def _check_partitioned() -> None:
+    if not is_partitioned():
+        raise PartitioningError('Transactions are stored in a partitioned table on PostgreSQL only')
+
+
+def get_partitions() -> list[Partition]:
+    """Returns the monthly range partitions of the transactions table ordered by date, without the default one."""
+    _check_partitioned()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass',
+            [TRANSACTIONS_TABLE],
+        )
+        bounds = cursor.fetchall()
+
+    partitions = []
+    for name, bound in bounds:
+        match = _RANGE_BOUND_RE.search(bound)
+        if match is None:
+            continue
+        start = date.fromisoformat(match['start']) if match['start'] else None
+        partitions.append(Partition(name, start, date.fromisoformat(match['end'])))
+
+    return sorted(partitions, key=lambda partition: partition.end)
+
+
+def create_partition(month: date) -> Optional[Partition]:
+    """
+    Creates the partition of the month unless the month is already covered, returns the created partition.
+
+    Transactions of the month that landed in the default partition are moved to the new one.
+    """
+    start = month.replace(day=1)
+    end = add_months(start, 1)
+    if any((partition.start or date.min) < end and start < partition.end for partition in get_partitions()):
+        return None
+
+    partition = Partition(f'{TRANSACTIONS_TABLE}_p{start:%Y_%m}', start, end)
+    bounds = [_bound(start), _bound(end)]
+    with db_transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {partition.name} (LIKE {TRANSACTIONS_TABLE} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date_created >= %s AND date_created < %s '
+            f'RETURNING *) INSERT INTO {partition.name} SELECT * FROM moved',
+            bounds,
+        )
+        cursor.execute(
+            f'ALTER TABLE {TRANSACTIONS_TABLE} ATTACH PARTITION {partition.name} FOR VALUES FROM (%s) TO (%s)',
+            bounds,
+        )
+
+    return partition
+
+
+def split_legacy_partition() -> list[Partition]:
+    """
+    Moves the rows of the partition of all the earlier months, the table attached by the partitioning migration,
+    to monthly partitions, so they are pruned and archived month by month.
+
+    The partition is detached, the monthly partitions of its rows are created and the rows are copied through
+    the partitioned table, in one DB transaction, so queries of the transactions wait for the copy.
+    Meant to be run once, off-peak. Returns the created partitions.
+    """
+    legacy = next((partition for partition in get_partitions() if partition.start is None), None)
+    if legacy is None:
+        return []
+
+    partitions = []
+    with db_transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {TRANSACTIONS_TABLE} DETACH PARTITION {legacy.name}')
+        cursor.execute(f'SELECT min(date_created) FROM {legacy.name}')
+        first_date_created = cursor.fetchone()[0]
+        start = legacy.end
+        if first_date_created is not None:
+            start = add_months(first_date_created.astimezone(dt_timezone.utc).date(), 0)
+        while start < legacy.end:
+            partition = Partition(f'{TRANSACTIONS_TABLE}_p{start:%Y_%m}', start, add_months(start, 1))
+            cursor.execute(
+                f'CREATE TABLE {partition.name} PARTITION OF {TRANSACTIONS_TABLE} FOR VALUES FROM (%s) TO (%s)',
+                [_bound(partition.start), _bound(partition.end)],
+            )
+            partitions.append(partition)
+            start = partition.end
+        cursor.execute(
+            f'INSERT INTO {TRANSACTIONS_TABLE} ({TRANSACTION_COLUMNS}) SELECT {TRANSACTION_COLUMNS} FROM {legacy.name}'
+        )
+        cursor.execute(f'DROP TABLE {legacy.name}')
+
+    return partitions
+
+
+def create_upcoming_partitions(months_ahead: int = 3, today: date = None) -> list[Partition]:
+    """Creates the missing partitions of the current month and `months_ahead` next months."""
+    today = today or timezone.now().date()
+    created = (create_partition(add_months(today, months)) for months in range(months_ahead + 1))
+    return [partition for partition in created if partition is not None]
+
+
+def _archive_partition(partition: Partition) -> int:
+    with connection.cursor() as cursor:
+        # A table with deferred constraint checks pending in the DB transaction cannot be dropped
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        cursor.execute(f'ALTER TABLE {TRANSACTIONS_TABLE} DETACH PARTITION {partition.name}')
+        cursor.execute(
+            f'SELECT fund_id, user_profile_id, type, sum(amount), count(*) FROM {partition.name} '
+            f'GROUP BY fund_id, user_profile_id, type'
+        )
+        totals = cursor.fetchall()
+
+        fund_deltas = defaultdict(Decimal)
+        profile_deltas = defaultdict(Decimal)
+        for fund_id, profile_id, transaction_type, amount, _ in totals:
+            fund_deltas[fund_id] += FUND_BALANCE_SIGNS[transaction_type] * amount
+            profile_deltas[profile_id] += PROFILE_BALANCE_SIGNS[transaction_type] * amount
+        lock_balances(fund_deltas.keys(), profile_deltas.keys())
+        now = timezone.now()
+        update_balance_field(Fund, 'opening_balance', fund_deltas, now)
+        update_balance_field(Profile, 'opening_balance', profile_deltas, now)
+
+        cursor.execute(
+            f'INSERT INTO {TransactionArchive._meta.db_table} ({TRANSACTION_COLUMNS}) '
+            f'SELECT {TRANSACTION_COLUMNS} FROM {partition.name}'
+        )
+        cursor.execute(f'DROP TABLE {partition.name}')
+
+    invalidate_profile_cache(profile_deltas.keys())
+    return sum(count for *_, count in totals)
+
+
+def archive_partitions(before: date) -> dict[str, int]:
+    """
+    Moves transactions of the partitions that end on or before the date to the archive table.
+
+    Each partition is detached and dropped, so no rows are deleted from the live table. The balance changes
+    of the archived transactions are added to the opening balances of their funds and profiles, so balances
+    still reconcile with the remaining transactions. Daily totals are kept, and `rebuild_daily_totals` sums
+    the archived transactions together with the live ones. Returns the amount of archived transactions by partition.
+    """
+    archived = {}
+    with db_transaction.atomic():
+        for partition in get_partitions():
+            if partition.end <= before:
+                archived[partition.name] = _archive_partition(partition)
+
+    return archived
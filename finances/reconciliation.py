@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Iterable, Iterator, NamedTuple
+
+from django.db import connection, transaction as db_transaction
+from django.db.models import Max, Min
+
+from finances.cache import invalidate_profile_cache
+from finances.models import Fund, Transaction
+from finances.services import (FUND_BALANCE_SIGNS, PROFILE_BALANCE_SIGNS, apply_balance_deltas, get_balance_change_sum,
+                               lock_balances)
+from users.models import Profile
+
+RECONCILIATION_CHUNK_SIZE = 1000
+
+
+class BalanceDrift(NamedTuple):
+    model: str
+    id: int
+    profile_id: int
+    balance: Decimal
+    expected_balance: Decimal
+
+    @property
+    def drift(self) -> Decimal:
+        return self.balance - self.expected_balance
+
+
+def find_drifts(profile_ids: Iterable[int] = None, start_id: int = None, end_id: int = None) -> list[BalanceDrift]:
+    """
+    Returns funds and profiles which balance differs from the opening balance plus the transactions changes.
+
+    Profiles are selected by IDs or by the `[start_id, end_id)` range. Balances of every model are
+    recomputed with one grouped aggregate query over the transactions of the selected profiles.
+    """
+    profile_filter = {'user_profile_id__in': profile_ids} if profile_ids is not None else {
+        'user_profile_id__gte': start_id,
+        'user_profile_id__lt': end_id,
+    }
+    profile_own_filter = {'id__in': profile_ids} if profile_ids is not None else {
+        'id__gte': start_id,
+        'id__lt': end_id,
+    }
+    transactions = Transaction.objects.filter(**profile_filter).order_by()
+
+    fund_changes = dict(
+        transactions
+        .values('fund_id')
+        .annotate(change=get_balance_change_sum(FUND_BALANCE_SIGNS))
+        .values_list('fund_id', 'change')
+    )
+    profile_changes = dict(
+        transactions
+        .values('user_profile_id')
+        .annotate(change=get_balance_change_sum(PROFILE_BALANCE_SIGNS))
+        .values_list('user_profile_id', 'change')
+    )
+
+    drifts = []
+    funds = Fund.objects.filter(**profile_filter).values_list('id', 'user_profile_id', 'balance', 'opening_balance')
+    for fund_id, profile_id, balance, opening_balance in funds:
+        expected_balance = opening_balance + fund_changes.get(fund_id, Decimal('0.00'))
+        if balance != expected_balance:
+            drifts.append(BalanceDrift('fund', fund_id, profile_id, balance, expected_balance))
+
+    profiles = Profile.objects.filter(**profile_own_filter).values_list('id', 'balance', 'opening_balance')
+    for profile_id, balance, opening_balance in profiles:
+        expected_balance = opening_balance + profile_changes.get(profile_id, Decimal('0.00'))
+        if balance != expected_balance:
+            drifts.append(BalanceDrift('profile', profile_id, profile_id, balance, expected_balance))
+
+    return drifts
+
+
+def confirm_drifts(drifts: list[BalanceDrift], repair: bool = False) -> list[BalanceDrift]:
+    """
+    Recomputes the drifted balances under row locks and returns the drifts that are still there.
+
+    Unlocked checks can see a transaction committed between two queries, the lock waits for writers
+    in progress. Confirmed drifts are fixed when `repair` is set.
+    """
+    if not drifts:
+        return []
+
+    profile_ids = {drift.profile_id for drift in drifts}
+    with db_transaction.atomic():
+        lock_balances(
+            Fund.objects.filter(user_profile_id__in=profile_ids).values_list('id', flat=True),
+            profile_ids,
+        )
+        confirmed = find_drifts(profile_ids=profile_ids)
+        if repair and confirmed:
+            apply_balance_deltas(
+                {drift.id: -drift.drift for drift in confirmed if drift.model == 'fund'},
+                {drift.id: -drift.drift for drift in confirmed if drift.model == 'profile'},
+            )
+            invalidate_profile_cache(drift.profile_id for drift in confirmed)
+
+    return confirmed
+
+
+def reconcile_range(start_id: int, end_id: int, repair: bool = False) -> list[BalanceDrift]:
+    """Returns (and optionally repairs) confirmed drifts of the profiles with IDs in `[start_id, end_id)`."""
+    return confirm_drifts(find_drifts(start_id=start_id, end_id=end_id), repair)
+
+
+def get_profile_ranges(chunk_size: int = RECONCILIATION_CHUNK_SIZE) -> Iterator[tuple[int, int]]:
+    """Yields `[start_id, end_id)` ranges covering all the profile IDs."""
+    bounds = Profile.objects.aggregate(min_id=Min('id'), max_id=Max('id'))
+    if bounds['min_id'] is None:
+        return
+
+    for start_id in range(bounds['min_id'], bounds['max_id'] + 1, chunk_size):
+        yield start_id, start_id + chunk_size
+
+
+def _reconcile_range_in_thread(start_id: int, end_id: int, repair: bool) -> list[BalanceDrift]:
+    try:
+        return reconcile_range(start_id, end_id, repair)
+    finally:
+        connection.close()
+
+
+def reconcile_balances(
+        repair: bool = False,
+        chunk_size: int = RECONCILIATION_CHUNK_SIZE,
+        workers: int = 1,
+) -> Iterator[list[BalanceDrift]]:
+    """
+    Checks the balances of all the profiles chunk by chunk, yielding confirmed drifts of every chunk.
+
+    With several workers the chunks are checked in parallel threads, each with its own DB connection.
+    """
+    ranges = list(get_profile_ranges(chunk_size))
+    if workers <= 1:
+        for start_id, end_id in ranges:
+            yield reconcile_range(start_id, end_id, repair)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(lambda bounds: _reconcile_range_in_thread(*bounds, repair), ranges)
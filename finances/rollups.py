@@ -0,0 +1,215 @@
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Iterable, Optional
+
+from django.db import connection, transaction as db_transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from finances.models import BalanceSnapshot, Transaction, TransactionArchive, TransactionDailyTotal
+from jobs.queue import enqueue
+from users.models import Profile
+
+DAILY_TOTALS_BATCH_SIZE = 100
+
+# Registered by `finances.tasks`
+WRITE_PROFILE_SNAPSHOTS_TASK = 'finances.write_profile_balance_snapshots'
+
+DAILY_TOTAL_COLUMNS = ('user_profile_id', 'fund_id', 'type', 'day', 'amount', 'transactions_count')
+
+# Transaction fields which define the daily bucket of a transaction and its part of it
+DAILY_BUCKET_FIELDS = ('user_profile_id', 'fund_id', 'type', 'date_created', 'amount')
+
+
+def _upsert_daily_totals(rows: list[tuple]) -> None:
+    """
+    Adds the rows to the daily totals with a single `INSERT ... ON CONFLICT DO UPDATE` statement.
+
+    Both PostgreSQL and SQLite support the statement, which increments the existing buckets
+    atomically, so concurrent writers never overwrite each other's totals.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(TransactionDailyTotal._meta.db_table)
+    fields = [TransactionDailyTotal._meta.get_field(column) for column in DAILY_TOTAL_COLUMNS]
+    placeholders = ', '.join(['(' + ', '.join(['%s'] * len(DAILY_TOTAL_COLUMNS)) + ')'] * len(rows))
+    sql = (
+        f'INSERT INTO {table} ({", ".join(quote_name(column) for column in DAILY_TOTAL_COLUMNS)}) '
+        f'VALUES {placeholders} '
+        f'ON CONFLICT ({quote_name("fund_id")}, {quote_name("type")}, {quote_name("day")}) DO UPDATE SET '
+        f'{quote_name("amount")} = {table}.{quote_name("amount")} + EXCLUDED.{quote_name("amount")}, '
+        f'{quote_name("transactions_count")} = '
+        f'{table}.{quote_name("transactions_count")} + EXCLUDED.{quote_name("transactions_count")}'
+    )
+    params = [
+        field.get_db_prep_value(value, connection)
+        for row in rows
+        for field, value in zip(fields, row)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _get_daily_buckets(transactions: Iterable[Transaction]) -> list[tuple]:
+    """Returns sorted daily total rows of the transactions, concurrent writers lock the buckets in the same order."""
+    buckets = defaultdict(lambda: [Decimal('0.00'), 0])
+    for transaction in transactions:
+        day = timezone.localtime(transaction.date_created).date()
+        bucket = buckets[(transaction.user_profile_id, transaction.fund_id, transaction.type, day)]
+        bucket[0] += transaction.amount
+        bucket[1] += 1
+
+    return [(*key, amount, count) for key, (amount, count) in sorted(buckets.items())]
+
+
+def update_daily_totals(transactions: Iterable[Transaction]) -> None:
+    """Adds the transactions to the daily totals, issuing one statement per batch of affected buckets."""
+    rows = _get_daily_buckets(transactions)
+    for start in range(0, len(rows), DAILY_TOTALS_BATCH_SIZE):
+        _upsert_daily_totals(rows[start:start + DAILY_TOTALS_BATCH_SIZE])
+
+
+def subtract_daily_totals(transactions: Iterable[Transaction]) -> None:
+    """
+    Takes the transactions out of the daily totals, buckets left without transactions are deleted.
+
+    Used for the transactions saved or deleted one by one, which touch a bucket or two, so every bucket
+    is updated by its own statement.
+    """
+    for _, fund_id, transaction_type, day, amount, count in _get_daily_buckets(transactions):
+        buckets = TransactionDailyTotal.objects.filter(fund_id=fund_id, type=transaction_type, day=day)
+        buckets.filter(transactions_count__lte=count).delete()
+        buckets.update(amount=F('amount') - amount, transactions_count=F('transactions_count') - count)
+
+
+def load_daily_bucket_fields(transaction: Transaction) -> None:
+    """
+    Reads the saved daily bucket fields of the transaction which were not loaded with it, like deferred ones,
+    so the transaction can be moved out of its saved bucket by the next save.
+    """
+    loaded_values = getattr(transaction, '_loaded_values', {})
+    missing_fields = [field for field in DAILY_BUCKET_FIELDS if field not in loaded_values]
+    if transaction.pk is None or not missing_fields:
+        return
+
+    saved_values = Transaction.objects.filter(id=transaction.pk).values(*missing_fields).first()
+    if saved_values is not None:
+        transaction._loaded_values = {**loaded_values, **saved_values}
+
+
+def get_loaded_transaction(transaction: Transaction) -> Optional[Transaction]:
+    """
+    Returns the transaction as it was loaded from the DB, `None` if the fields of its daily bucket were not loaded.
+    """
+    loaded_values = getattr(transaction, '_loaded_values', {})
+    if any(field not in loaded_values for field in DAILY_BUCKET_FIELDS):
+        return None
+
+    return Transaction(**{field: loaded_values[field] for field in DAILY_BUCKET_FIELDS})
+
+
+def get_saved_transaction(transaction: Transaction) -> Transaction:
+    """Returns the daily bucket fields of the saved transaction, deferred ones are taken from the loaded values."""
+    deferred_fields = transaction.get_deferred_fields()
+    loaded_values = getattr(transaction, '_loaded_values', {})
+
+    return Transaction(**{
+        field: loaded_values[field] if field in deferred_fields else getattr(transaction, field)
+        for field in DAILY_BUCKET_FIELDS
+    })
+
+
+def delete_outdated_balance_snapshots(transactions: Iterable[Transaction]) -> None:
+    """
+    Deletes the balance snapshots of the profiles which the transactions made before today changed,
+    and queues a job writing them again.
+
+    Snapshots of a profile are deleted from the first changed day on, the earlier of the saved and the new date
+    of an edited transaction, so historical balances of those days fall back to the earlier snapshots until
+    the job writes them. Only past days are snapshotted, so transactions made today, the usual case, cost no query.
+    """
+    today = timezone.localdate()
+    first_days = {}
+    for transaction in transactions:
+        dates = (transaction.date_created, getattr(transaction, '_loaded_values', {}).get('date_created'))
+        day = timezone.localtime(min(date for date in dates if date is not None)).date()
+        if day < first_days.get(transaction.user_profile_id, today):
+            first_days[transaction.user_profile_id] = day
+
+    if not first_days:
+        return
+
+    snapshots = BalanceSnapshot.objects.filter(
+        reduce(or_, (Q(user_profile_id=profile_id, day__gte=day) for profile_id, day in first_days.items()))
+    )
+    outdated_days = defaultdict(list)
+    for profile_id, day in snapshots.filter(fund__isnull=True).values_list('user_profile_id', 'day'):
+        outdated_days[profile_id].append(day.isoformat())
+    snapshots.delete()
+
+    for profile_id, days in outdated_days.items():
+        enqueue(WRITE_PROFILE_SNAPSHOTS_TASK, {'profile_id': profile_id, 'days': sorted(days)})
+
+
+def lock_profile_daily_totals(profile_id: int) -> None:
+    """
+    Locks the profile row until the end of the DB transaction, like the balance writers do before adding
+    to the profile daily totals, so a rebuild of the totals never loses their concurrent upserts.
+    """
+    list(Profile.objects.select_for_update(no_key=True).filter(id=profile_id).values_list('id'))
+
+
+def _rebuild_profile_daily_totals(profile_id: int, batch_size: int) -> int:
+    with db_transaction.atomic():
+        lock_profile_daily_totals(profile_id)
+        buckets = defaultdict(lambda: [Decimal('0.00'), 0])
+        for model in (Transaction, TransactionArchive):
+            model_buckets = (
+                model.objects
+                .filter(user_profile_id=profile_id)
+                .annotate(day=TruncDate('date_created'))
+                .values('fund_id', 'type', 'day')
+                .annotate(total_amount=Sum('amount'), total_count=Count('id'))
+                .values_list('fund_id', 'type', 'day', 'total_amount', 'total_count')
+                .order_by()
+            )
+            for *key, total_amount, total_count in model_buckets.iterator(chunk_size=batch_size):
+                bucket = buckets[tuple(key)]
+                bucket[0] += total_amount
+                bucket[1] += total_count
+
+        TransactionDailyTotal.objects.filter(user_profile_id=profile_id).delete()
+        TransactionDailyTotal.objects.bulk_create(
+            (
+                TransactionDailyTotal(
+                    type=transaction_type,
+                    day=day,
+                    amount=amount,
+                    transactions_count=count,
+                    fund_id=fund_id,
+                    user_profile_id=profile_id,
+                )
+                for (fund_id, transaction_type, day), (amount, count) in buckets.items()
+            ),
+            batch_size=batch_size,
+        )
+
+    return len(buckets)
+
+
+def rebuild_daily_totals(profile_id: Optional[int] = None, batch_size: int = 1000) -> int:
+    """
+    Recomputes the daily totals of one or all profiles from the transactions.
+
+    Archived transactions keep their buckets, archiving moves the transactions without changing the totals.
+    Every profile is rebuilt in its own DB transaction under the profile lock, so the concurrent writers
+    of the profile wait for its rebuild only. Returns amount of created daily buckets.
+    """
+    if profile_id is not None:
+        profile_ids = [profile_id]
+    else:
+        profile_ids = list(Profile.objects.order_by('id').values_list('id', flat=True))
+
+    return sum(_rebuild_profile_daily_totals(profile_id, batch_size) for profile_id in profile_ids)
@@ -0,0 +1,67 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import QuerySet
+
+from finances.models import Fund, Transaction
+
+# Text search configuration without stemming, since comments and fund names are written in different languages.
+# The transaction comments index is built with it, see the `0013_transaction_comment_search` migration
+SEARCH_CONFIG = 'simple'
+SEARCH_MAX_TERMS = 8
+# Most recent matching transactions ranked per search, so common words do not rank the whole history
+SEARCH_MAX_CANDIDATES = 500
+
+
+def get_search_terms(text: str) -> list[str]:
+    """Splits the text into lowercase words, every word is matched as a prefix."""
+    return re.findall(r'\w+', text.lower())[:SEARCH_MAX_TERMS]
+
+
+def get_search_query(terms: list[str]) -> SearchQuery:
+    # The terms contain only word characters, so they are safe to quote in a raw query
+    return SearchQuery(' & '.join(f"'{term}':*" for term in terms), config=SEARCH_CONFIG, search_type='raw')
+
+
+def search_transactions(profile_id: int, terms: list[str], limit: int) -> list[Transaction]:
+    """
+    Returns the profile transactions with comments containing words starting with all the terms,
+    best ranked first and annotated with `rank`.
+
+    The comments are matched with the full-text index and ranked by `ts_rank`. Only the most recent
+    `SEARCH_MAX_CANDIDATES` matches are fetched and ranked, newer ones first among equally ranked.
+    """
+    vector = SearchVector('comment', config=SEARCH_CONFIG)
+    query = get_search_query(terms)
+    candidates = (
+        Transaction.objects
+        .filter(user_profile_id=profile_id)
+        .alias(search=vector)
+        .filter(search=query)
+        .annotate(rank=SearchRank(vector, query))
+        .order_by('-date_created', '-id')[:SEARCH_MAX_CANDIDATES]
+    )
+
+    return sorted(candidates, key=lambda transaction: -transaction.rank)[:limit]
+
+
+def search_funds(profile_id: int, terms: list[str], limit: int) -> QuerySet:
+    """
+    Returns the profile funds with names or descriptions containing words starting with all the terms,
+    best ranked first and annotated with `rank`. Name matches rank above description matches.
+    """
+    # A profile has few funds, so they are matched without an index
+    vector = (
+        SearchVector('name', config=SEARCH_CONFIG, weight='A')
+        + SearchVector('description', config=SEARCH_CONFIG, weight='B')
+    )
+    query = get_search_query(terms)
+
+    return (
+        Fund.objects
+        .filter(user_profile_id=profile_id)
+        .annotate(search=vector)
+        .filter(search=query)
+        .annotate(rank=SearchRank(vector, query))
+        .order_by('-rank', 'name', 'id')[:limit]
+    )
@@ -0,0 +1,314 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework.serializers import (BooleanField, CharField, ChoiceField, DateField, DecimalField, FileField,
+                                        FloatField, IntegerField, ListField, ListSerializer, ModelSerializer,
+                                        PrimaryKeyRelatedField, Serializer, ValidationError)
+
+from finances.analytics import GRANULARITIES, GRANULARITY_DAY, GRANULARITY_MONTH, get_periods
+from finances.importers import IMPORT_DEFAULT_FUND_NAME
+from finances.models import BudgetPeriodChoices, Fund, Transaction, TransactionImport, Transfer
+from finances.search import get_search_terms
+from finances.services import bulk_create_transactions, create_transfer
+
+TRANSACTIONS_BULK_CREATE_MAX_SIZE = 5000
+
+# Periods returned by default and at most, so a series stays small enough to be computed per request
+ANALYTICS_DEFAULT_PERIODS = {GRANULARITY_DAY: 30, GRANULARITY_MONTH: 12}
+ANALYTICS_MAX_PERIODS = {GRANULARITY_DAY: 366, GRANULARITY_MONTH: 120}
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+
+class ProfileFundField(PrimaryKeyRelatedField):
+    """
+    Resolves fund IDs against the funds of the profile passed in the serializer context.
+
+    The funds are loaded once and shared through the context, so validating a list of
+    transactions does not issue a query per item.
+    """
+
+    def get_queryset(self):
+        return Fund.objects.filter(user_profile=self.context['profile'])
+
+    def to_internal_value(self, data):
+        if 'profile_funds' not in self.context:
+            self.context['profile_funds'] = {fund.id: fund for fund in self.get_queryset()}
+
+        try:
+            return self.context['profile_funds'][int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class TransactionBulkCreateSerializer(ListSerializer):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('allow_empty', False)
+        kwargs.setdefault('max_length', TRANSACTIONS_BULK_CREATE_MAX_SIZE)
+        super().__init__(*args, **kwargs)
+
+    def create(self, validated_data):
+        return bulk_create_transactions([Transaction(**attrs) for attrs in validated_data])
+
+
+class TransactionSerializer(ModelSerializer):
+    fund = ProfileFundField()
+
+    class Meta:
+        model = Transaction
+        list_serializer_class = TransactionBulkCreateSerializer
+        fields = (
+            'id',
+            'type',
+            'amount',
+            'comment',
+            'date_created',
+            'fund',
+            'transfer',
+        )
+        read_only_fields = (
+            'date_created',
+            'transfer',
+        )
+
+
+class TransferSerializer(ModelSerializer):
+    source_fund = ProfileFundField(required=False, allow_null=True)
+    destination_fund = ProfileFundField(required=False, allow_null=True)
+    amount = DecimalField(decimal_places=2, max_digits=15, min_value=Decimal('0.01'))
+
+    class Meta:
+        model = Transfer
+        fields = (
+            'id',
+            'amount',
+            'comment',
+            'date_created',
+            'source_fund',
+            'destination_fund',
+        )
+        read_only_fields = (
+            'date_created',
+        )
+
+    def validate(self, attrs):
+        source_fund = attrs.get('source_fund')
+        destination_fund = attrs.get('destination_fund')
+        if source_fund is None and destination_fund is None:
+            raise ValidationError('Either source or destination fund is required.')
+        if source_fund == destination_fund:
+            raise ValidationError('Source and destination funds must differ.')
+
+        # The same amount leaves one side and enters the other, so both sides must be in one currency
+        profile_currency_id = self.context['profile'].currency_id
+        currency_ids = {
+            fund.currency_id or profile_currency_id if fund else profile_currency_id
+            for fund in (source_fund, destination_fund)
+        }
+        if len(currency_ids) > 1:
+            raise ValidationError('Source and destination funds must be in the same currency.')
+
+        return attrs
+
+    def create(self, validated_data):
+        return create_transfer(Transfer(**validated_data))
+
+
+class TransactionImportSerializer(ModelSerializer):
+    file = FileField(write_only=True)
+    file_format = ChoiceField(choices=TransactionImport.FileFormatChoices.choices, required=False)
+    default_fund = CharField(
+        write_only=True,
+        required=False,
+        max_length=Fund._meta.get_field('name').max_length,
+        default=IMPORT_DEFAULT_FUND_NAME,
+    )
+    background = BooleanField(write_only=True, default=False)
+
+    class Meta:
+        model = TransactionImport
+        fields = (
+            'id',
+            'file',
+            'file_name',
+            'file_format',
+            'default_fund',
+            'background',
+            'status',
+            'rows_committed',
+            'error',
+            'date_created',
+            'date_updated',
+        )
+        read_only_fields = (
+            'file_name',
+            'status',
+            'rows_committed',
+            'error',
+            'date_created',
+            'date_updated',
+        )
+
+
+class UserBudgetStatusSerializer(Serializer):
+    id = IntegerField()
+    period = ChoiceField(choices=BudgetPeriodChoices.choices)
+    amount = DecimalField(decimal_places=2, max_digits=15)
+    start_date = DateField()
+    end_date = DateField()
+    spent = DecimalField(decimal_places=2, max_digits=15)
+    remaining = DecimalField(decimal_places=2, max_digits=15)
+
+
+class FundBudgetStatusSerializer(UserBudgetStatusSerializer):
+    fund = IntegerField()
+
+
+class BudgetsStatusSerializer(Serializer):
+    user_budgets = UserBudgetStatusSerializer(many=True)
+    fund_budgets = FundBudgetStatusSerializer(many=True)
+
+
+class SpendingAnalyticsQuerySerializer(Serializer):
+    granularity = ChoiceField(choices=tuple(GRANULARITIES), default=GRANULARITY_MONTH)
+    date_from = DateField(required=False)
+    date_to = DateField(required=False)
+    window = IntegerField(min_value=1, max_value=24, default=3)
+    forecast = IntegerField(min_value=0, max_value=24, default=3)
+    fund = IntegerField(required=False)
+
+    def validate(self, attrs):
+        granularity = attrs['granularity']
+        attrs.setdefault('date_to', timezone.localdate())
+        if 'date_from' not in attrs:
+            periods_count = ANALYTICS_DEFAULT_PERIODS[granularity]
+            if granularity == GRANULARITY_DAY:
+                attrs['date_from'] = attrs['date_to'] - timedelta(days=periods_count - 1)
+            else:
+                month = attrs['date_to'].year * 12 + attrs['date_to'].month - periods_count
+                attrs['date_from'] = attrs['date_to'].replace(year=month // 12, month=month % 12 + 1, day=1)
+
+        if attrs['date_from'] > attrs['date_to']:
+            raise ValidationError({'date_from': ['Should not be later than the end date.']})
+        if len(get_periods(attrs['date_from'], attrs['date_to'], granularity)) > ANALYTICS_MAX_PERIODS[granularity]:
+            raise ValidationError(
+                {'date_from': [f'At most {ANALYTICS_MAX_PERIODS[granularity]} periods can be requested.']}
+            )
+
+        return attrs
+
+
+class SpendingSeriesSerializer(Serializer):
+    fund = IntegerField()
+    type = ChoiceField(choices=Transaction.TransactionTypeChoices.choices)
+    amounts = ListField(child=DecimalField(decimal_places=2, max_digits=15))
+    moving_average = ListField(child=DecimalField(decimal_places=2, max_digits=15, allow_null=True))
+    deltas = ListField(child=DecimalField(decimal_places=2, max_digits=15, allow_null=True))
+    delta_percents = ListField(child=DecimalField(decimal_places=2, max_digits=15, allow_null=True))
+    slope = FloatField()
+    forecast = ListField(child=DecimalField(decimal_places=2, max_digits=15))
+
+
+class SpendingAnalyticsSerializer(Serializer):
+    granularity = CharField()
+    periods = ListField(child=DateField())
+    series = SpendingSeriesSerializer(many=True)
+
+
+class SearchQuerySerializer(Serializer):
+    q = CharField(max_length=200)
+    limit = IntegerField(min_value=1, max_value=SEARCH_MAX_LIMIT, default=SEARCH_DEFAULT_LIMIT)
+
+    def validate_q(self, value):
+        terms = get_search_terms(value)
+        if not terms:
+            raise ValidationError('Should contain at least one word.')
+
+        return terms
+
+
+class TransactionSearchResultSerializer(ModelSerializer):
+    rank = FloatField()
+
+    class Meta:
+        model = Transaction
+        fields = (
+            'id',
+            'type',
+            'amount',
+            'comment',
+            'date_created',
+            'fund',
+            'transfer',
+            'rank',
+        )
+
+
+class FundSearchResultSerializer(ModelSerializer):
+    rank = FloatField()
+
+    class Meta:
+        model = Fund
+        fields = (
+            'id',
+            'name',
+            'description',
+            'balance',
+            'rank',
+        )
+
+
+class SearchResultsSerializer(Serializer):
+    transactions = TransactionSearchResultSerializer(many=True)
+    funds = FundSearchResultSerializer(many=True)
+
+
+class BalanceHistoryQuerySerializer(Serializer):
+    date = DateField()
+
+    def validate_date(self, value):
+        if value > timezone.localdate():
+            raise ValidationError('Should not be in the future.')
+
+        return value
+
+
+class FundBalanceSerializer(Serializer):
+    fund = IntegerField()
+    balance = DecimalField(decimal_places=2, max_digits=15)
+
+
+class BalanceHistorySerializer(Serializer):
+    date = DateField()
+    balance = DecimalField(decimal_places=2, max_digits=15)
+    funds = FundBalanceSerializer(many=True)
+
+
+class ConsolidatedBalanceQuerySerializer(Serializer):
+    currency = CharField(required=False, min_length=3, max_length=3)
+    date_from = DateField(required=False)
+    date_to = DateField(required=False)
+
+    def validate_currency(self, value):
+        return value.upper()
+
+    def validate(self, attrs):
+        # The change is reported for the current month by default
+        attrs.setdefault('date_to', timezone.localdate())
+        attrs.setdefault('date_from', attrs['date_to'].replace(day=1))
+        if attrs['date_from'] > attrs['date_to']:
+            raise ValidationError({'date_from': ['Should not be later than the end date.']})
+
+        return attrs
+
+
+class ConsolidatedBalanceSerializer(Serializer):
+    currency = CharField()
+    balance = DecimalField(decimal_places=2, max_digits=15)
+    date_from = DateField()
+    date_to = DateField()
+    change = DecimalField(decimal_places=2, max_digits=15)
@@ -0,0 +1,143 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction as db_transaction
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.utils import timezone
+
+from finances.alerts import schedule_budget_alerts
+from finances.cache import invalidate_profile_cache
+from finances.models import Fund, Transaction, Transfer
+from finances.rollups import delete_outdated_balance_snapshots, update_daily_totals
+from users.models import Profile
+
+TRANSACTIONS_BULK_CREATE_BATCH_SIZE = 1000
+
+# How a transaction amount affects the balance of its fund and the non-distributed profile balance.
+# A transfer allocates money from the profile balance to the fund (a negative amount moves it back).
+FUND_BALANCE_SIGNS = {
+    Transaction.TransactionTypeChoices.INCOME: 1,
+    Transaction.TransactionTypeChoices.EXPENSE: -1,
+    Transaction.TransactionTypeChoices.TRANSFER: 1,
+}
+PROFILE_BALANCE_SIGNS = {
+    Transaction.TransactionTypeChoices.INCOME: 0,
+    Transaction.TransactionTypeChoices.EXPENSE: 0,
+    Transaction.TransactionTypeChoices.TRANSFER: -1,
+}
+
+
+def get_balance_change_sum(signs: dict) -> Sum:
+    """Returns an aggregate of the balance change caused by transactions or daily totals following the `signs`."""
+    return Sum(
+        Case(
+            *(When(type=transaction_type, then=F('amount') * sign) for transaction_type, sign in signs.items()),
+            default=Value(Decimal('0.00')),
+            output_field=DecimalField(decimal_places=2, max_digits=15),
+        )
+    )
+
+
+def get_balance_deltas(transactions: Iterable[Transaction]) -> tuple[dict[int, Decimal], dict[int, Decimal]]:
+    """Returns balance changes caused by the transactions, grouped by fund ID and by profile ID."""
+    fund_deltas = defaultdict(Decimal)
+    profile_deltas = defaultdict(Decimal)
+    for transaction in transactions:
+        fund_deltas[transaction.fund_id] += FUND_BALANCE_SIGNS[transaction.type] * transaction.amount
+        profile_deltas[transaction.user_profile_id] += PROFILE_BALANCE_SIGNS[transaction.type] * transaction.amount
+
+    return fund_deltas, profile_deltas
+
+
+def lock_balances(fund_ids: Iterable[int], profile_ids: Iterable[int]) -> None:
+    """
+    Locks the fund rows and then the profile rows in ascending ID order until the end of the DB transaction.
+
+    Every balance writer locks rows in this order before changing them, so concurrent writers
+    of the same balances wait for each other instead of deadlocking. `FOR NO KEY UPDATE` does not
+    conflict with the key share locks taken by inserting rows that reference the funds.
+    """
+    for model, ids in ((Fund, fund_ids), (Profile, profile_ids)):
+        ids = sorted(set(ids))
+        if ids:
+            list(model.objects.select_for_update(no_key=True).filter(id__in=ids).order_by('id').values_list('id'))
+
+
+def update_balance_field(model, field: str, deltas: dict[int, Decimal], now) -> None:
+    """Adds the deltas to the balance `field` of the fund or profile rows with one aggregated `F()` update."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    change = Case(
+        *(When(id=pk, then=Value(delta)) for pk, delta in deltas.items()),
+        output_field=DecimalField(decimal_places=2, max_digits=15),
+    )
+    model.objects.filter(id__in=deltas).update(**{field: F(field) + change}, date_updated=now)
+
+
+def apply_balance_deltas(fund_deltas: dict[int, Decimal], profile_deltas: dict[int, Decimal]) -> None:
+    """
+    Applies balance changes with one aggregated `F()` update of all the affected funds and one of the profiles.
+
+    The rows must be locked with `lock_balances` beforehand.
+    """
+    now = timezone.now()
+    update_balance_field(Fund, 'balance', fund_deltas, now)
+    update_balance_field(Profile, 'balance', profile_deltas, now)
+
+
+def bulk_create_transactions(transactions: list[Transaction]) -> list[Transaction]:
+    """
+    Inserts the transactions with `bulk_create`.
+
+    Affected balances and daily totals are updated and outdated balance snapshots are deleted in the same
+    DB transaction. `bulk_create` does not send model signals, so the profile cache is invalidated
+    and budget alerts are scheduled here.
+    """
+    fund_deltas, profile_deltas = get_balance_deltas(transactions)
+    with db_transaction.atomic():
+        lock_balances(fund_deltas.keys(), profile_deltas.keys())
+        created = Transaction.objects.bulk_create(transactions, batch_size=TRANSACTIONS_BULK_CREATE_BATCH_SIZE)
+        apply_balance_deltas(fund_deltas, profile_deltas)
+        update_daily_totals(created)
+        delete_outdated_balance_snapshots(created)
+        invalidate_profile_cache(profile_deltas.keys())
+        schedule_budget_alerts(
+            transaction.user_profile_id for transaction in transactions
+            if transaction.type == Transaction.TransactionTypeChoices.EXPENSE
+        )
+
+    return created
+
+
+def create_transfer(transfer: Transfer) -> Transfer:
+    """
+    Saves the transfer together with its legs and moves the money in one atomic operation.
+
+    Between two funds the profile balance does not change, and both fund balances are changed
+    with a single UPDATE statement.
+    """
+    legs = []
+    sides = ((transfer.source_fund_id, -transfer.amount), (transfer.destination_fund_id, transfer.amount))
+    for fund_id, amount in sides:
+        if fund_id is not None:
+            legs.append(
+                Transaction(
+                    type=Transaction.TransactionTypeChoices.TRANSFER,
+                    amount=amount,
+                    comment=transfer.comment,
+                    date_created=transfer.date_created,
+                    fund_id=fund_id,
+                    user_profile_id=transfer.user_profile_id,
+                )
+            )
+
+    with db_transaction.atomic():
+        transfer.save()
+        for leg in legs:
+            leg.transfer = transfer
+        bulk_create_transactions(legs)
+
+    return transfer
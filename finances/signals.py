@@ -0,0 +1,84 @@
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from finances.alerts import schedule_budget_alerts
+from finances.cache import invalidate_profile_cache
+from finances.currencies import invalidate_rate_index
+from finances.models import ExchangeRate, Fund, FundBudget, Transaction, Transfer, UserBudget
+from finances.rollups import (delete_outdated_balance_snapshots, get_loaded_transaction, get_saved_transaction,
+                              load_daily_bucket_fields, lock_profile_daily_totals, subtract_daily_totals,
+                              update_daily_totals)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Fund)
+@receiver(post_delete, sender=Fund)
+@receiver(post_save, sender=UserBudget)
+@receiver(post_delete, sender=UserBudget)
+def invalidate_profile_cache_on_change(sender, instance, **kwargs):
+    """Drops cached data of the profile which transaction, fund or budget was changed."""
+    invalidate_profile_cache((instance.user_profile_id,))
+
+
+@receiver(post_save, sender=Transaction)
+def schedule_budget_alerts_on_expense(sender, instance, **kwargs):
+    """Schedules budget alerts of the profile which expense was saved."""
+    if instance.type == Transaction.TransactionTypeChoices.EXPENSE:
+        schedule_budget_alerts((instance.user_profile_id,))
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def delete_outdated_balance_snapshots_on_change(sender, instance, **kwargs):
+    """Deletes balance snapshots of the profile taken after the day of the saved or deleted transaction."""
+    delete_outdated_balance_snapshots((instance,))
+
+
+@receiver(pre_save, sender=Transaction)
+def load_daily_bucket_on_save(sender, instance, **kwargs):
+    """Reads the saved daily bucket of the transaction before the save, if it was not loaded with all its fields."""
+    load_daily_bucket_fields(instance)
+
+
+@receiver(post_save, sender=Transaction)
+def update_daily_totals_on_save(sender, instance, created, **kwargs):
+    """
+    Moves the saved transaction from the daily bucket it was saved in to its current one.
+
+    `bulk_create_transactions` sends no signals and updates the totals itself, so only the transactions
+    saved one by one, like by the admin, get here. The profile is locked like by the balance writers,
+    so a concurrent rebuild of its totals does not lose the change.
+    """
+    with db_transaction.atomic():
+        lock_profile_daily_totals(instance.user_profile_id)
+        loaded_transaction = None if created else get_loaded_transaction(instance)
+        if loaded_transaction is not None:
+            subtract_daily_totals((loaded_transaction,))
+        update_daily_totals((get_saved_transaction(instance),))
+
+
+@receiver(post_delete, sender=Transaction)
+def subtract_daily_totals_on_delete(sender, instance, origin, **kwargs):
+    """
+    Takes the deleted transaction out of its daily bucket.
+
+    Transactions deleted together with their fund or profile are skipped, the buckets are deleted with them.
+    """
+    if getattr(origin, 'model', type(origin)) in (Transaction, Transfer):
+        subtract_daily_totals((get_loaded_transaction(instance) or instance,))
+
+
+@receiver(post_save, sender=FundBudget)
+@receiver(post_delete, sender=FundBudget)
+def invalidate_profile_cache_on_fund_budget_change(sender, instance, **kwargs):
+    """Drops cached data of the profile which fund budget was changed."""
+    invalidate_profile_cache(Fund.objects.filter(id=instance.fund_id).values_list('user_profile_id', flat=True))
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def invalidate_rate_index_on_change(sender, instance, **kwargs):
+    """Makes every process reload the exchange rates after a rate was changed."""
+    invalidate_rate_index()
@@ -0,0 +1,243 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import DecimalField, F, Max, OuterRef, Q, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from finances.models import BalanceSnapshot, Fund, Transaction, TransactionArchive
+from finances.reconciliation import get_profile_ranges
+from finances.services import FUND_BALANCE_SIGNS, PROFILE_BALANCE_SIGNS, get_balance_change_sum, lock_balances
+from users.models import Profile
+
+SNAPSHOTS_CHUNK_SIZE = 1000
+
+# Archived transactions keep changing the balances at the days after them
+CHANGE_MODELS = (Transaction, TransactionArchive)
+
+
+def get_day_end(day: date) -> datetime:
+    """Returns the start of the next day in the current time zone, transactions made before it belong to the day."""
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def _get_change_since(model, signs: dict, since: datetime, **outer_refs) -> Coalesce:
+    """Returns a subquery of the balance change caused by the transactions made since the date, grouped by the refs."""
+    changes = (
+        model.objects
+        .filter(date_created__gte=since, **{field: OuterRef(ref) for field, ref in outer_refs.items()})
+        .order_by()
+        .values(*outer_refs)
+        .annotate(change=get_balance_change_sum(signs))
+        .values('change')
+    )
+
+    return Coalesce(
+        Subquery(changes),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(decimal_places=2, max_digits=15),
+    )
+
+
+def _annotate_day_end_balances(queryset: QuerySet, signs: dict, day_end: datetime, **outer_refs) -> QuerySet:
+    """
+    Annotates the funds or profiles created by the end of a day with their balance at that time.
+
+    The balance is the current one less the changes made after the day, read by one statement, so it is
+    consistent with the balance without locks.
+    """
+    balance = F('balance')
+    for model in CHANGE_MODELS:
+        balance -= _get_change_since(model, signs, day_end, **outer_refs)
+
+    return queryset.filter(date_created__lt=day_end).annotate(day_end_balance=balance)
+
+
+def _get_fund_balances(funds: QuerySet, day_end: datetime) -> QuerySet:
+    return _annotate_day_end_balances(
+        funds,
+        FUND_BALANCE_SIGNS,
+        day_end,
+        user_profile_id='user_profile_id',
+        fund_id='id',
+    ).values_list('id', 'user_profile_id', 'day_end_balance')
+
+
+def _get_profile_balances(profiles: QuerySet, day_end: datetime) -> QuerySet:
+    return _annotate_day_end_balances(
+        profiles,
+        PROFILE_BALANCE_SIGNS,
+        day_end,
+        user_profile_id='id',
+    ).values_list('id', 'day_end_balance')
+
+
+def write_range_snapshots(day: date, start_id: int, end_id: int) -> int:
+    """
+    Replaces the snapshots of the day of profiles with IDs in `[start_id, end_id)` and their funds.
+
+    The balances are locked like by the balance writers, so an import of the day transactions committed
+    meanwhile cannot delete the outdated snapshots before they are written. Returns amount of written snapshots.
+    """
+    day_end = get_day_end(day)
+    funds = Fund.objects.filter(user_profile_id__gte=start_id, user_profile_id__lt=end_id)
+    profiles = Profile.objects.filter(id__gte=start_id, id__lt=end_id)
+    with db_transaction.atomic():
+        lock_balances(funds.values_list('id', flat=True), profiles.values_list('id', flat=True))
+        snapshots = [
+            BalanceSnapshot(day=day, balance=balance, fund_id=fund_id, user_profile_id=profile_id)
+            for fund_id, profile_id, balance in _get_fund_balances(funds, day_end)
+        ]
+        snapshots.extend(
+            BalanceSnapshot(day=day, balance=balance, user_profile_id=profile_id)
+            for profile_id, balance in _get_profile_balances(profiles, day_end)
+        )
+        BalanceSnapshot.objects.filter(day=day, user_profile_id__gte=start_id, user_profile_id__lt=end_id).delete()
+        BalanceSnapshot.objects.bulk_create(snapshots, batch_size=SNAPSHOTS_CHUNK_SIZE)
+
+    return len(snapshots)
+
+
+def write_balance_snapshots(day: Optional[date] = None, chunk_size: int = SNAPSHOTS_CHUNK_SIZE) -> int:
+    """
+    Writes snapshots of the balances of all the profiles and funds at the end of the day, yesterday by default.
+
+    Only days that are over are snapshotted, so the transactions written today never change a snapshot.
+    Returns amount of written snapshots.
+    """
+    today = timezone.localdate()
+    day = day or today - timedelta(days=1)
+    if day >= today:
+        raise ValueError('Only days that are over can be snapshotted')
+
+    return sum(write_range_snapshots(day, start_id, end_id) for start_id, end_id in get_profile_ranges(chunk_size))
+
+
+def write_profile_snapshots(profile_id: int, days: list[date]) -> int:
+    """Writes the snapshots of the profile and its funds at the end of the days again."""
+    return sum(write_range_snapshots(day, profile_id, profile_id + 1) for day in days)
+
+
+def delete_old_balance_snapshots(today: Optional[date] = None, chunk_size: int = SNAPSHOTS_CHUNK_SIZE) -> int:
+    """
+    Keeps only the last snapshots of every month of a profile among the days older than
+    `BALANCE_SNAPSHOTS_DAILY_RETENTION` days.
+
+    The last written day is kept rather than the calendar month end, which the job could have missed.
+    Historical balances of old days then add about a month of transactions to the snapshot at most.
+    Returns amount of deleted snapshots.
+    """
+    before = (today or timezone.localdate()) - timedelta(days=settings.BALANCE_SNAPSHOTS_DAILY_RETENTION)
+    deleted = 0
+    for start_id, end_id in get_profile_ranges(chunk_size):
+        snapshots = BalanceSnapshot.objects.filter(
+            user_profile_id__gte=start_id,
+            user_profile_id__lt=end_id,
+            day__lt=before,
+        )
+        last_days = (
+            snapshots
+            .filter(fund__isnull=True)
+            .annotate(month=TruncMonth('day'))
+            .order_by()
+            .values('user_profile_id', 'month')
+            .annotate(last_day=Max('day'))
+            .values_list('user_profile_id', 'last_day')
+        )
+        profile_ids = defaultdict(list)
+        for profile_id, day in last_days:
+            profile_ids[day].append(profile_id)
+        if not profile_ids:
+            continue
+
+        count, _ = snapshots.exclude(
+            reduce(or_, (Q(day=day, user_profile_id__in=ids) for day, ids in profile_ids.items()))
+        ).delete()
+        deleted += count
+
+    return deleted
+
+
+def _get_changes_between(profile_id: int, start: datetime, end: datetime) -> tuple[dict[int, Decimal], Decimal]:
+    """Returns balance changes of the profile funds and of the profile caused by the transactions in `[start, end)`."""
+    fund_changes = defaultdict(Decimal)
+    profile_change = Decimal('0.00')
+    for model in CHANGE_MODELS:
+        totals = (
+            model.objects
+            .filter(user_profile_id=profile_id, date_created__gte=start, date_created__lt=end)
+            .order_by()
+            .values('fund_id', 'type')
+            .annotate(total=Sum('amount'))
+            .values_list('fund_id', 'type', 'total')
+        )
+        for fund_id, transaction_type, total in totals:
+            fund_changes[fund_id] += FUND_BALANCE_SIGNS[transaction_type] * total
+            profile_change += PROFILE_BALANCE_SIGNS[transaction_type] * total
+
+    return fund_changes, profile_change
+
+
+def _get_opening_balance(profile_id: int) -> Decimal:
+    return Profile.objects.filter(id=profile_id).values_list('opening_balance', flat=True).get()
+
+
+def get_balances_at(profile_id: int, day: date) -> tuple[Decimal, dict[int, Decimal]]:
+    """
+    Returns the profile balance and the balances of its funds by ID at the end of the day.
+
+    The nearest snapshot of the profile taken on or before the day is moved forward by the transactions
+    made after it, so only the transactions of the days between them are summed. Without an earlier
+    snapshot the current balances are moved back by the transactions made after the day.
+    Funds created after the day are left out. Balances are read from the database only, so a cached
+    profile can be passed by ID.
+    """
+    day_end = get_day_end(day)
+    snapshot_day = (
+        BalanceSnapshot.objects
+        .filter(user_profile_id=profile_id, fund__isnull=True, day__lte=day)
+        .order_by('-day')
+        .values_list('day', flat=True)
+        .first()
+    )
+    if snapshot_day is None:
+        fund_balances = {
+            fund_id: balance
+            for fund_id, _, balance in _get_fund_balances(Fund.objects.filter(user_profile_id=profile_id), day_end)
+        }
+        profile_balances = dict(_get_profile_balances(Profile.objects.filter(id=profile_id), day_end))
+        if profile_id not in profile_balances:
+            return _get_opening_balance(profile_id), fund_balances
+        return profile_balances[profile_id], fund_balances
+
+    # Funds created after the snapshot have no snapshot yet
+    fund_balances = dict(
+        Fund.objects
+        .filter(user_profile_id=profile_id, date_created__lt=day_end)
+        .values_list('id', 'opening_balance')
+    )
+    profile_balance = None
+    snapshots = BalanceSnapshot.objects.filter(user_profile_id=profile_id, day=snapshot_day).values_list(
+        'fund_id',
+        'balance',
+    )
+    for fund_id, balance in snapshots:
+        if fund_id is None:
+            profile_balance = balance
+        elif fund_id in fund_balances:
+            fund_balances[fund_id] = balance
+    if profile_balance is None:
+        profile_balance = _get_opening_balance(profile_id)
+
+    fund_changes, profile_change = _get_changes_between(profile_id, get_day_end(snapshot_day), day_end)
+    for fund_id, change in fund_changes.items():
+        if fund_id in fund_balances:
+            fund_balances[fund_id] += change
+
+    return profile_balance + profile_change, fund_balances
@@ -0,0 +1,85 @@
+from datetime import date
+from typing import Optional
+
+from django.core.files.storage import default_storage
+
+from finances.alerts import evaluate_budget_alerts, get_budget_profile_ids, send_budget_alerts
+from finances.budgets import renew_expired_budgets
+from finances.idempotency import delete_expired_idempotency_keys
+from finances.importers import IMPORT_DEFAULT_FUND_NAME, ImportFormatError, run_import
+from finances.models import TransactionImport
+from finances.partitions import archive_partitions
+from finances.reconciliation import RECONCILIATION_CHUNK_SIZE, reconcile_balances
+from finances.rollups import WRITE_PROFILE_SNAPSHOTS_TASK, rebuild_daily_totals
+from finances.snapshots import delete_old_balance_snapshots, write_balance_snapshots, write_profile_snapshots
+from jobs.queue import PermanentTaskError, task
+
+
+@task('finances.import_transactions')
+def import_transactions(import_id: int, file_path: str, default_fund_name: str = IMPORT_DEFAULT_FUND_NAME) -> dict:
+    """
+    Imports the file saved to the default storage, resuming the import after the committed rows on a retry.
+
+    The file is deleted once the import is completed or failed because of the file content.
+    """
+    transaction_import = TransactionImport.objects.select_related('user_profile').get(id=import_id)
+    try:
+        with default_storage.open(file_path, 'rb') as file:
+            transaction_import = run_import(transaction_import, file, default_fund_name)
+    except ImportFormatError as error:
+        default_storage.delete(file_path)
+        raise PermanentTaskError(str(error)) from error
+
+    default_storage.delete(file_path)
+    return {'rows_committed': transaction_import.rows_committed}
+
+
+@task('finances.reconcile_balances', max_attempts=1)
+def reconcile_balances_task(
+        repair: bool = False,
+        chunk_size: int = RECONCILIATION_CHUNK_SIZE,
+        workers: int = 1,
+) -> dict:
+    drifts = sum(len(chunk_drifts) for chunk_drifts in reconcile_balances(repair, chunk_size, workers))
+    return {'drifts': drifts, 'repaired': drifts if repair else 0}
+
+
+@task('finances.renew_budgets')
+def renew_budgets_task(today: Optional[str] = None) -> dict:
+    return {'renewed': renew_expired_budgets(date.fromisoformat(today) if today else None)}
+
+
+@task('finances.rebuild_daily_totals')
+def rebuild_daily_totals_task(profile_id: Optional[int] = None) -> dict:
+    return {'created': rebuild_daily_totals(profile_id)}
+
+
+@task('finances.send_budget_alerts')
+def send_budget_alerts_task() -> dict:
+    evaluate_budget_alerts(get_budget_profile_ids())
+    return {'sent': send_budget_alerts()}
+
+
+@task('finances.archive_transactions', max_attempts=1)
+def archive_transactions_task(before: str) -> dict:
+    return archive_partitions(date.fromisoformat(before))
+
+
+@task('finances.delete_idempotency_keys')
+def delete_idempotency_keys_task() -> dict:
+    return {'deleted': delete_expired_idempotency_keys()}
+
+
+@task('finances.write_balance_snapshots')
+def write_balance_snapshots_task(day: Optional[str] = None) -> dict:
+    try:
+        written = write_balance_snapshots(date.fromisoformat(day) if day else None)
+    except ValueError as error:
+        raise PermanentTaskError(str(error)) from error
+
+    return {'written': written, 'deleted': delete_old_balance_snapshots()}
+
+
+@task(WRITE_PROFILE_SNAPSHOTS_TASK)
+def write_profile_balance_snapshots_task(profile_id: int, days: list[str]) -> dict:
+    return {'written': write_profile_snapshots(profile_id, [date.fromisoformat(day) for day in days])}
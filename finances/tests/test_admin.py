@@ -0,0 +1,81 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from rest_framework.status import HTTP_200_OK, HTTP_302_FOUND
+
+from finances.models import Transaction
+from finances.pagination import EstimatedCountPaginator, estimate_count
+from utils.tests.api import BaseAPITestCase
+
+TRANSACTION_CHANGELIST_URL = '/admin/finances/transaction/'
+
+
+class TransactionAdminTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        profile = self.setup_profile(self.common_user)
+        self.fund = self.setup_fund(profile, name='Food')
+        other_fund = self.setup_fund(profile, name='Travel')
+        self.transactions = Transaction.objects.bulk_create(
+            Transaction(
+                type=Transaction.TransactionTypeChoices.EXPENSE,
+                amount=Decimal('1.00'),
+                fund=self.fund if index % 2 else other_fund,
+                user_profile=profile,
+                comment=f'Coffee at the station #{index}' if index < 3 else 'Groceries',
+            )
+            for index in range(6)
+        )
+        self.setup_admin_user(is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin_user)
+
+    def get_result_ids(self, **params) -> set[int]:
+        response = self.client.get(TRANSACTION_CHANGELIST_URL, params)
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+        return {transaction.id for transaction in response.context['cl'].result_list}
+
+    def test_filters_and_search(self):
+        fund_ids = {transaction.id for transaction in self.transactions if transaction.fund_id == self.fund.id}
+        coffee_ids = {transaction.id for transaction in self.transactions[:3]}
+        refunded, refund = self.transactions[3:5]
+        Transaction.objects.filter(id=refund.id).update(comment=f'Refund of #{refunded.id}')
+        cases = (
+            ('Fund ID', {'fund_id': self.fund.id}, fund_ids),
+            ('Comment search', {'q': 'COFFEE'}, coffee_ids),
+            ('ID search', {'q': self.transactions[5].id}, {self.transactions[5].id}),
+            ('ID or comment search', {'q': refunded.id}, {refunded.id, refund.id}),
+            ('Date filter', {'date_created__gte': '2000-01-01'}, {transaction.id for transaction in self.transactions}),
+            ('Combined', {'fund_id': self.fund.id, 'q': 'coffee'}, fund_ids & coffee_ids),
+        )
+        for case_name, params, expected_ids in cases:
+            with self.subTest(case_name=case_name):
+                self.assertEqual(self.get_result_ids(**params), expected_ids)
+
+    def test_invalid_id_filter(self):
+        response = self.client.get(TRANSACTION_CHANGELIST_URL, {'user_profile_id': 'abc'})
+        self.assertEqual(response.status_code, HTTP_302_FOUND, msg='invalid status code')
+        self.assertTrue(response.url.endswith('?e=1'), msg='invalid lookup is not reported')
+
+    def test_filters_do_not_list_related_objects(self):
+        response = self.client.get(TRANSACTION_CHANGELIST_URL, {'fund_id': self.fund.id, 'type': 'EX'})
+
+        self.assertContains(response, f'name="fund_id" value="{self.fund.id}"')
+        self.assertContains(response, 'name="type" value="EX"', msg_prefix='other filters are lost')
+        self.assertNotContains(response, f'?fund__id__exact={self.fund.id}')
+
+    def test_estimated_count(self):
+        queryset = Transaction.objects.order_by('id')
+        if connection.vendor != 'postgresql':
+            self.assertIsNone(estimate_count(queryset))
+            self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 6, msg='count is not exact')
+            return
+
+        estimate = estimate_count(queryset)
+        with patch.object(EstimatedCountPaginator, 'exact_count_threshold', 0):
+            paginator = EstimatedCountPaginator(queryset, 2)
+            with self.assertNumQueries(1) as context:
+                self.assertEqual(paginator.count, estimate)
+        self.assertTrue(context.captured_queries[0]['sql'].startswith('EXPLAIN'), msg='rows are counted')
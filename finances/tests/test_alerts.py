@@ -0,0 +1,198 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from django.utils.timezone import localdate
+
+from finances.alerts import dispatcher, evaluate_budget_alerts, send_budget_alerts
+from finances.models import BudgetAlert, BudgetPeriodChoices, FundBudget, Transaction, UserBudget
+from finances.notifiers import BaseNotifier, LocalNotifier, format_alert
+from finances.services import bulk_create_transactions
+from utils.tests.api import BaseAPITestCase
+
+
+class FailingNotifier(BaseNotifier):
+    def send(self, notifications, on_sent):
+        raise ConnectionError('notifier is down')
+
+
+class SecondFailingNotifier(BaseNotifier):
+    """Sends the first notification of a batch and fails on the second one."""
+
+    def send(self, notifications, on_sent):
+        LocalNotifier().send(notifications[:1], on_sent)
+        raise ConnectionError('notifier is down')
+
+
+@override_settings(
+    BUDGET_ALERTS_ENABLED=True,
+    BUDGET_ALERTS_DELAY=60,
+    BUDGET_ALERTS_NOTIFIER='finances.notifiers.LocalNotifier',
+)
+class BudgetAlertsTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        LocalNotifier.clear()
+        self.addCleanup(dispatcher.flush)
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user)
+        self.fund = self.setup_fund(self.profile, name='Food')
+        self.fund_budget = FundBudget.objects.create(
+            period=BudgetPeriodChoices.WEEKLY,
+            amount=Decimal('100.00'),
+            fund=self.fund,
+            end_date=localdate(),
+        )
+        UserBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('1000.00'),
+            user_profile=self.profile,
+            end_date=localdate(),
+        )
+
+    def spend(self, *amounts: str, fund=None) -> None:
+        fund = fund or self.fund
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_transactions([
+                Transaction(
+                    type=Transaction.TransactionTypeChoices.EXPENSE,
+                    amount=Decimal(amount),
+                    fund=fund,
+                    user_profile_id=fund.user_profile_id,
+                )
+                for amount in amounts
+            ])
+
+    def get_sent_levels(self) -> list[list[str]]:
+        return [
+            [alert.level for notification in batch for alert in notification.alerts]
+            for batch in LocalNotifier.outbox
+        ]
+
+    def test_expenses_are_coalesced_per_user(self):
+        self.spend('50.00')
+        self.spend('35.00')
+        self.spend('30.00')
+
+        self.assertEqual(dispatcher.pending_profile_ids, {self.profile.id})
+        self.assertFalse(BudgetAlert.objects.exists(), msg='budgets are checked on the write path')
+
+        dispatcher.flush()
+
+        self.assertEqual(len(LocalNotifier.outbox), 1, msg='invalid amount of batches')
+        notification, = LocalNotifier.outbox[0]
+        self.assertEqual(notification.telegram_id, self.common_user.telegram_id)
+        alert, = notification.alerts
+        self.assertEqual(alert.level, BudgetAlert.LevelChoices.EXCEEDED)
+        self.assertEqual(alert.fund_budget_id, self.fund_budget.id)
+        self.assertEqual(alert.spent, Decimal('115.00'))
+        self.assertIsNotNone(BudgetAlert.objects.get().date_sent, msg='sent alert is pending')
+
+    def test_alert_is_sent_once_per_level(self):
+        self.spend('85.00')
+        dispatcher.flush()
+        self.spend('1.00')
+        dispatcher.flush()
+        self.spend('20.00')
+        dispatcher.flush()
+
+        self.assertEqual(self.get_sent_levels(), [['W'], ['E']])
+
+    def test_income_does_not_schedule_alerts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_transactions([
+                Transaction(
+                    type=Transaction.TransactionTypeChoices.INCOME,
+                    amount=Decimal('500.00'),
+                    fund=self.fund,
+                    user_profile=self.profile,
+                ),
+            ])
+
+        self.assertEqual(dispatcher.pending_profile_ids, set())
+
+    @override_settings(BUDGET_ALERTS_ENABLED=False)
+    def test_disabled_alerts(self):
+        self.spend('500.00')
+
+        self.assertEqual(dispatcher.pending_profile_ids, set())
+
+    def test_failed_batch_stays_pending(self):
+        self.spend('150.00')
+        with self.assertRaises(ConnectionError):
+            with override_settings(BUDGET_ALERTS_NOTIFIER='finances.tests.test_alerts.FailingNotifier'):
+                dispatcher.flush()
+
+        self.assertIsNone(BudgetAlert.objects.get().date_sent, msg='failed alert is marked sent')
+        self.assertEqual(send_budget_alerts(), 1, msg='failed alert is not retried')
+
+    def test_sent_notifications_are_not_resent_after_failure(self):
+        other_user = self.setup_common_user(telegram_id='5555555555', username='other_user', email='other@example.com')
+        other_fund = self.setup_fund(self.setup_profile(other_user), name='Food')
+        FundBudget.objects.create(
+            period=BudgetPeriodChoices.DAILY,
+            amount=Decimal('10.00'),
+            fund=other_fund,
+            end_date=localdate(),
+        )
+        self.spend('150.00')
+        self.spend('20.00', fund=other_fund)
+        evaluate_budget_alerts([self.profile.id, other_fund.user_profile_id])
+
+        with self.assertRaises(ConnectionError):
+            send_budget_alerts(SecondFailingNotifier())
+
+        self.assertEqual(
+            list(BudgetAlert.objects.filter(date_sent__isnull=True).values_list('date_claimed', 'fund_budget__fund')),
+            [(None, other_fund.id)],
+            msg='unsent alert is not released',
+        )
+        LocalNotifier.clear()
+        self.assertEqual(send_budget_alerts(), 1, msg='sent alert is sent again')
+        self.assertEqual(
+            [[notification.telegram_id for notification in batch] for batch in LocalNotifier.outbox],
+            [[other_user.telegram_id]],
+        )
+
+    def test_claimed_alerts_are_skipped_until_timeout(self):
+        self.spend('150.00')
+        evaluate_budget_alerts([self.profile.id])
+        BudgetAlert.objects.update(date_claimed=timezone.now())
+
+        self.assertEqual(send_budget_alerts(), 0, msg='alert claimed by another sender is sent')
+        with override_settings(BUDGET_ALERTS_CLAIM_TIMEOUT=0):
+            self.assertEqual(send_budget_alerts(), 1, msg='timed out claim is not sent')
+
+    def test_alerts_are_sent_in_batches(self):
+        user = self.common_user
+        other_user = self.setup_common_user(telegram_id='5555555555', username='other_user', email='other@example.com')
+        other_fund = self.setup_fund(self.setup_profile(other_user), name='Food')
+        FundBudget.objects.create(
+            period=BudgetPeriodChoices.DAILY,
+            amount=Decimal('10.00'),
+            fund=other_fund,
+            end_date=localdate(),
+        )
+        self.spend('90.00')
+        self.spend('9.00', fund=other_fund)
+
+        output = StringIO()
+        call_command('send_budget_alerts', '--batch-size=1', stdout=output)
+
+        self.assertIn('Sent 2 budget alerts', output.getvalue())
+        self.assertEqual(
+            [[notification.telegram_id for notification in batch] for batch in LocalNotifier.outbox],
+            [[user.telegram_id], [other_user.telegram_id]],
+        )
+
+    def test_format_alert(self):
+        self.spend('120.00')
+        dispatcher.flush()
+
+        alert, = LocalNotifier.outbox[0][0].alerts
+        self.assertEqual(
+            format_alert(alert),
+            f'"Food" fund weekly budget is over the limit: 120.00 of 100.00 spent by {localdate():%Y-%m-%d}.',
+        )
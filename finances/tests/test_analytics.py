@@ -0,0 +1,127 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+from django.utils.timezone import localdate
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from finances.analytics import get_deltas, get_moving_averages, get_periods, get_trends
+from finances.models import Transaction
+from finances.services import bulk_create_transactions
+from utils.tests.api import BaseAPITestCase
+
+SPENDING_ANALYTICS_ENDPOINT_NAME = 'spending-analytics'
+
+
+class SpendingAnalyticsTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('500.00'))
+        self.fund = self.setup_fund(self.profile, name='Food')
+        self.other_fund = self.setup_fund(self.profile, name='Salary')
+
+        types = Transaction.TransactionTypeChoices
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_transactions([
+                Transaction(
+                    type=transaction_type,
+                    amount=Decimal(amount),
+                    date_created=datetime(2023, month, day, 12, tzinfo=timezone.utc),
+                    fund=fund,
+                    user_profile=self.profile,
+                )
+                for transaction_type, amount, month, day, fund in (
+                    (types.EXPENSE, '10.00', 1, 10, self.fund),
+                    (types.EXPENSE, '20.00', 2, 10, self.fund),
+                    (types.EXPENSE, '10.00', 2, 20, self.fund),
+                    (types.EXPENSE, '60.00', 3, 5, self.fund),
+                    (types.INCOME, '100.00', 3, 1, self.other_fund),
+                )
+            ])
+
+    def get_analytics(self, expected_status=HTTP_200_OK, **params):
+        response = self.client.get(reverse(SPENDING_ANALYTICS_ENDPOINT_NAME), data=params)
+        self.assertEqual(response.status_code, expected_status, msg='invalid status code')
+
+        return response.json()
+
+    def test_monthly_spending(self):
+        data = self.get_analytics(date_from='2023-01-01', date_to='2023-03-31', window=2, forecast=2)
+
+        self.assertEqual(data['periods'], ['2023-01-01', '2023-02-01', '2023-03-01'])
+        self.assertEqual(len(data['series']), 2, msg='invalid amount of series')
+        expense, income = data['series']
+        self.assertEqual((expense['fund'], expense['type']), (self.fund.id, 'EX'))
+        self.assertEqual(expense['amounts'], ['10.00', '30.00', '60.00'])
+        self.assertEqual(expense['moving_average'], [None, '20.00', '45.00'])
+        self.assertEqual(expense['deltas'], [None, '20.00', '30.00'])
+        self.assertEqual(expense['delta_percents'], [None, '200.00', '100.00'])
+        self.assertEqual(expense['slope'], 25.0)
+        self.assertEqual(expense['forecast'], ['83.33', '108.33'])
+        self.assertEqual(income['amounts'], ['0.00', '0.00', '100.00'])
+        self.assertEqual(income['delta_percents'], [None, None, None], msg='percents of empty periods are defined')
+
+    def test_daily_spending_of_fund(self):
+        data = self.get_analytics(granularity='day', date_from='2023-02-09', date_to='2023-02-11', fund=self.fund.id)
+
+        self.assertEqual(data['periods'], ['2023-02-09', '2023-02-10', '2023-02-11'])
+        series, = data['series']
+        self.assertEqual(series['amounts'], ['0.00', '20.00', '0.00'])
+        self.assertEqual(series['moving_average'], [None, None, '6.67'])
+
+    def test_default_period(self):
+        data = self.get_analytics()
+
+        self.assertEqual(len(data['periods']), 12, msg='invalid default amount of periods')
+        self.assertEqual(data['periods'][-1], localdate().replace(day=1).isoformat())
+        self.assertEqual(data['series'], [], msg='transactions out of the period are included')
+
+    def test_invalid_query(self):
+        cases = (
+            ('Reversed dates', {'date_from': '2023-03-01', 'date_to': '2023-01-01'}),
+            ('Too many periods', {'granularity': 'day', 'date_from': '2022-01-01', 'date_to': '2023-03-01'}),
+            ('Unknown granularity', {'granularity': 'week'}),
+            ('Empty window', {'window': 0}),
+        )
+        for case_name, params in cases:
+            with self.subTest(case_name=case_name):
+                self.get_analytics(HTTP_400_BAD_REQUEST, **params)
+
+    def test_response_is_cached_until_transactions_change(self):
+        params = {'date_from': '2023-03-01', 'date_to': '2023-03-31'}
+        self.get_analytics(**params)
+        with self.assertNumQueries(0):
+            self.get_analytics(**params)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_transactions([
+                Transaction(
+                    type=Transaction.TransactionTypeChoices.EXPENSE,
+                    amount=Decimal('5.00'),
+                    date_created=datetime(2023, 3, 6, 12, tzinfo=timezone.utc),
+                    fund=self.fund,
+                    user_profile=self.profile,
+                ),
+            ])
+        self.assertEqual(self.get_analytics(**params)['series'][0]['amounts'], ['65.00'], msg='stale analytics')
+
+
+class TrendMathTestCase(BaseAPITestCase):
+    def test_get_periods(self):
+        self.assertEqual(len(get_periods(date(2023, 12, 15), date(2024, 2, 1), 'month')), 3)
+        self.assertEqual(len(get_periods(date(2023, 12, 15), date(2023, 12, 15) + timedelta(days=6), 'day')), 7)
+
+    def test_window_longer_than_series(self):
+        averages = get_moving_averages(np.array([[1.0, 2.0]]), 3)
+        self.assertTrue(np.isnan(averages).all(), msg='average of an unfilled window')
+
+    def test_single_period(self):
+        matrix = np.array([[5.0]])
+        deltas, percents = get_deltas(matrix)
+        slopes, forecasts = get_trends(matrix, 2)
+
+        self.assertTrue(np.isnan(deltas).all() and np.isnan(percents).all(), msg='change of the first period')
+        self.assertEqual(slopes.tolist(), [0.0])
+        self.assertEqual(forecasts.tolist(), [[5.0, 5.0]])
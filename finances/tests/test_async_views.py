@@ -0,0 +1,138 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN, HTTP_405_METHOD_NOT_ALLOWED
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finances.models import BudgetPeriodChoices, Currency, FundBudget, Transaction, UserBudget
+from finances.services import bulk_create_transactions
+from users.authentication import sign_telegram_id
+from utils.tests.api import BaseAPITestCase
+
+DETAIL_COMMON_USER_ASYNC_ENDPOINT_NAME = 'users-detail-common-async'
+FUNDS_BALANCES_ASYNC_ENDPOINT_NAME = 'funds-balances-async'
+BUDGETS_STATUS_ASYNC_ENDPOINT_NAME = 'budgets-status-async'
+BUDGETS_STATUS_ENDPOINT_NAME = 'budgets-status'
+
+
+@override_settings(TELEGRAM_BOT_SECRET='test-telegram-bot-secret')
+class AsyncViewsTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        currency = Currency.objects.create(name='Euro', iso_code='EUR')
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('500.00'), currency=currency)
+        self.fund = self.setup_fund(self.profile, name='Food', balance=Decimal('100.00'))
+        self.client.force_authenticate(user=None)
+        self.bot_authorization = f'Bot {sign_telegram_id(self.common_user.telegram_id)}'
+
+    def get(self, endpoint_name: str, authorization: str = None):
+        headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+        return self.client.get(reverse(endpoint_name), **headers)
+
+    def test_account(self):
+        cases = (
+            ('Bot credential', self.bot_authorization),
+            ('JWT', f'Bearer {AccessToken.for_user(self.common_user)}'),
+        )
+        for case_name, authorization in cases:
+            with self.subTest(case_name=case_name):
+                response = self.get(DETAIL_COMMON_USER_ASYNC_ENDPOINT_NAME, authorization)
+                self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+                self.assertEqual(response.json()['telegram_id'], self.common_user.telegram_id, msg='user mismatch')
+
+    async def test_account_under_asgi(self):
+        response = await self.async_client.get(
+            reverse(DETAIL_COMMON_USER_ASYNC_ENDPOINT_NAME),
+            AUTHORIZATION=self.bot_authorization,
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(response.json()['id'], self.common_user.id, msg='user mismatch')
+
+    def test_fund_balances(self):
+        bulk_create_transactions([
+            Transaction(
+                type=Transaction.TransactionTypeChoices.EXPENSE,
+                amount=Decimal('30.00'),
+                fund=self.fund,
+                user_profile=self.profile,
+            ),
+        ])
+
+        response = self.get(FUNDS_BALANCES_ASYNC_ENDPOINT_NAME, self.bot_authorization)
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(
+            response.json(),
+            {
+                'balance': '500.00',
+                'currency': 'EUR',
+                'funds': [{'id': self.fund.id, 'name': 'Food', 'balance': '70.00', 'currency': 'EUR'}],
+            },
+            msg='balances mismatch',
+        )
+
+    def test_budgets_status_matches_sync_endpoint(self):
+        end_date = timezone.localdate() + timedelta(days=3)
+        UserBudget.objects.create(
+            period=BudgetPeriodChoices.WEEKLY,
+            amount=Decimal('100.00'),
+            user_profile=self.profile,
+            end_date=end_date,
+        )
+        FundBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('50.00'),
+            fund=self.fund,
+            end_date=end_date,
+        )
+
+        response = self.get(BUDGETS_STATUS_ASYNC_ENDPOINT_NAME, self.bot_authorization)
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        sync_response = self.get(BUDGETS_STATUS_ENDPOINT_NAME, self.bot_authorization)
+        self.assertEqual(response.json(), sync_response.json(), msg='budgets status mismatch')
+
+    async def test_budgets_status_from_cache_under_asgi(self):
+        sync_response = await sync_to_async(self.get)(BUDGETS_STATUS_ENDPOINT_NAME, self.bot_authorization)
+        with patch('finances.async_views.get_budgets_status') as get_budgets_status:
+            response = await self.async_client.get(
+                reverse(BUDGETS_STATUS_ASYNC_ENDPOINT_NAME),
+                AUTHORIZATION=self.bot_authorization,
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        get_budgets_status.assert_not_called()
+        self.assertEqual(response.json(), sync_response.json(), msg='budgets status mismatch')
+
+    def test_access(self):
+        self.setup_unregistered_user()
+        self.client.force_authenticate(user=None)
+        cases = (
+            ('No credentials', None, HTTP_401_UNAUTHORIZED),
+            ('Invalid bot credential', f'Bot {self.common_user.telegram_id}', HTTP_401_UNAUTHORIZED),
+            ('Invalid JWT', 'Bearer invalid-token', HTTP_401_UNAUTHORIZED),
+            (
+                'Unregistered user',
+                f'Bot {sign_telegram_id(self.unregistered_user.telegram_id)}',
+                HTTP_403_FORBIDDEN,
+            ),
+        )
+        for case_name, authorization, status_code in cases:
+            with self.subTest(case_name=case_name):
+                response = self.get(FUNDS_BALANCES_ASYNC_ENDPOINT_NAME, authorization)
+                self.assertEqual(response.status_code, status_code, msg='invalid status code')
+                self.assertEqual(
+                    response.get('WWW-Authenticate'),
+                    self.get(BUDGETS_STATUS_ENDPOINT_NAME, authorization).get('WWW-Authenticate'),
+                    msg='authenticate header mismatch',
+                )
+
+        response = self.client.post(
+            reverse(FUNDS_BALANCES_ASYNC_ENDPOINT_NAME),
+            HTTP_AUTHORIZATION=self.bot_authorization,
+        )
+        self.assertEqual(response.status_code, HTTP_405_METHOD_NOT_ALLOWED, msg='invalid status code')
@@ -0,0 +1,429 @@
+import threading
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localdate
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK
+
+from finances.budgets import get_budget_spending, get_next_end_date, get_period_start
+from finances.models import BudgetPeriodChoices, Fund, FundBudget, Transaction, TransactionDailyTotal, UserBudget
+from finances.rollups import rebuild_daily_totals
+from finances.services import bulk_create_transactions
+from users.models import Profile, UserRolesChoices
+from utils.tests.api import BaseAPITestCase
+
+BUDGETS_STATUS_ENDPOINT_NAME = 'budgets-status'
+
+User = get_user_model()
+
+
+class BudgetPeriodTestCase(BaseAPITestCase):
+    def test_get_period_start(self):
+        cases = (
+            (BudgetPeriodChoices.DAILY, date(2023, 3, 31), date(2023, 3, 31)),
+            (BudgetPeriodChoices.WEEKLY, date(2023, 3, 31), date(2023, 3, 25)),
+            (BudgetPeriodChoices.MONTHLY, date(2023, 3, 31), date(2023, 3, 1)),
+            (BudgetPeriodChoices.MONTHLY, date(2023, 3, 15), date(2023, 2, 16)),
+            (BudgetPeriodChoices.ANNUALLY, date(2024, 2, 29), date(2023, 3, 1)),
+        )
+        for period, end_date, start_date in cases:
+            with self.subTest(period=period, end_date=end_date):
+                self.assertEqual(get_period_start(period, end_date), start_date)
+
+
+    def test_get_next_end_date(self):
+        cases = (
+            (BudgetPeriodChoices.DAILY, date(2023, 3, 1), date(2023, 3, 10), date(2023, 3, 10)),
+            (BudgetPeriodChoices.WEEKLY, date(2023, 3, 1), date(2023, 3, 8), date(2023, 3, 8)),
+            (BudgetPeriodChoices.WEEKLY, date(2023, 3, 1), date(2023, 3, 9), date(2023, 3, 15)),
+            (BudgetPeriodChoices.MONTHLY, date(2023, 1, 31), date(2023, 2, 1), date(2023, 2, 28)),
+            (BudgetPeriodChoices.MONTHLY, date(2023, 1, 31), date(2023, 3, 1), date(2023, 3, 31)),
+            (BudgetPeriodChoices.ANNUALLY, date(2020, 2, 29), date(2022, 5, 1), date(2023, 2, 28)),
+        )
+        for period, end_date, today, next_end_date in cases:
+            with self.subTest(period=period, end_date=end_date, today=today):
+                self.assertEqual(get_next_end_date(period, end_date, today), next_end_date)
+
+    def test_anchored_periods(self):
+        monthly, annually = BudgetPeriodChoices.MONTHLY, BudgetPeriodChoices.ANNUALLY
+        cases = (
+            ('Month end', monthly, 31, date(2026, 2, 28), date(2026, 3, 1), date(2026, 2, 1), date(2026, 3, 31)),
+            ('Long month', monthly, 31, date(2026, 3, 31), date(2026, 4, 1), date(2026, 3, 1), date(2026, 4, 30)),
+            ('Leap February', monthly, 30, date(2024, 2, 29), date(2024, 3, 2), date(2024, 1, 31), date(2024, 3, 30)),
+            ('Leap day', annually, 29, date(2025, 2, 28), date(2027, 3, 1), date(2024, 3, 1), date(2028, 2, 29)),
+            ('Leap year', annually, 29, date(2028, 2, 29), date(2028, 3, 1), date(2027, 3, 1), date(2029, 2, 28)),
+        )
+        for case_name, period, anchor_day, end_date, today, start_date, next_end_date in cases:
+            with self.subTest(case_name=case_name):
+                self.assertEqual(get_period_start(period, end_date, anchor_day), start_date, msg='start mismatch')
+                self.assertEqual(
+                    get_next_end_date(period, end_date, today, anchor_day),
+                    next_end_date,
+                    msg='next end date mismatch',
+                )
+
+
+class BudgetRenewalTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user)
+        self.fund = self.setup_fund(self.profile, name='Food')
+
+    def test_renew_budgets(self):
+        renewed_budget = UserBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('300.00'),
+            user_profile=self.profile,
+            end_date=date(2023, 1, 31),
+            auto_renew=True,
+        )
+        not_renewed_budget = UserBudget.objects.create(
+            period=BudgetPeriodChoices.WEEKLY,
+            amount=Decimal('50.00'),
+            user_profile=self.profile,
+            end_date=date(2023, 1, 31),
+        )
+        fund_budget = FundBudget.objects.create(
+            period=BudgetPeriodChoices.WEEKLY,
+            amount=Decimal('50.00'),
+            fund=self.fund,
+            end_date=date(2023, 3, 1),
+            auto_renew=True,
+        )
+
+        output = StringIO()
+        call_command('renew_budgets', '--date=2023-03-10', stdout=output)
+        self.assertIn('Renewed 2 budgets', output.getvalue())
+
+        for budget in (renewed_budget, not_renewed_budget, fund_budget):
+            budget.refresh_from_db()
+        self.assertEqual(renewed_budget.end_date, date(2023, 3, 31), msg='user budget is not renewed')
+        self.assertEqual(not_renewed_budget.end_date, date(2023, 1, 31), msg='budget without auto renew is renewed')
+        self.assertEqual(fund_budget.end_date, date(2023, 3, 15), msg='fund budget is not renewed')
+
+        call_command('renew_budgets', '--date=2023-03-10', stdout=output)
+        self.assertIn('Renewed 0 budgets', output.getvalue(), msg='renewal is not idempotent')
+
+    def test_renewed_periods_keep_month_end(self):
+        budget = UserBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('300.00'),
+            user_profile=self.profile,
+            end_date=date(2026, 1, 31),
+            auto_renew=True,
+        )
+
+        periods = []
+        for today in (date(2026, 2, 10), date(2026, 3, 10), date(2026, 4, 10)):
+            call_command('renew_budgets', f'--date={today}', stdout=StringIO())
+            budget.refresh_from_db()
+            periods.append((get_period_start(budget.period, budget.end_date, budget.anchor_day), budget.end_date))
+
+        self.assertEqual(
+            periods,
+            [
+                (date(2026, 2, 1), date(2026, 2, 28)),
+                (date(2026, 3, 1), date(2026, 3, 31)),
+                (date(2026, 4, 1), date(2026, 4, 30)),
+            ],
+            msg='renewed periods drift',
+        )
+
+    def test_renewal_query_count_does_not_depend_on_budgets_count(self):
+        for index in range(20):
+            fund = self.setup_fund(self.profile, name=f'Fund {index}')
+            FundBudget.objects.create(
+                period=BudgetPeriodChoices.DAILY,
+                amount=Decimal('10.00'),
+                fund=fund,
+                end_date=date(2023, 3, 1),
+                auto_renew=True,
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            call_command('renew_budgets', '--date=2023-03-10', stdout=StringIO())
+        self.assertLessEqual(len(context.captured_queries), 6, msg='budgets are renewed one by one')
+        self.assertFalse(FundBudget.objects.filter(end_date__lt=date(2023, 3, 10)).exists())
+
+
+class DailyTotalTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user)
+        self.fund = self.setup_fund(self.profile, name='Food')
+        self.other_fund = self.setup_fund(self.profile, name='Travel')
+
+    def create_transactions(self, *rows: tuple) -> list[Transaction]:
+        return bulk_create_transactions([
+            Transaction(
+                type=transaction_type,
+                amount=Decimal(amount),
+                date_created=date_created,
+                fund=fund,
+                user_profile=self.profile,
+            )
+            for transaction_type, amount, date_created, fund in rows
+        ])
+
+    def get_daily_totals(self) -> list[tuple]:
+        return list(
+            TransactionDailyTotal.objects
+            .order_by('fund_id', 'type', 'day')
+            .values_list('fund_id', 'type', 'day', 'amount', 'transactions_count')
+        )
+
+    def test_daily_totals_are_updated_incrementally(self):
+        expense = Transaction.TransactionTypeChoices.EXPENSE
+        self.create_transactions(
+            (expense, '10.00', datetime(2023, 3, 1, 9, tzinfo=timezone.utc), self.fund),
+            (expense, '5.50', datetime(2023, 3, 1, 18, tzinfo=timezone.utc), self.fund),
+        )
+        self.create_transactions(
+            (expense, '4.50', datetime(2023, 3, 1, 20, tzinfo=timezone.utc), self.fund),
+            (expense, '7.00', datetime(2023, 3, 2, 9, tzinfo=timezone.utc), self.other_fund),
+        )
+
+        self.assertEqual(
+            self.get_daily_totals(),
+            [
+                (self.fund.id, expense, date(2023, 3, 1), Decimal('20.00'), 3),
+                (self.other_fund.id, expense, date(2023, 3, 2), Decimal('7.00'), 1),
+            ],
+        )
+
+    def test_daily_totals_follow_saved_and_deleted_transactions(self):
+        types = Transaction.TransactionTypeChoices
+        first_day = datetime(2023, 3, 1, 9, tzinfo=timezone.utc)
+        self.create_transactions(
+            (types.EXPENSE, '10.00', first_day, self.fund),
+            (types.EXPENSE, '5.00', first_day, self.fund),
+        )
+        created = Transaction.objects.create(
+            type=types.EXPENSE,
+            amount=Decimal('2.00'),
+            date_created=first_day,
+            fund=self.other_fund,
+            user_profile=self.profile,
+        )
+
+        transaction = Transaction.objects.get(amount=Decimal('10.00'))
+        transaction.amount = Decimal('12.00')
+        transaction.fund = self.other_fund
+        transaction.save()
+        self.assertEqual(
+            self.get_daily_totals(),
+            [
+                (self.fund.id, types.EXPENSE, date(2023, 3, 1), Decimal('5.00'), 1),
+                (self.other_fund.id, types.EXPENSE, date(2023, 3, 1), Decimal('14.00'), 2),
+            ],
+        )
+
+        transaction.type = types.INCOME
+        transaction.save()
+        created.delete()
+        Transaction.objects.filter(amount=Decimal('5.00')).delete()
+        self.assertEqual(
+            self.get_daily_totals(),
+            [(self.other_fund.id, types.INCOME, date(2023, 3, 1), Decimal('12.00'), 1)],
+        )
+
+        # Deferred fields of the bucket are read before the save
+        transaction = Transaction.objects.only('id', 'date_created').get()
+        transaction.date_created = datetime(2023, 3, 2, 9, tzinfo=timezone.utc)
+        transaction.save(update_fields=('date_created',))
+        self.assertEqual(
+            self.get_daily_totals(),
+            [(self.other_fund.id, types.INCOME, date(2023, 3, 2), Decimal('12.00'), 1)],
+        )
+
+        self.fund.delete()
+        self.other_fund.delete()
+        self.assertEqual(self.get_daily_totals(), [], msg='buckets of deleted funds are kept')
+
+    def test_rebuild_daily_totals(self):
+        types = Transaction.TransactionTypeChoices
+        self.create_transactions(
+            (types.EXPENSE, '10.00', datetime(2023, 3, 1, 9, tzinfo=timezone.utc), self.fund),
+            (types.INCOME, '100.00', datetime(2023, 3, 1, 10, tzinfo=timezone.utc), self.fund),
+            (types.EXPENSE, '7.00', datetime(2023, 3, 2, 9, tzinfo=timezone.utc), self.other_fund),
+        )
+        incremental_totals = self.get_daily_totals()
+
+        TransactionDailyTotal.objects.update(amount=Decimal('0.00'))
+        output = StringIO()
+        call_command('rebuild_daily_totals', stdout=output)
+
+        self.assertIn('Rebuilt 3 daily totals', output.getvalue())
+        self.assertEqual(self.get_daily_totals(), incremental_totals, msg='rebuilt totals mismatch')
+
+    def test_budget_spending(self):
+        types = Transaction.TransactionTypeChoices
+        self.create_transactions(
+            (types.EXPENSE, '10.00', datetime(2023, 2, 28, 9, tzinfo=timezone.utc), self.fund),
+            (types.EXPENSE, '20.00', datetime(2023, 3, 1, 9, tzinfo=timezone.utc), self.fund),
+            (types.INCOME, '100.00', datetime(2023, 3, 2, 9, tzinfo=timezone.utc), self.fund),
+            (types.EXPENSE, '5.00', datetime(2023, 3, 31, 9, tzinfo=timezone.utc), self.other_fund),
+        )
+
+        fund_budget = FundBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('100.00'),
+            fund=self.fund,
+            end_date=date(2023, 3, 31),
+        )
+        user_budget = UserBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('100.00'),
+            user_profile=self.profile,
+            end_date=date(2023, 3, 31),
+        )
+
+        self.assertEqual(get_budget_spending(fund_budget), Decimal('20.00'), msg='fund budget spending mismatch')
+        self.assertEqual(get_budget_spending(user_budget), Decimal('25.00'), msg='user budget spending mismatch')
+
+
+class BudgetsStatusTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user)
+        self.fund = self.setup_fund(self.profile, name='Food')
+        self.today = localdate()
+        self.fund_budget = FundBudget.objects.create(
+            period=BudgetPeriodChoices.WEEKLY,
+            amount=Decimal('50.00'),
+            fund=self.fund,
+            end_date=self.today,
+        )
+        self.user_budget = UserBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('300.00'),
+            user_profile=self.profile,
+            end_date=self.today,
+        )
+
+    def spend(self, amount: str) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_transactions([
+                Transaction(
+                    type=Transaction.TransactionTypeChoices.EXPENSE,
+                    amount=Decimal(amount),
+                    fund=self.fund,
+                    user_profile=self.profile,
+                ),
+            ])
+
+    def get_status(self) -> dict:
+        response = self.client.get(reverse(BUDGETS_STATUS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+        return response.data
+
+    def test_budgets_status(self):
+        self.spend('20.00')
+
+        data = self.get_status()
+        self.assertEqual(len(data['user_budgets']), 1, msg='invalid amount of user budgets')
+        self.assertEqual(data['user_budgets'][0]['remaining'], '280.00', msg='user budget remaining mismatch')
+        self.assertEqual(data['fund_budgets'][0]['fund'], self.fund.id)
+        self.assertEqual(data['fund_budgets'][0]['spent'], '20.00', msg='fund budget spending mismatch')
+        self.assertEqual(data['fund_budgets'][0]['remaining'], '30.00', msg='fund budget remaining mismatch')
+
+    def test_cached_status_does_not_query_transactions(self):
+        self.get_status()
+        with CaptureQueriesContext(connection) as context:
+            self.get_status()
+
+        tables = (Transaction._meta.db_table, TransactionDailyTotal._meta.db_table, FundBudget._meta.db_table)
+        for query in context.captured_queries:
+            for table in tables:
+                self.assertNotIn(table, query['sql'], msg='cached status queries the database')
+
+    def test_status_is_invalidated_on_transaction_write(self):
+        self.assertEqual(self.get_status()['fund_budgets'][0]['spent'], '0.00')
+
+        self.spend('15.00')
+        self.assertEqual(self.get_status()['fund_budgets'][0]['spent'], '15.00', msg='stale status after write')
+
+    def test_status_is_invalidated_on_budget_change(self):
+        self.get_status()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fund_budget.amount = Decimal('70.00')
+            self.fund_budget.save()
+        self.assertEqual(self.get_status()['fund_budgets'][0]['amount'], '70.00', msg='stale status after update')
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentDailyTotalTestCase(TransactionTestCase):
+    WRITES = 40
+    REBUILDS = 10
+
+    def setUp(self) -> None:
+        super().setUp()
+        user = User.objects.create_user(
+            telegram_id='1234567890',
+            username='test_common_user',
+            email='test_common_user@example.com',
+            password='test-user-password-911',
+            role=UserRolesChoices.REGISTERED,
+        )
+        self.profile = Profile.objects.create(user=user, balance=Decimal('0.00'))
+        self.fund = Fund.objects.create(
+            name='Food',
+            balance=Decimal('0.00'),
+            goal=Decimal('0.00'),
+            budget=Decimal('0.00'),
+            user_profile=self.profile,
+        )
+
+    def run_in_thread(self, function, errors: list) -> None:
+        try:
+            function()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def write_transactions(self) -> None:
+        for _ in range(self.WRITES):
+            bulk_create_transactions([
+                Transaction(
+                    type=Transaction.TransactionTypeChoices.EXPENSE,
+                    amount=Decimal('1.00'),
+                    fund_id=self.fund.id,
+                    user_profile_id=self.profile.id,
+                ),
+            ])
+
+    def rebuild(self) -> None:
+        for _ in range(self.REBUILDS):
+            rebuild_daily_totals(self.profile.id)
+
+    def test_rebuild_keeps_concurrent_writes(self):
+        errors = []
+        threads = [
+            threading.Thread(target=self.run_in_thread, args=(function, errors))
+            for function in (self.write_transactions, self.rebuild)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [], msg='concurrent writes failed')
+        self.assertEqual(
+            TransactionDailyTotal.objects.aggregate(total=Sum('transactions_count'))['total'],
+            self.WRITES,
+            msg='concurrent write is lost by the rebuild',
+        )
@@ -0,0 +1,173 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.db.models import F
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from finances.budgets import get_budget_spending, get_budgets_status
+from finances.consolidation import get_consolidated_balance, get_consolidated_change
+from finances.currencies import (CurrencyConversionError, RateIndex, convert_totals, get_rate_index,
+                                 save_exchange_rates)
+from finances.models import BudgetPeriodChoices, Currency, ExchangeRate, Transaction, UserBudget
+from finances.services import bulk_create_transactions
+from users.authentication import sign_telegram_id
+from users.models import Profile
+from utils.tests.api import BaseAPITestCase
+
+CONSOLIDATED_BALANCE_ENDPOINT_NAME = 'balances-consolidated'
+
+
+class RateIndexTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.index = RateIndex([
+            ('EUR', 'USD', date(2023, 3, 1), Decimal('1.10')),
+            ('EUR', 'USD', date(2023, 1, 1), Decimal('1.05')),
+            ('USD', 'GBP', date(2023, 2, 1), Decimal('0.80')),
+        ])
+
+    def test_nearest_date_rates(self):
+        cases = (
+            ('Exact date', 'EUR', 'USD', date(2023, 3, 1), Decimal('1.10')),
+            ('Previous date', 'EUR', 'USD', date(2023, 2, 15), Decimal('1.05')),
+            ('Date after the last rate', 'EUR', 'USD', date(2024, 1, 1), Decimal('1.10')),
+            ('Date before the first rate', 'EUR', 'USD', date(2022, 1, 1), Decimal('1.05')),
+            ('Reverse pair', 'GBP', 'USD', date(2023, 2, 1), Decimal('1.25')),
+            ('Same currency', 'GBP', 'GBP', date(2023, 2, 1), Decimal('1')),
+        )
+        for case_name, base_currency, quote_currency, day, rate in cases:
+            with self.subTest(case_name=case_name):
+                self.assertEqual(self.index.get_rate(base_currency, quote_currency, day), rate, msg='rate mismatch')
+
+    def test_missing_rate(self):
+        with self.assertRaises(CurrencyConversionError):
+            self.index.get_rate('EUR', 'GBP', date(2023, 2, 1))
+
+    def test_convert_totals(self):
+        totals = [
+            ('EUR', date(2023, 3, 1), Decimal('10.00')),
+            ('EUR', date(2023, 3, 1), Decimal('5.00')),
+            ('EUR', date(2023, 1, 10), Decimal('20.00')),
+            ('USD', date(2023, 3, 1), Decimal('1.00')),
+        ]
+        self.assertEqual(convert_totals(totals, 'USD', self.index), Decimal('38.50'), msg='converted total mismatch')
+
+
+class ConsolidatedBalanceTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.usd = Currency.objects.create(name='US Dollar', iso_code='USD')
+        self.eur = Currency.objects.create(name='Euro', iso_code='EUR')
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('100.00'), currency=self.usd)
+        self.usd_fund = self.setup_fund(self.profile, name='Food', balance=Decimal('50.00'))
+        self.eur_fund = self.setup_fund(self.profile, name='Travel', balance=Decimal('200.00'), currency=self.eur)
+        with self.captureOnCommitCallbacks(execute=True):
+            save_exchange_rates([
+                ExchangeRate(base_currency=self.eur, quote_currency=self.usd, date=date(2023, 1, 1), rate='1.10'),
+                ExchangeRate(base_currency=self.eur, quote_currency=self.usd, date=date(2023, 2, 1), rate='1.20'),
+            ])
+
+    def test_consolidated_balance(self):
+        self.assertEqual(
+            get_consolidated_balance(self.profile, day=date(2023, 1, 15)),
+            Decimal('370.00'),
+            msg='consolidated balance mismatch',
+        )
+        self.assertEqual(
+            get_consolidated_balance(self.profile, 'EUR', day=date(2023, 2, 15)),
+            Decimal('325.00'),
+            msg='consolidated balance mismatch',
+        )
+
+    def test_rate_index_is_reloaded_after_rates_change(self):
+        get_rate_index()
+        with self.assertNumQueries(0):
+            get_rate_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExchangeRate.objects.create(base_currency=self.eur, quote_currency=self.usd, date=date(2023, 3, 1), rate=2)
+        self.assertEqual(
+            get_consolidated_balance(self.profile, day=date(2023, 3, 1)),
+            Decimal('550.00'),
+            msg='new rate is not used',
+        )
+
+    def create_transactions(self, transaction_type: str) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_create_transactions([
+                Transaction(
+                    type=transaction_type,
+                    amount=Decimal('10.00'),
+                    date_created=date_created,
+                    fund=fund,
+                    user_profile=self.profile,
+                )
+                for date_created, fund in (
+                    (datetime(2023, 1, 10, 12, tzinfo=timezone.utc), self.eur_fund),
+                    (datetime(2023, 2, 10, 12, tzinfo=timezone.utc), self.eur_fund),
+                    (datetime(2023, 2, 10, 12, tzinfo=timezone.utc), self.usd_fund),
+                )
+            ])
+
+    def test_consolidated_change(self):
+        self.create_transactions(Transaction.TransactionTypeChoices.INCOME)
+
+        self.assertEqual(
+            get_consolidated_change(self.profile, date(2023, 1, 1), date(2023, 3, 1)),
+            Decimal('33.00'),
+            msg='consolidated change mismatch',
+        )
+
+    def test_consolidated_balance_endpoint(self):
+        self.create_transactions(Transaction.TransactionTypeChoices.INCOME)
+
+        response = self.client.get(
+            reverse(CONSOLIDATED_BALANCE_ENDPOINT_NAME),
+            {'currency': 'eur', 'date_from': date(2023, 1, 1), 'date_to': date(2023, 3, 1)},
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(
+            (response.data['currency'], response.data['balance'], response.data['change']),
+            ('EUR', '353.33', '28.33'),
+            msg='consolidated balance mismatch',
+        )
+
+        cases = (
+            ('Unknown currency', {'currency': 'XYZ'}),
+            ('Invalid range', {'date_from': date(2023, 3, 1), 'date_to': date(2023, 1, 1)}),
+        )
+        for case_name, params in cases:
+            with self.subTest(case_name=case_name):
+                response = self.client.get(reverse(CONSOLIDATED_BALANCE_ENDPOINT_NAME), params)
+                self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
+
+    @override_settings(TELEGRAM_BOT_SECRET='test-telegram-bot-secret')
+    def test_consolidated_balance_of_cached_profile(self):
+        self.client.force_authenticate(user=None)
+        headers = {'HTTP_AUTHORIZATION': f'Bot {sign_telegram_id(self.common_user.telegram_id)}'}
+        response = self.client.get(reverse(CONSOLIDATED_BALANCE_ENDPOINT_NAME), **headers)
+        self.assertEqual(response.data['balance'], '390.00', msg='consolidated balance mismatch')
+
+        # Balance writers update the profile set-based, so the cached profile is not invalidated
+        Profile.objects.update(balance=F('balance') + Decimal('10.00'))
+        response = self.client.get(reverse(CONSOLIDATED_BALANCE_ENDPOINT_NAME), **headers)
+        self.assertEqual(response.data['balance'], '400.00', msg='cached profile balance is used')
+
+    def test_user_budget_spending_is_converted(self):
+        self.create_transactions(Transaction.TransactionTypeChoices.EXPENSE)
+        budget = UserBudget.objects.create(
+            period=BudgetPeriodChoices.ANNUALLY,
+            amount=Decimal('100.00'),
+            user_profile=self.profile,
+            end_date=date(2023, 12, 31),
+        )
+
+        self.assertEqual(get_budget_spending(budget), Decimal('33.00'), msg='user budget spending mismatch')
+        self.assertEqual(
+            get_budgets_status(self.profile.id)['user_budgets'][0].spent,
+            Decimal('33.00'),
+            msg='user budget status spending mismatch',
+        )
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_422_UNPROCESSABLE_ENTITY
+
+from finances import idempotency
+from finances.models import IdempotencyKey, Transaction, Transfer
+from utils.tests.api import BaseAPITestCase
+
+BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME = 'transactions-bulk-create'
+CREATE_TRANSFER_ENDPOINT_NAME = 'transfers-create'
+
+
+@override_settings(IDEMPOTENCY_KEY_TTL=24)
+class IdempotencyKeyTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('500.00'))
+        self.fund = self.setup_fund(self.profile, name='Food', balance=Decimal('100.00'))
+        self.data = [{'type': Transaction.TransactionTypeChoices.EXPENSE, 'amount': '30.00', 'fund': self.fund.id}]
+
+    def create_transactions(self, data: list[dict], key: str = None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key is not None else {}
+        return self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=data, format='json', **headers)
+
+    def assertFundBalance(self, balance: str):
+        self.fund.refresh_from_db()
+        self.assertEqual(self.fund.balance, Decimal(balance), msg='fund balance mismatch')
+
+    def test_retry_replays_response(self):
+        response = self.create_transactions(self.data, key='retry-1')
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+        self.assertNotIn('Idempotent-Replayed', response)
+
+        with self.assertNumQueries(1):
+            replayed_response = self.create_transactions(self.data, key='retry-1')
+
+        self.assertEqual(replayed_response.status_code, HTTP_201_CREATED, msg='invalid status code')
+        self.assertEqual(replayed_response['Idempotent-Replayed'], 'true')
+        self.assertEqual(replayed_response.json(), response.json(), msg='response is not replayed')
+        self.assertEqual(Transaction.objects.count(), 1, msg='write is repeated')
+        self.assertFundBalance('70.00')
+
+    def test_writes_without_key_are_repeated(self):
+        self.create_transactions(self.data)
+        self.create_transactions(self.data)
+
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists(), msg='key is stored without the header')
+
+    def test_invalid_keys(self):
+        self.create_transactions(self.data, key='reused')
+        other_data = [{**self.data[0], 'amount': '5.00'}]
+
+        cases = (
+            ('Key of another request', other_data, 'reused', HTTP_422_UNPROCESSABLE_ENTITY),
+            ('Empty key', self.data, '', HTTP_400_BAD_REQUEST),
+            ('Too long key', self.data, 'k' * 65, HTTP_400_BAD_REQUEST),
+        )
+        for case_name, data, key, status_code in cases:
+            with self.subTest(case_name=case_name):
+                response = self.create_transactions(data, key=key)
+                self.assertEqual(response.status_code, status_code, msg='invalid status code')
+
+        self.assertFundBalance('70.00')
+
+    def test_failed_request_is_not_stored(self):
+        invalid_data = [{**self.data[0], 'fund': 999999}]
+        for _ in range(2):
+            response = self.create_transactions(invalid_data, key='failed')
+            self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
+            self.assertNotIn('Idempotent-Replayed', response)
+
+        self.assertFalse(IdempotencyKey.objects.exists(), msg='failed request is stored')
+
+    def test_keys_are_per_user(self):
+        self.create_transactions(self.data, key='shared')
+        other_user = self.setup_common_user(telegram_id='5555555555', username='other_user', email='other@example.com')
+        other_fund = self.setup_fund(self.setup_profile(other_user), name='Food')
+
+        response = self.create_transactions([{**self.data[0], 'fund': other_fund.id}], key='shared')
+
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_concurrent_request_gets_first_response(self):
+        first_response = self.create_transactions(self.data, key='concurrent')
+
+        # The retry looks the key up before the first request commits it
+        with patch.object(idempotency, 'get_idempotency_key', side_effect=[None, IdempotencyKey.objects.get()]):
+            response = self.create_transactions(self.data, key='concurrent')
+
+        self.assertEqual(response.json(), first_response.json(), msg='response is not replayed')
+        self.assertEqual(Transaction.objects.count(), 1, msg='write of the retry is not rolled back')
+        self.assertFundBalance('70.00')
+
+    def test_expired_keys(self):
+        self.create_transactions(self.data, key='expired')
+        IdempotencyKey.objects.update(date_created=timezone.now() - timedelta(hours=25))
+
+        response = self.create_transactions(self.data, key='expired')
+        self.assertNotIn('Idempotent-Replayed', response, msg='expired key is replayed')
+        self.assertEqual(Transaction.objects.count(), 2)
+
+        self.create_transactions(self.data, key='other')
+        IdempotencyKey.objects.filter(key='expired').update(date_created=timezone.now() - timedelta(hours=25))
+        output = StringIO()
+        call_command('delete_idempotency_keys', stdout=output)
+
+        self.assertIn('Deleted 1 expired idempotency keys', output.getvalue())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['other'])
+
+    def test_transfer_retry(self):
+        other_fund = self.setup_fund(self.profile, name='Travel', balance=Decimal('0.00'))
+        data = {'source_fund': self.fund.id, 'destination_fund': other_fund.id, 'amount': '40.00'}
+
+        for _ in range(2):
+            response = self.client.post(
+                reverse(CREATE_TRANSFER_ENDPOINT_NAME),
+                data=data,
+                format='json',
+                HTTP_IDEMPOTENCY_KEY='transfer-1',
+            )
+            self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+
+        self.assertEqual(Transfer.objects.count(), 1, msg='transfer is repeated')
+        self.assertFundBalance('60.00')
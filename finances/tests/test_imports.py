@@ -0,0 +1,182 @@
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_202_ACCEPTED, HTTP_400_BAD_REQUEST
+
+from finances.importers import parse_ofx, run_import, start_import
+from finances.models import Transaction, TransactionImport
+from jobs.models import Job
+from jobs.worker import Worker
+from utils.tests.api import BaseAPITestCase
+
+IMPORT_TRANSACTIONS_ENDPOINT_NAME = 'transactions-import'
+DETAIL_IMPORT_ENDPOINT_NAME = 'transactions-import-detail'
+
+CSV_CONTENT = (
+    'date,amount,type,fund,comment\n'
+    '2021-01-05,1500.00,IN,Salary,January salary\n'
+    '2021-01-06,-20.50,,Food,Groceries\n'
+    '2021-01-07T10:30:00,12.00,EX,food,Coffee\n'
+)
+
+OFX_CONTENT = (
+    'OFXHEADER:100\n'
+    '<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n'
+    '<STMTTRN>\n'
+    '<TRNTYPE>DEBIT\n'
+    '<DTPOSTED>20210105120000.000[-5:EST]\n'
+    '<TRNAMT>-42.10\n'
+    '<NAME>Book store\n'
+    '</STMTTRN>\n'
+    '<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20210106<TRNAMT>100.00<MEMO>Refund</STMTTRN>\n'
+    '</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n'
+)
+
+
+class InterruptedImportError(Exception):
+    pass
+
+
+class TransactionImportTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user)
+
+    def test_import_csv(self):
+        response = self.client.post(
+            reverse(IMPORT_TRANSACTIONS_ENDPOINT_NAME),
+            data={'file': SimpleUploadedFile('history.csv', CSV_CONTENT.encode())},
+            format='multipart',
+        )
+        self.assertEqual(
+            response.status_code,
+            HTTP_201_CREATED,
+            msg=f'status code mismatch.\nResponse body: {response.data}',
+        )
+        self.assertEqual(response.data['status'], TransactionImport.StatusChoices.COMPLETED)
+        self.assertEqual(response.data['rows_committed'], 3)
+
+        funds = {fund.name: fund for fund in self.profile.funds.all()}
+        self.assertEqual(set(funds), {'Salary', 'Food'}, msg='funds are not mapped by name')
+        self.assertEqual(funds['Salary'].balance, Decimal('1500.00'), msg='fund balance mismatch')
+        self.assertEqual(funds['Food'].balance, Decimal('-32.50'), msg='fund balance mismatch')
+
+        first_transaction = Transaction.objects.order_by('date_created').first()
+        self.assertEqual(first_transaction.date_created.year, 2021, msg='transaction date is not imported')
+
+        response = self.client.get(reverse(DETAIL_IMPORT_ENDPOINT_NAME, args=(response.data['id'],)))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+    def test_import_invalid_csv(self):
+        response = self.client.post(
+            reverse(IMPORT_TRANSACTIONS_ENDPOINT_NAME),
+            data={'file': SimpleUploadedFile('history.csv', b'date,amount\n2021-01-05,abc\n')},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
+        self.assertEqual(TransactionImport.objects.get().status, TransactionImport.StatusChoices.FAILED)
+
+    def test_import_csv_in_background(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            response = self.client.post(
+                reverse(IMPORT_TRANSACTIONS_ENDPOINT_NAME),
+                data={'file': SimpleUploadedFile('history.csv', CSV_CONTENT.encode()), 'background': True},
+                format='multipart',
+            )
+            self.assertEqual(response.status_code, HTTP_202_ACCEPTED, msg='invalid status code')
+            self.assertEqual(response.data['status'], TransactionImport.StatusChoices.IN_PROGRESS)
+            self.assertFalse(Transaction.objects.exists(), msg='file is imported during the request')
+
+            Worker().run(once=True)
+
+            self.assertEqual(Job.objects.get(id=response.data['job']).status, Job.StatusChoices.SUCCEEDED)
+            self.assertEqual(os.listdir(os.path.join(directory, 'imports', str(response.data['id']))), [])
+
+        transaction_import = TransactionImport.objects.get(id=response.data['id'])
+        self.assertEqual(transaction_import.status, TransactionImport.StatusChoices.COMPLETED)
+        self.assertEqual(transaction_import.rows_committed, 3)
+
+    def test_pending_import_is_not_queued_again(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            job_ids = []
+            for _ in range(2):
+                response = self.client.post(
+                    reverse(IMPORT_TRANSACTIONS_ENDPOINT_NAME),
+                    data={'file': SimpleUploadedFile('history.csv', CSV_CONTENT.encode()), 'background': True},
+                    format='multipart',
+                )
+                self.assertEqual(response.status_code, HTTP_202_ACCEPTED, msg='invalid status code')
+                job_ids.append(response.data['job'])
+
+            self.assertEqual(job_ids[0], job_ids[1], msg='pending import is queued again')
+            self.assertEqual(TransactionImport.objects.count(), 1, msg='retried upload created another import')
+            self.assertEqual(len(os.listdir(os.path.join(directory, 'imports', str(response.data['id'])))), 1)
+
+            Worker().run(once=True)
+
+        self.assertEqual(Transaction.objects.count(), 3, msg='rows are imported more than once')
+
+    def test_parse_ofx(self):
+        rows = list(parse_ofx(io.StringIO(OFX_CONTENT)))
+        self.assertEqual(len(rows), 2, msg='invalid amount of parsed transactions')
+        self.assertEqual(rows[0].type, Transaction.TransactionTypeChoices.EXPENSE)
+        self.assertEqual(rows[0].amount, Decimal('42.10'))
+        self.assertEqual(rows[0].comment, 'Book store')
+        self.assertEqual(rows[1].type, Transaction.TransactionTypeChoices.INCOME)
+        self.assertEqual(rows[1].comment, 'Refund')
+
+    def test_resume_interrupted_import(self):
+        file = io.BytesIO(CSV_CONTENT.encode())
+
+        def interrupt(transaction_import):
+            raise InterruptedImportError
+
+        transaction_import = start_import(self.profile, file, 'history.csv')
+        with self.assertRaises(InterruptedImportError):
+            run_import(transaction_import, file, chunk_size=2, on_progress=interrupt)
+        self.assertEqual(Transaction.objects.count(), 2, msg='first chunk is not committed')
+
+        transaction_import = start_import(self.profile, file, 'history.csv')
+        self.assertEqual(transaction_import.rows_committed, 2, msg='import progress is lost')
+        run_import(transaction_import, file, chunk_size=2)
+
+        self.assertEqual(Transaction.objects.count(), 3, msg='rows are imported more than once')
+        self.assertEqual(transaction_import.status, TransactionImport.StatusChoices.COMPLETED)
+
+    def test_concurrent_runs_import_rows_once(self):
+        file = io.BytesIO(CSV_CONTENT.encode())
+
+        def interrupt(transaction_import):
+            raise InterruptedImportError
+
+        # Both runs start before any rows are committed
+        transaction_import = start_import(self.profile, file, 'history.csv')
+        other_run_import = TransactionImport.objects.get(id=transaction_import.id)
+        with self.assertRaises(InterruptedImportError):
+            run_import(other_run_import, file, chunk_size=2, on_progress=interrupt)
+
+        file.seek(0)
+        run_import(transaction_import, file, chunk_size=2)
+
+        self.assertEqual(Transaction.objects.count(), 3, msg='rows are imported more than once')
+        self.assertEqual(transaction_import.rows_committed, 3, msg='import progress mismatch')
+
+    def test_import_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'history.ofx')
+            with open(path, 'w') as file:
+                file.write(OFX_CONTENT)
+
+            output = io.StringIO()
+            call_command('import_transactions', path, user_id=self.common_user.id, default_fund='Bank', stdout=output)
+            call_command('import_transactions', path, user_id=self.common_user.id, default_fund='Bank', stdout=output)
+
+        self.assertIn('completed: 2 rows', output.getvalue())
+        self.assertEqual(Transaction.objects.filter(fund__name='Bank').count(), 2, msg='file is imported twice')
@@ -0,0 +1,148 @@
+from datetime import datetime, time, timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from finances.models import Transaction, TransactionArchive
+from finances.partitions import (DEFAULT_PARTITION, add_months, archive_partitions, create_partition,
+                                 create_upcoming_partitions, get_partitions)
+from finances.reconciliation import find_drifts
+from finances.services import bulk_create_transactions
+from utils.tests.api import BaseAPITestCase
+
+
+def _month_start(months: int) -> datetime:
+    return datetime.combine(add_months(datetime.now(timezone.utc).date(), months), time(), tzinfo=timezone.utc)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'transactions are partitioned on PostgreSQL only')
+class TransactionPartitionsTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('500.00'))
+        self.fund = self.setup_fund(self.profile, name='Food', balance=Decimal('100.00'))
+
+    def create_transactions(self, *dates: datetime) -> list[Transaction]:
+        types = Transaction.TransactionTypeChoices
+        return bulk_create_transactions([
+            Transaction(
+                type=transaction_type,
+                amount=Decimal('10.00'),
+                date_created=date_created,
+                fund=self.fund,
+                user_profile=self.profile,
+            )
+            for date_created in dates
+            for transaction_type in (types.INCOME, types.EXPENSE, types.TRANSFER)
+        ])
+
+    def get_partition_name(self, transaction: Transaction) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM finances_transaction WHERE id = %s', [transaction.id])
+            return cursor.fetchone()[0]
+
+    def test_transactions_are_routed_by_month(self):
+        next_month = _month_start(1)
+        current, upcoming = self.create_transactions(datetime.now(timezone.utc), next_month)[::3]
+
+        self.assertEqual(self.get_partition_name(upcoming), f'finances_transaction_p{next_month:%Y_%m}')
+        self.assertNotEqual(self.get_partition_name(current), self.get_partition_name(upcoming))
+
+        plan = Transaction.objects.filter(date_created__gte=next_month, date_created__lt=_month_start(2)).explain()
+        self.assertIn(f'finances_transaction_p{next_month:%Y_%m}', plan, msg='month partition is not scanned')
+        self.assertNotIn(DEFAULT_PARTITION, plan, msg='partitions are not pruned')
+
+    def test_create_upcoming_partitions(self):
+        created = create_upcoming_partitions(months_ahead=5)
+
+        self.assertEqual(
+            [partition.name for partition in created],
+            [f'finances_transaction_p{_month_start(months):%Y_%m}' for months in (4, 5)],
+        )
+        self.assertEqual(create_upcoming_partitions(months_ahead=5), [], msg='partitions are created twice')
+
+    def test_partition_takes_rows_from_default_partition(self):
+        month = _month_start(8)
+        transaction, = self.create_transactions(month)[:1]
+        self.assertEqual(self.get_partition_name(transaction), DEFAULT_PARTITION)
+
+        partition = create_partition(month.date())
+
+        self.assertEqual(self.get_partition_name(transaction), partition.name)
+        self.assertEqual(Transaction.objects.filter(date_created__gte=month).count(), 3)
+
+    def test_archive_keeps_balances_reconciled(self):
+        last_month = _month_start(-1)
+        self.create_transactions(last_month, datetime.now(timezone.utc), _month_start(1))
+        self.fund.refresh_from_db()
+        self.profile.refresh_from_db()
+        oldest_partition = get_partitions()[0]
+
+        archived = archive_partitions(oldest_partition.end)
+
+        self.assertEqual(archived, {oldest_partition.name: 3}, msg='transactions of the current month are archived')
+        self.assertEqual(TransactionArchive.objects.count(), 3)
+        self.assertEqual(Transaction.objects.count(), 6)
+        self.assertEqual(find_drifts([self.profile.id]), [], msg='archived balances drifted')
+
+        balance, profile_balance = self.fund.balance, self.profile.balance
+        self.fund.refresh_from_db()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.fund.balance, balance, msg='archiving changed the balance')
+        self.assertEqual(self.profile.balance, profile_balance, msg='archiving changed the balance')
+        self.assertEqual(self.fund.opening_balance, Decimal('110.00'), msg='invalid opening balance')
+        self.assertEqual(self.profile.opening_balance, Decimal('490.00'), msg='invalid opening balance')
+
+    def test_split_legacy_partition(self):
+        legacy = get_partitions()[0]
+        self.assertIsNone(legacy.start, msg='migrated table is not attached as the partition of earlier months')
+        self.assertEqual(legacy.end, _month_start(0).date(), msg='current month is left in the migrated table')
+        transactions = self.create_transactions(_month_start(-3), _month_start(-1))[::3]
+
+        output = StringIO()
+        call_command('create_transaction_partitions', '--split-legacy', '--months-ahead=0', stdout=output)
+
+        self.assertIn('Created 3 partitions', output.getvalue())
+        self.assertEqual(
+            [self.get_partition_name(transaction) for transaction in transactions],
+            [f'finances_transaction_p{_month_start(months):%Y_%m}' for months in (-3, -1)],
+        )
+        self.assertNotIn(legacy.name, [partition.name for partition in get_partitions()])
+        self.assertEqual(Transaction.objects.count(), 6, msg='transactions are lost')
+
+    def test_ids_are_not_unique(self):
+        transaction, = self.create_transactions(datetime.now(timezone.utc))[:1]
+
+        # The primary key includes the date, so only the sequence keeps IDs unique
+        Transaction(
+            id=transaction.id,
+            type=transaction.type,
+            amount=transaction.amount,
+            date_created=_month_start(1),
+            fund=self.fund,
+            user_profile=self.profile,
+        ).save(force_insert=True)
+
+        self.assertEqual(Transaction.objects.filter(id=transaction.id).count(), 2)
+
+    def test_archive_command(self):
+        output = StringIO()
+        call_command('archive_transactions', '--before=2000-01-01', stdout=output)
+
+        self.assertIn('Archived 0 transactions', output.getvalue())
+
+
+@skipUnless(connection.vendor != 'postgresql', 'transactions are partitioned on PostgreSQL')
+class UnpartitionedTransactionsTestCase(BaseAPITestCase):
+    def test_commands_fail(self):
+        cases = (
+            ('create_transaction_partitions', '--months-ahead=1'),
+            ('archive_transactions', '--before=2000-01-01'),
+        )
+        for command, argument in cases:
+            with self.subTest(case_name=command), self.assertRaises(CommandError):
+                call_command(command, argument)
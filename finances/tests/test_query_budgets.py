@@ -0,0 +1,61 @@
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED
+
+from utils.tests.performance import QueryBudgetTestCase
+
+LIST_TRANSACTIONS_ENDPOINT_NAME = 'transactions-list'
+BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME = 'transactions-bulk-create'
+CREATE_TRANSFER_ENDPOINT_NAME = 'transfers-create'
+BUDGETS_STATUS_ENDPOINT_NAME = 'budgets-status'
+
+
+class FinancesQueryBudgetTestCase(QueryBudgetTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_authenticate(user=self.budget_user)
+
+    def test_transactions_list_budget(self):
+        url = reverse(LIST_TRANSACTIONS_ENDPOINT_NAME)
+        response = self.assertEndpointBudget('transactions-list', 1, lambda: self.client.get(url))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+        next_page = response.data['next']
+        response = self.assertEndpointBudget('transactions-list-next-page', 1, lambda: self.client.get(next_page))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+        fund_id = self.budget_funds[0].id
+        response = self.assertEndpointBudget(
+            'transactions-list-filtered',
+            1,
+            lambda: self.client.get(url, data={'fund': fund_id, 'type': 'EX'}),
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+    def test_transactions_bulk_create_budget(self):
+        data = [
+            {'type': 'EX', 'amount': '1.00', 'fund': self.budget_funds[index % self.FUNDS_PER_PROFILE].id}
+            for index in range(100)
+        ]
+        response = self.assertEndpointBudget(
+            'transactions-bulk-create',
+            8,
+            lambda: self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=data, format='json'),
+        )
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+
+    def test_transfer_budget(self):
+        data = {'source_fund': self.budget_funds[0].id, 'destination_fund': self.budget_funds[1].id, 'amount': '1.00'}
+        response = self.assertEndpointBudget(
+            'transfers-create',
+            11,
+            lambda: self.client.post(reverse(CREATE_TRANSFER_ENDPOINT_NAME), data=data, format='json'),
+        )
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+
+    def test_budgets_status_budget(self):
+        response = self.assertEndpointBudget(
+            'budgets-status',
+            3,
+            lambda: self.client.get(reverse(BUDGETS_STATUS_ENDPOINT_NAME)),
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
@@ -0,0 +1,94 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TransactionTestCase, skipUnlessDBFeature
+
+from finances.models import Fund, Transaction, Transfer
+from finances.services import bulk_create_transactions, create_transfer
+from users.models import Profile, UserRolesChoices
+from utils.tests.api import BaseAPITestCase
+
+User = get_user_model()
+
+
+class ReconciliationTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('500.00'))
+        self.fund = self.setup_fund(self.profile, name='Food', balance=Decimal('100.00'))
+        self.other_fund = self.setup_fund(self.profile, name='Travel')
+
+        types = Transaction.TransactionTypeChoices
+        bulk_create_transactions([
+            Transaction(type=types.INCOME, amount=Decimal('50.00'), fund=self.fund, user_profile=self.profile),
+            Transaction(type=types.EXPENSE, amount=Decimal('20.00'), fund=self.fund, user_profile=self.profile),
+            Transaction(type=types.TRANSFER, amount=Decimal('70.00'), fund=self.other_fund, user_profile=self.profile),
+        ])
+        create_transfer(
+            Transfer(
+                amount=Decimal('30.00'),
+                source_fund=self.fund,
+                destination_fund=self.other_fund,
+                user_profile=self.profile,
+            )
+        )
+
+    def reconcile(self, *args) -> str:
+        output = StringIO()
+        call_command('reconcile_balances', *args, stdout=output)
+
+        return output.getvalue()
+
+    def test_consistent_balances(self):
+        self.assertIn('All balances are reconciled', self.reconcile())
+
+    def test_report_and_repair_drift(self):
+        Fund.objects.filter(id=self.fund.id).update(balance=F('balance') + Decimal('5.00'))
+        Profile.objects.filter(id=self.profile.id).update(balance=Decimal('0.00'))
+
+        output = self.reconcile('--chunk-size=1')
+        self.assertIn('Found 2 drifted balances', output)
+        self.assertIn(f'fund #{self.fund.id} (profile #{self.profile.id}): balance 105.00, expected 100.00', output)
+        self.fund.refresh_from_db()
+        self.assertEqual(self.fund.balance, Decimal('105.00'), msg='balance is repaired without --repair')
+
+        self.assertIn('Repaired 2 drifted balances', self.reconcile('--repair'))
+        self.fund.refresh_from_db()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.fund.balance, Decimal('100.00'), msg='fund balance is not repaired')
+        self.assertEqual(self.profile.balance, Decimal('430.00'), msg='profile balance is not repaired')
+        self.assertIn('All balances are reconciled', self.reconcile())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ParallelReconciliationTestCase(TransactionTestCase):
+    def test_parallel_reconciliation(self):
+        funds = []
+        for index in range(6):
+            user = User.objects.create_user(
+                telegram_id=f'12345678{index}',
+                username=f'user_{index}',
+                email=f'user_{index}@example.com',
+                password='test-user-password-911',
+                role=UserRolesChoices.REGISTERED,
+            )
+            profile = Profile.objects.create(user=user, balance=Decimal('100.00'))
+            funds.append(
+                Fund.objects.create(
+                    name='Fund',
+                    balance=Decimal('0.00'),
+                    goal=Decimal('0.00'),
+                    budget=Decimal('0.00'),
+                    user_profile=profile,
+                )
+            )
+        Fund.objects.filter(id__in=[fund.id for fund in funds[::2]]).update(balance=Decimal('1.00'))
+
+        output = StringIO()
+        call_command('reconcile_balances', '--chunk-size=2', '--workers=3', '--repair', stdout=output)
+        self.assertIn('Repaired 3 drifted balances', output.getvalue())
+        self.assertFalse(Fund.objects.exclude(balance=Decimal('0.00')).exists(), msg='drift is not repaired')
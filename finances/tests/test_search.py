@@ -0,0 +1,89 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from finances.models import Transaction
+from utils.tests.api import BaseAPITestCase
+
+SEARCH_ENDPOINT_NAME = 'search'
+
+
+class SearchTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        other_user = self.setup_common_user(telegram_id='5555555555', username='other_user', email='other@example.com')
+        other_fund = self.setup_fund(self.setup_profile(other_user), name='Coffee')
+        self.create_transaction(other_fund, 'Coffee beans')
+
+        self.setup_common_user()
+        profile = self.setup_profile(self.common_user)
+        self.food_fund = self.setup_fund(profile, name='Food')
+        self.coffee_fund = self.setup_fund(profile, name='Coffee shops')
+        self.food_fund.description = 'Groceries and coffee'
+        self.food_fund.save()
+
+        self.espresso = self.create_transaction(self.food_fund, 'Espresso, coffee and more coffee')
+        self.latte = self.create_transaction(self.coffee_fund, 'Latte at the station coffee shop')
+        self.create_transaction(self.food_fund, 'Groceries')
+
+    def create_transaction(self, fund, comment: str) -> Transaction:
+        return Transaction.objects.create(
+            type=Transaction.TransactionTypeChoices.EXPENSE,
+            amount=Decimal('3.00'),
+            comment=comment,
+            fund=fund,
+            user_profile_id=fund.user_profile_id,
+        )
+
+    def search(self, **params) -> dict:
+        response = self.client.get(reverse(SEARCH_ENDPOINT_NAME), params)
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+        return response.data
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search is supported on PostgreSQL only')
+    def test_search(self):
+        data = self.search(q='coffee')
+
+        self.assertEqual(
+            {transaction['id'] for transaction in data['transactions']},
+            {self.espresso.id, self.latte.id},
+            msg='transactions of other users are found',
+        )
+        self.assertEqual(
+            [fund['id'] for fund in data['funds']],
+            [self.coffee_fund.id, self.food_fund.id],
+            msg='name matches are not ranked first',
+        )
+        self.assertGreaterEqual(data['funds'][0]['rank'], data['funds'][1]['rank'])
+        self.assertEqual(data['transactions'][0]['id'], self.espresso.id, msg='results are not ranked')
+
+        data = self.search(q='coffee', limit=1)
+        self.assertEqual((len(data['transactions']), len(data['funds'])), (1, 1), msg='limit is ignored')
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search is supported on PostgreSQL only')
+    def test_words_are_matched_by_prefix(self):
+        cases = (
+            ('Prefix', {'q': 'espr'}, [self.espresso.id]),
+            ('All words', {'q': 'COFFEE station'}, [self.latte.id]),
+            ('Punctuation', {'q': 'latte, coffee!'}, [self.latte.id]),
+            ('No match', {'q': 'rent'}, []),
+        )
+        for case_name, params, expected_ids in cases:
+            with self.subTest(case_name=case_name):
+                ids = [transaction['id'] for transaction in self.search(**params)['transactions']]
+                self.assertEqual(ids, expected_ids)
+
+    def test_invalid_query(self):
+        cases = (
+            ('Missing', {}),
+            ('No words', {'q': '?! ...'}),
+            ('Limit above maximum', {'q': 'coffee', 'limit': 1000}),
+        )
+        for case_name, params in cases:
+            with self.subTest(case_name=case_name):
+                response = self.client.get(reverse(SEARCH_ENDPOINT_NAME), params)
+                self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
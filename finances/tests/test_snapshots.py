@@ -0,0 +1,199 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from finances.models import BalanceSnapshot, Fund, Transaction, TransactionArchive
+from finances.services import bulk_create_transactions
+from finances.snapshots import delete_old_balance_snapshots, get_balances_at
+from jobs.worker import Worker
+from users.authentication import sign_telegram_id
+from users.models import Profile
+from utils.tests.api import BaseAPITestCase
+
+BALANCE_HISTORY_ENDPOINT_NAME = 'balances-history'
+
+
+class BalanceSnapshotTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.today = timezone.localdate()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('500.00'))
+        self.fund = self.setup_fund(self.profile, name='Food', balance=Decimal('100.00'))
+        Profile.objects.update(date_created=self.get_time(10))
+        Fund.objects.update(date_created=self.get_time(10))
+        self.profile.refresh_from_db()
+
+        types = Transaction.TransactionTypeChoices
+        self.create_transactions(
+            (types.INCOME, '50.00', 5),
+            (types.EXPENSE, '20.00', 3),
+            (types.TRANSFER, '70.00', 1),
+            (types.EXPENSE, '10.00', 0),
+        )
+
+    def get_day(self, days_ago: int) -> date:
+        return self.today - timedelta(days=days_ago)
+
+    def get_time(self, days_ago: int) -> datetime:
+        return timezone.make_aware(datetime.combine(self.get_day(days_ago), datetime.min.time())) + timedelta(hours=1)
+
+    def create_transactions(self, *transactions: tuple) -> list[Transaction]:
+        return bulk_create_transactions([
+            Transaction(
+                type=transaction_type,
+                amount=Decimal(amount),
+                date_created=self.get_time(days_ago),
+                fund=self.fund,
+                user_profile=self.profile,
+            )
+            for transaction_type, amount, days_ago in transactions
+        ])
+
+    def write_snapshots(self, *args) -> str:
+        output = StringIO()
+        call_command('write_balance_snapshots', *args, stdout=output)
+
+        return output.getvalue()
+
+    def assertBalances(self, days_ago: int, balance: str, fund_balance: str):
+        response = self.client.get(reverse(BALANCE_HISTORY_ENDPOINT_NAME), {'date': self.get_day(days_ago)})
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(
+            (response.data['balance'], response.data['funds']),
+            (balance, [{'fund': self.fund.id, 'balance': fund_balance}]),
+            msg=f'balances mismatch {days_ago} days ago',
+        )
+
+    def assertHistory(self):
+        self.assertBalances(6, '500.00', '100.00')
+        self.assertBalances(4, '500.00', '150.00')
+        self.assertBalances(2, '500.00', '130.00')
+        self.assertBalances(1, '430.00', '200.00')
+        self.assertBalances(0, '430.00', '190.00')
+
+    def test_balances_without_snapshots(self):
+        self.assertHistory()
+
+        response = self.client.get(reverse(BALANCE_HISTORY_ENDPOINT_NAME), {'date': self.get_day(20)})
+        self.assertEqual(response.data['funds'], [], msg='fund created after the day is returned')
+
+    def test_balances_from_snapshots(self):
+        output = self.write_snapshots('--days=7')
+
+        self.assertIn('Wrote 14 balance snapshots', output)
+        self.assertEqual(
+            list(BalanceSnapshot.objects.filter(fund=self.fund).order_by('-day').values_list('balance', flat=True)),
+            [Decimal(balance) for balance in ('200.00', '130.00', '130.00', '150.00', '150.00', '100.00', '100.00')],
+        )
+        self.assertHistory()
+
+        # The nearest snapshot is moved forward by the transactions made after it
+        BalanceSnapshot.objects.filter(day__in=(self.get_day(2), self.get_day(3))).delete()
+        BalanceSnapshot.objects.filter(day=self.get_day(4)).update(balance=F('balance') + Decimal('1.00'))
+        self.assertBalances(2, '501.00', '131.00')
+        with self.assertNumQueries(5):
+            get_balances_at(self.profile.id, self.get_day(2))
+
+        self.write_snapshots(f'--day={self.get_day(2)}', '--days=3')
+        self.assertBalances(2, '500.00', '130.00')
+
+    def test_backdated_transactions_rewrite_snapshots(self):
+        self.write_snapshots('--days=7')
+
+        self.create_transactions((Transaction.TransactionTypeChoices.EXPENSE, '5.00', 4))
+
+        self.assertEqual(
+            list(BalanceSnapshot.objects.filter(fund=self.fund).order_by('day').values_list('day', flat=True)),
+            [self.get_day(7), self.get_day(6), self.get_day(5)],
+            msg='outdated snapshots are kept',
+        )
+        self.assertBalances(2, '500.00', '125.00')
+
+        Worker().run(once=True)
+
+        self.assertEqual(
+            list(BalanceSnapshot.objects.filter(fund=self.fund).order_by('-day').values_list('balance', flat=True)),
+            [Decimal(balance) for balance in ('195.00', '125.00', '125.00', '145.00', '150.00', '100.00', '100.00')],
+            msg='outdated snapshots are not written again',
+        )
+
+    def test_moved_transaction_rewrites_snapshots(self):
+        self.write_snapshots('--days=7')
+
+        transaction = Transaction.objects.get(type=Transaction.TransactionTypeChoices.INCOME)
+        transaction.date_created = self.get_time(2)
+        transaction.save()
+
+        self.assertFalse(
+            BalanceSnapshot.objects.filter(day=self.get_day(4)).exists(),
+            msg='snapshots after the saved date are kept',
+        )
+        Worker().run(once=True)
+        self.assertBalances(4, '500.00', '100.00')
+        self.assertBalances(2, '500.00', '130.00')
+
+    def test_archived_transactions(self):
+        # Archiving moves the transactions out of the table and adds them to the opening balances
+        transaction = Transaction.objects.get(type=Transaction.TransactionTypeChoices.INCOME)
+        TransactionArchive.objects.create(
+            id=transaction.id,
+            type=transaction.type,
+            amount=transaction.amount,
+            date_created=transaction.date_created,
+            fund_id=transaction.fund_id,
+            user_profile_id=transaction.user_profile_id,
+        )
+        Transaction.objects.filter(id=transaction.id).delete()
+        Fund.objects.update(opening_balance=F('opening_balance') + transaction.amount)
+
+        self.assertHistory()
+        self.write_snapshots('--days=7')
+        self.assertHistory()
+
+    @override_settings(TELEGRAM_BOT_SECRET='test-telegram-bot-secret')
+    def test_balances_of_cached_profile(self):
+        self.client.force_authenticate(user=None)
+        headers = {'HTTP_AUTHORIZATION': f'Bot {sign_telegram_id(self.common_user.telegram_id)}'}
+        params = {'date': self.get_day(20)}
+        response = self.client.get(reverse(BALANCE_HISTORY_ENDPOINT_NAME), params, **headers)
+        self.assertEqual(response.data['balance'], '500.00', msg='balance mismatch')
+
+        # Archiving changes the opening balances set-based, so the cached profile is not invalidated
+        Profile.objects.update(opening_balance=F('opening_balance') + Decimal('1.00'))
+        response = self.client.get(reverse(BALANCE_HISTORY_ENDPOINT_NAME), params, **headers)
+        self.assertEqual(response.data['balance'], '501.00', msg='cached profile balance is returned')
+
+    @override_settings(BALANCE_SNAPSHOTS_DAILY_RETENTION=30)
+    def test_old_snapshots_are_thinned_out(self):
+        # The job missed the end of February
+        days = [date(2026, 1, 30), date(2026, 1, 31), date(2026, 2, 1), date(2026, 2, 27), date(2026, 3, 1)]
+        BalanceSnapshot.objects.bulk_create(
+            BalanceSnapshot(day=day, balance=Decimal('0.00'), user_profile=self.profile) for day in days
+        )
+
+        self.assertEqual(delete_old_balance_snapshots(today=date(2026, 3, 31)), 2)
+        self.assertEqual(
+            list(BalanceSnapshot.objects.order_by('day').values_list('day', flat=True)),
+            [date(2026, 1, 31), date(2026, 2, 27), date(2026, 3, 1)],
+        )
+
+    def test_invalid_days(self):
+        with self.assertRaises(CommandError):
+            self.write_snapshots(f'--day={self.today}')
+
+        cases = (
+            ('Missing', {}),
+            ('Future', {'date': self.get_day(-1)}),
+        )
+        for case_name, params in cases:
+            with self.subTest(case_name=case_name):
+                response = self.client.get(reverse(BALANCE_HISTORY_ENDPOINT_NAME), params)
+                self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.status import (HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN,
+                                   HTTP_404_NOT_FOUND)
+
+from finances.models import Transaction
+from utils.tests.api import BaseAPITestCase
+
+LIST_TRANSACTIONS_ENDPOINT_NAME = 'transactions-list'
+BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME = 'transactions-bulk-create'
+
+
+class TransactionBulkCreateTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('1000.00'))
+        self.fund = self.setup_fund(self.profile, name='Food', balance=Decimal('100.00'))
+        self.other_fund = self.setup_fund(self.profile, name='Travel', balance=Decimal('0.00'))
+
+    def test_bulk_create_updates_balances(self):
+        data = [
+            {'type': Transaction.TransactionTypeChoices.INCOME, 'amount': '50.00', 'fund': self.fund.id},
+            {'type': Transaction.TransactionTypeChoices.EXPENSE, 'amount': '30.50', 'fund': self.fund.id},
+            {'type': Transaction.TransactionTypeChoices.TRANSFER, 'amount': '200.00', 'fund': self.other_fund.id},
+        ]
+
+        response = self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=data, format='json')
+        self.assertEqual(
+            response.status_code,
+            HTTP_201_CREATED,
+            msg=f'status code mismatch.\nResponse body: {response.data}',
+        )
+        self.assertEqual(len(response.data), 3, msg='invalid amount of transactions in response')
+        self.assertEqual(Transaction.objects.filter(user_profile=self.profile).count(), 3)
+
+        self.fund.refresh_from_db()
+        self.other_fund.refresh_from_db()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.fund.balance, Decimal('119.50'), msg='fund balance mismatch')
+        self.assertEqual(self.other_fund.balance, Decimal('200.00'), msg='fund balance mismatch')
+        self.assertEqual(self.profile.balance, Decimal('800.00'), msg='profile balance mismatch')
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        def post_batch(size: int) -> int:
+            data = [
+                {'type': Transaction.TransactionTypeChoices.EXPENSE, 'amount': '1.00', 'fund': fund.id}
+                for fund in (self.fund, self.other_fund)
+                for _ in range(size)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=data, format='json')
+            self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+
+            return len(context.captured_queries)
+
+        self.assertEqual(post_batch(2), post_batch(50), msg='query count grows with the batch size')
+
+    def test_cannot_use_fund_of_other_user(self):
+        other_user = self.setup_admin_user()
+        other_fund = self.setup_fund(self.setup_profile(other_user), name='Foreign')
+        self.client.force_authenticate(user=self.common_user)
+
+        data = [
+            {'type': Transaction.TransactionTypeChoices.INCOME, 'amount': '50.00', 'fund': self.fund.id},
+            {'type': Transaction.TransactionTypeChoices.INCOME, 'amount': '50.00', 'fund': other_fund.id},
+        ]
+
+        response = self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=data, format='json')
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
+        self.assertFalse(Transaction.objects.exists(), msg='transactions were partially created')
+
+        other_fund.refresh_from_db()
+        self.assertEqual(other_fund.balance, Decimal('0.00'), msg='foreign fund balance was changed')
+
+    def test_cannot_create_empty_batch(self):
+        response = self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=[], format='json')
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
+
+
+class TransactionListTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user)
+        self.fund = self.setup_fund(self.profile, name='Food')
+        self.other_fund = self.setup_fund(self.profile, name='Travel')
+
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        types = Transaction.TransactionTypeChoices
+        # Every two transactions share a date to check that ties are not lost between pages
+        Transaction.objects.bulk_create(
+            Transaction(
+                type=types.EXPENSE if index % 3 else types.INCOME,
+                amount=Decimal('1.00'),
+                date_created=start + timedelta(days=index // 2),
+                fund=self.fund if index % 2 else self.other_fund,
+                user_profile=self.profile,
+            )
+            for index in range(25)
+        )
+
+    def get_all_pages(self, **params) -> list[dict]:
+        results = []
+        response = self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME), data=params)
+        while True:
+            self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+            results.extend(response.data['results'])
+            if response.data['next'] is None:
+                return results
+            response = self.client.get(response.data['next'])
+
+    def test_list_transactions_by_pages(self):
+        results = self.get_all_pages(page_size=4)
+        ids = [item['id'] for item in results]
+        expected_ids = list(
+            Transaction.objects.order_by('-date_created', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected_ids, msg='pages are not continuous')
+
+    def test_page_query_count_does_not_depend_on_position(self):
+        response = self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME), data={'page_size': 2})
+        with CaptureQueriesContext(connection) as first_page:
+            self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME), data={'page_size': 2})
+        with CaptureQueriesContext(connection) as next_page:
+            self.client.get(response.data['next'])
+        self.assertEqual(len(first_page), len(next_page), msg='query count depends on page position')
+
+    def test_filter_transactions(self):
+        results = self.get_all_pages(fund=self.fund.id, type=Transaction.TransactionTypeChoices.EXPENSE)
+        self.assertEqual(
+            len(results),
+            Transaction.objects.filter(fund=self.fund, type=Transaction.TransactionTypeChoices.EXPENSE).count(),
+        )
+
+        results = self.get_all_pages(date_from='2023-01-03T00:00:00Z', date_to='2023-01-05T00:00:00Z')
+        self.assertEqual(len(results), 4, msg='date range filter mismatch')
+
+    def test_cannot_list_transactions_of_other_user(self):
+        other_user = self.setup_admin_user()
+        self.setup_profile(other_user)
+
+        response = self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(response.data['results'], [], msg='transactions of other user are listed')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME), data={'cursor': 'invalid'})
+        self.assertEqual(response.status_code, HTTP_404_NOT_FOUND, msg='invalid status code')
+
+
+class UnregisteredUserTransactionTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_unregistered_user()
+
+    def test_cannot_bulk_create_transactions(self):
+        response = self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=[], format='json')
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN, msg='invalid status code')
@@ -0,0 +1,168 @@
+import random
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import RestrictedError, Sum
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+
+from finances.models import Currency, Fund, Transaction, Transfer
+from finances.services import create_transfer
+from users.models import Profile, UserRolesChoices
+from utils.tests.api import BaseAPITestCase
+
+CREATE_TRANSFER_ENDPOINT_NAME = 'transfers-create'
+
+User = get_user_model()
+
+
+class TransferTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user, balance=Decimal('500.00'))
+        self.fund = self.setup_fund(self.profile, name='Food', balance=Decimal('100.00'))
+        self.other_fund = self.setup_fund(self.profile, name='Travel', balance=Decimal('0.00'))
+
+    def transfer(self, **data):
+        return self.client.post(reverse(CREATE_TRANSFER_ENDPOINT_NAME), data=data, format='json')
+
+    def assertBalances(self, profile_balance: str, fund_balance: str, other_fund_balance: str):
+        self.profile.refresh_from_db()
+        self.fund.refresh_from_db()
+        self.other_fund.refresh_from_db()
+        self.assertEqual(self.profile.balance, Decimal(profile_balance), msg='profile balance mismatch')
+        self.assertEqual(self.fund.balance, Decimal(fund_balance), msg='fund balance mismatch')
+        self.assertEqual(self.other_fund.balance, Decimal(other_fund_balance), msg='fund balance mismatch')
+
+    def test_transfer_between_funds(self):
+        response = self.transfer(source_fund=self.fund.id, destination_fund=self.other_fund.id, amount='40.00')
+        self.assertEqual(
+            response.status_code,
+            HTTP_201_CREATED,
+            msg=f'status code mismatch.\nResponse body: {response.data}',
+        )
+        self.assertBalances('500.00', '60.00', '40.00')
+
+        legs = Transfer.objects.get(id=response.data['id']).legs.order_by('amount')
+        self.assertEqual(
+            [(leg.fund_id, leg.amount) for leg in legs],
+            [(self.fund.id, Decimal('-40.00')), (self.other_fund.id, Decimal('40.00'))],
+            msg='transfer legs mismatch',
+        )
+
+    def test_transfer_between_fund_and_profile(self):
+        response = self.transfer(destination_fund=self.fund.id, amount='200.00')
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+        self.assertBalances('300.00', '300.00', '0.00')
+
+        response = self.transfer(source_fund=self.fund.id, amount='50.00')
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+        self.assertBalances('350.00', '250.00', '0.00')
+
+    def test_transfer_with_legs_is_restricted(self):
+        response = self.transfer(source_fund=self.fund.id, destination_fund=self.other_fund.id, amount='40.00')
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+
+        transfer = Transfer.objects.get(id=response.data['id'])
+        with self.assertRaises(RestrictedError):
+            transfer.delete()
+        with self.assertRaises(RestrictedError):
+            self.fund.delete()
+        self.assertEqual(transfer.legs.count(), 2, msg='transfer legs are deleted')
+        self.assertBalances('500.00', '60.00', '40.00')
+
+        # The legs go away together with the profile
+        self.profile.delete()
+        self.assertFalse(Transaction.objects.filter(transfer_id=transfer.id).exists(), msg='transfer legs are kept')
+
+    def test_invalid_transfers(self):
+        other_user = self.setup_admin_user()
+        foreign_fund = self.setup_fund(self.setup_profile(other_user), name='Foreign')
+        euro = Currency.objects.create(name='Euro', iso_code='EUR')
+        euro_fund = self.setup_fund(self.profile, name='Euro', currency=euro)
+        self.client.force_authenticate(user=self.common_user)
+
+        cases = (
+            ('No funds', {'amount': '10.00'}),
+            ('Same funds', {'source_fund': self.fund.id, 'destination_fund': self.fund.id, 'amount': '10.00'}),
+            ('Negative amount', {'source_fund': self.fund.id, 'destination_fund': self.other_fund.id, 'amount': '-1'}),
+            ('Foreign fund', {'source_fund': foreign_fund.id, 'destination_fund': self.fund.id, 'amount': '10.00'}),
+            ('Other currency', {'source_fund': euro_fund.id, 'destination_fund': self.fund.id, 'amount': '10.00'}),
+            ('Other currency than profile', {'source_fund': euro_fund.id, 'amount': '10.00'}),
+        )
+        for case_name, data in cases:
+            with self.subTest(case_name=case_name):
+                response = self.transfer(**data)
+                self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
+
+        self.assertFalse(Transfer.objects.exists(), msg='invalid transfer was created')
+        self.assertBalances('500.00', '100.00', '0.00')
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentTransferTestCase(TransactionTestCase):
+    THREADS = 8
+    TRANSFERS_PER_THREAD = 25
+
+    def setUp(self) -> None:
+        super().setUp()
+        user = User.objects.create_user(
+            telegram_id='1234567890',
+            username='test_common_user',
+            email='test_common_user@example.com',
+            password='test-user-password-911',
+            role=UserRolesChoices.REGISTERED,
+        )
+        self.profile = Profile.objects.create(user=user, balance=Decimal('1000.00'))
+        self.funds = [
+            Fund.objects.create(
+                name=f'Fund {index}',
+                balance=Decimal('1000.00'),
+                goal=Decimal('0.00'),
+                budget=Decimal('0.00'),
+                user_profile=self.profile,
+            )
+            for index in range(3)
+        ]
+
+    def run_transfers(self, seed: int, errors: list) -> None:
+        generator = random.Random(seed)
+        fund_ids = [fund.id for fund in self.funds] + [None]
+        try:
+            for _ in range(self.TRANSFERS_PER_THREAD):
+                source_fund_id, destination_fund_id = generator.sample(fund_ids, 2)
+                create_transfer(
+                    Transfer(
+                        amount=Decimal(generator.randint(1, 500)) / 100,
+                        source_fund_id=source_fund_id,
+                        destination_fund_id=destination_fund_id,
+                        user_profile=self.profile,
+                    )
+                )
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def test_concurrent_transfers_keep_balances_consistent(self):
+        errors = []
+        threads = [threading.Thread(target=self.run_transfers, args=(seed, errors)) for seed in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [], msg='concurrent transfers failed')
+        self.assertEqual(Transfer.objects.count(), self.THREADS * self.TRANSFERS_PER_THREAD)
+
+        self.profile.refresh_from_db()
+        funds_total = Fund.objects.aggregate(total=Sum('balance'))['total']
+        self.assertEqual(self.profile.balance + funds_total, Decimal('4000.00'), msg='money was lost or created')
+
+        for fund in Fund.objects.all():
+            legs_total = Transaction.objects.filter(fund=fund).aggregate(total=Sum('amount'))['total'] or 0
+            self.assertEqual(fund.balance, Decimal('1000.00') + legs_total, msg='lost update of fund balance')
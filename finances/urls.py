@@ -0,0 +1,26 @@
+from django.urls import path
+
+from finances.async_views import budgets_status_async_view, fund_balances_async_view
+from finances.views import (BalanceHistoryAPIView, BudgetsStatusAPIView, ConsolidatedBalanceAPIView, SearchAPIView,
+                            SpendingAnalyticsAPIView, TransactionBulkCreateAPIView, TransactionImportCreateAPIView,
+                            TransactionImportDetailAPIView, TransactionListAPIView, TransferCreateAPIView)
+
+# Common access
+urlpatterns = [
+    path('analytics/spending/', SpendingAnalyticsAPIView.as_view(), name='spending-analytics'),
+    path('balances/consolidated/', ConsolidatedBalanceAPIView.as_view(), name='balances-consolidated'),
+    path('balances/history/', BalanceHistoryAPIView.as_view(), name='balances-history'),
+    path('budgets/status/', BudgetsStatusAPIView.as_view(), name='budgets-status'),
+    path('search/', SearchAPIView.as_view(), name='search'),
+    path('transactions/', TransactionListAPIView.as_view(), name='transactions-list'),
+    path('transactions/bulk/', TransactionBulkCreateAPIView.as_view(), name='transactions-bulk-create'),
+    path('transfers/', TransferCreateAPIView.as_view(), name='transfers-create'),
+    path('imports/', TransactionImportCreateAPIView.as_view(), name='transactions-import'),
+    path('imports/<int:pk>/', TransactionImportDetailAPIView.as_view(), name='transactions-import-detail'),
+]
+
+# Async read-only access for the bot and the dashboard, served without a thread per request under ASGI
+urlpatterns += [
+    path('async/budgets/status/', budgets_status_async_view, name='budgets-status-async'),
+    path('async/funds/balances/', fund_balances_async_view, name='funds-balances-async'),
+]
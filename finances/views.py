@@ -0,0 +1,305 @@
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction as db_transaction
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404, CreateAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.status import HTTP_202_ACCEPTED
+from rest_framework.views import APIView
+
+from finances.analytics import get_spending_analytics
+from finances.budgets import get_budgets_status
+from finances.cache import get_profile_cached
+from finances.consolidation import get_consolidated_balance, get_consolidated_change
+from finances.currencies import CurrencyConversionError
+from finances.filters import TransactionFilterSet
+from finances.idempotency import IdempotentCreateMixin
+from finances.importers import ImportFormatError, run_import, start_import
+from finances.models import Transaction, TransactionImport
+from finances.search import search_funds, search_transactions
+from finances.serializers import (BalanceHistoryQuerySerializer, BalanceHistorySerializer, BudgetsStatusSerializer,
+                                  ConsolidatedBalanceQuerySerializer, ConsolidatedBalanceSerializer,
+                                  SearchQuerySerializer, SearchResultsSerializer, SpendingAnalyticsQuerySerializer,
+                                  SpendingAnalyticsSerializer, TransactionImportSerializer, TransactionSerializer,
+                                  TransferSerializer)
+from finances.snapshots import get_balances_at
+from jobs.queue import enqueue, get_pending_job
+from users.models import Profile
+from users.permissions import RegisteredUserPermission
+from utils.pagination import KeysetCursorPagination
+from utils.replicas import ReplicaReadMixin
+
+User = get_user_model()
+
+
+class ProfileMixin:
+    def get_profile(self) -> Profile:
+        """
+        Returns the profile of the requesting user, fetched once per request.
+
+        The profile loaded together with a cached user is reused. Its balances can be stale, so only
+        its ID and currency are used, the balances are read from the database.
+        """
+        if not hasattr(self, '_profile'):
+            user = self.request.user
+            if User.profile.is_cached(user) and getattr(user, 'profile', None) is not None:
+                self._profile = user.profile
+            else:
+                self._profile = get_object_or_404(Profile, user=user)
+
+        return self._profile
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['profile'] = self.get_profile()
+
+        return context
+
+
+class TransactionListAPIView(ReplicaReadMixin, ProfileMixin, ListAPIView):
+    permission_classes = (RegisteredUserPermission,)
+    serializer_class = TransactionSerializer
+    pagination_class = KeysetCursorPagination
+    # Ordering is fixed by the keyset pagination, so `OrderingFilter` is not used
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = TransactionFilterSet
+
+    def get_queryset(self):
+        return Transaction.objects.filter(user_profile=self.get_profile())
+
+
+class TransactionBulkCreateAPIView(IdempotentCreateMixin, ProfileMixin, CreateAPIView):
+    permission_classes = (RegisteredUserPermission,)
+    serializer_class = TransactionSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(user_profile=self.get_profile())
+
+
+class TransferCreateAPIView(IdempotentCreateMixin, ProfileMixin, CreateAPIView):
+    permission_classes = (RegisteredUserPermission,)
+    serializer_class = TransferSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user_profile=self.get_profile())
+
+
+class TransactionImportCreateAPIView(ProfileMixin, CreateAPIView):
+    """
+    Imports an uploaded CSV or OFX bank export.
+
+    Uploading the same file again resumes its import from the last committed chunk. With `background`
+    the file is saved and imported by a background job, the response has the job ID and status 202.
+
+    Unlike the other finance writes, the endpoint takes no `Idempotency-Key`: imports commit their chunks
+    separately rather than in one transaction with the key. Uploads are deduplicated by the file checksum
+    instead, so a retried upload gets the same import and the job already queued for it.
+    """
+
+    permission_classes = (RegisteredUserPermission,)
+    serializer_class = TransactionImportSerializer
+    parser_classes = (MultiPartParser,)
+    throttle_rates = {'user': '10/m', 'bot': '10/m'}
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        job = getattr(self, 'job', None)
+        if job is not None:
+            response.data['job'] = job.id
+            response.status_code = HTTP_202_ACCEPTED
+
+        return response
+
+    def perform_create(self, serializer):
+        file = serializer.validated_data['file']
+        transaction_import = start_import(
+            self.get_profile(),
+            file.file,
+            file.name,
+            serializer.validated_data.get('file_format'),
+        )
+        if serializer.validated_data['background']:
+            serializer.instance = transaction_import
+            if transaction_import.status == TransactionImport.StatusChoices.COMPLETED:
+                return
+
+            # The import is not queued again while its job is pending, so the upload is not saved either.
+            # Concurrent uploads of the file wait for each other on the import row to see the queued job.
+            with db_transaction.atomic():
+                list(TransactionImport.objects.select_for_update().filter(id=transaction_import.id).values_list('id'))
+                self.job = get_pending_job('finances.import_transactions', import_id=transaction_import.id)
+                if self.job is None:
+                    file_path = default_storage.save(f'imports/{transaction_import.id}/{uuid4().hex}', file)
+                    self.job = enqueue(
+                        'finances.import_transactions',
+                        {
+                            'import_id': transaction_import.id,
+                            'file_path': file_path,
+                            'default_fund_name': serializer.validated_data['default_fund'],
+                        },
+                        user=self.request.user,
+                    )
+            return
+
+        try:
+            serializer.instance = run_import(
+                transaction_import,
+                file.file,
+                default_fund_name=serializer.validated_data['default_fund'],
+            )
+        except ImportFormatError as error:
+            raise ValidationError({'file': [str(error)]})
+
+
+class TransactionImportDetailAPIView(ProfileMixin, RetrieveAPIView):
+    permission_classes = (RegisteredUserPermission,)
+    serializer_class = TransactionImportSerializer
+
+    def get_queryset(self):
+        return self.get_profile().transaction_imports.all()
+
+
+class BudgetsStatusAPIView(ProfileMixin, APIView):
+    """
+    Returns spent and remaining amounts of the user and fund budgets.
+
+    The serialized status is cached per profile until its transactions, funds or budgets change.
+    """
+
+    permission_classes = (RegisteredUserPermission,)
+
+    def get(self, request, *args, **kwargs):
+        profile_id = self.get_profile().id
+        data = get_profile_cached(
+            profile_id,
+            'budgets-status',
+            lambda: BudgetsStatusSerializer(get_budgets_status(profile_id)).data,
+        )
+
+        return Response(data)
+
+
+class SpendingAnalyticsAPIView(ReplicaReadMixin, ProfileMixin, APIView):
+    """
+    Returns spending totals per fund, transaction type and day or month, with their moving averages,
+    period over period changes and trend forecasts.
+
+    The response is cached per profile and query parameters until the profile transactions change.
+    """
+
+    permission_classes = (RegisteredUserPermission,)
+
+    def get(self, request, *args, **kwargs):
+        query_serializer = SpendingAnalyticsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        profile_id = self.get_profile().id
+        data = get_profile_cached(
+            profile_id,
+            'spending-analytics:' + ':'.join(f'{name}={params.get(name)}' for name in sorted(query_serializer.fields)),
+            lambda: SpendingAnalyticsSerializer(
+                get_spending_analytics(
+                    profile_id,
+                    params['date_from'],
+                    params['date_to'],
+                    params['granularity'],
+                    params['window'],
+                    params['forecast'],
+                    params.get('fund'),
+                )
+            ).data,
+        )
+
+        return Response(data)
+
+
+class SearchAPIView(ReplicaReadMixin, ProfileMixin, APIView):
+    """
+    Searches the user transactions by comment and funds by name and description, best matches first.
+
+    Every word of `q` matches words starting with it. At most `limit` transactions and funds are returned.
+    """
+
+    permission_classes = (RegisteredUserPermission,)
+
+    def get(self, request, *args, **kwargs):
+        query_serializer = SearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        terms = query_serializer.validated_data['q']
+        limit = query_serializer.validated_data['limit']
+
+        profile_id = self.get_profile().id
+        serializer = SearchResultsSerializer({
+            'transactions': search_transactions(profile_id, terms, limit),
+            'funds': search_funds(profile_id, terms, limit),
+        })
+
+        return Response(serializer.data)
+
+
+class ConsolidatedBalanceAPIView(ReplicaReadMixin, ProfileMixin, APIView):
+    """
+    Returns the profile balance plus the balances of all its funds and their change over
+    `[date_from, date_to]` in one currency, the profile currency by default.
+    """
+
+    permission_classes = (RegisteredUserPermission,)
+
+    def get(self, request, *args, **kwargs):
+        query_serializer = ConsolidatedBalanceQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        profile = self.get_profile()
+        currency = params.get('currency') or (profile.currency.iso_code if profile.currency_id else None)
+        try:
+            balance = get_consolidated_balance(profile, currency)
+            change = get_consolidated_change(profile, params['date_from'], params['date_to'], currency)
+        except CurrencyConversionError as error:
+            raise ValidationError({'currency': [str(error)]})
+
+        serializer = ConsolidatedBalanceSerializer({
+            'currency': currency,
+            'balance': balance,
+            'date_from': params['date_from'],
+            'date_to': params['date_to'],
+            'change': change,
+        })
+
+        return Response(serializer.data)
+
+
+class BalanceHistoryAPIView(ReplicaReadMixin, ProfileMixin, APIView):
+    """
+    Returns the profile balance and the balances of its funds at the end of `date`.
+
+    Balances are read from the nearest daily or month end snapshot plus the transactions made after it,
+    so the latency does not grow with the length of the history.
+    """
+
+    permission_classes = (RegisteredUserPermission,)
+
+    def get(self, request, *args, **kwargs):
+        query_serializer = BalanceHistoryQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        day = query_serializer.validated_data['date']
+
+        balance, fund_balances = get_balances_at(self.get_profile().id, day)
+        serializer = BalanceHistorySerializer({
+            'date': day,
+            'balance': balance,
+            'funds': [
+                {'fund': fund_id, 'balance': fund_balance} for fund_id, fund_balance in sorted(fund_balances.items())
+            ],
+        })
+
+        return Response(serializer.data)
@@ -0,0 +1,26 @@
+import multiprocessing
+import os
+
+# `wsgi` serves the sync views with threaded workers, `asgi` serves every view with uvicorn workers
+mode = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('SERVER_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv('SERVER_TIMEOUT', 30))
+graceful_timeout = timeout
+keepalive = 5
+
+# Workers are restarted after a number of requests to keep memory usage flat
+max_requests = int(os.getenv('SERVER_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+
+if mode == 'asgi':
+    wsgi_app = 'project.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'project.wsgi:application'
+    worker_class = 'gthread'
+    # Every thread keeps its own persistent DB connection, so a worker holds up to `threads` connections
+    threads = int(os.getenv('SERVER_THREADS', 4))
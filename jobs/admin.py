@@ -0,0 +1,25 @@
+from django.contrib import admin
+
+from jobs.models import Job
+from utils.replicas import ReplicaChangeListMixin
+
+
+class JobAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    list_display = (
+        'id',
+        'task',
+        'status',
+        'attempts',
+        'user',
+        'run_after',
+        'date_created',
+        'date_finished',
+    )
+    search_fields = ('id', 'task')
+    list_filter = ('status', 'task')
+    ordering = ('-id',)
+    list_per_page = 50
+    list_select_related = True
+
+
+admin.site.register(Job, JobAdmin)
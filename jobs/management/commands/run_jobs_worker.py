@@ -0,0 +1,60 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs.worker import Worker
+
+
+def _run_worker(threads: int, batch_size: int, poll_interval: float, once: bool) -> int:
+    worker = Worker(threads, batch_size, poll_interval)
+    default_handler = signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+    try:
+        return worker.run(once)
+    except KeyboardInterrupt:
+        worker.stop()
+        return worker.processed
+    finally:
+        signal.signal(signal.SIGTERM, default_handler)
+
+
+def _run_worker_process(*args) -> int:
+    try:
+        return _run_worker(*args)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs in a pool of worker processes and threads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='amount of worker processes')
+        parser.add_argument('--threads', type=int, default=1, help='amount of threads of every process')
+        parser.add_argument('--batch-size', type=int, default=1, help='jobs claimed by a thread at once')
+        parser.add_argument('--poll-interval', type=float, help='seconds to wait for jobs when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['threads'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Processes, threads and batch size should be positive.')
+
+        arguments = (options['threads'], options['batch_size'], options['poll_interval'], options['once'])
+        if options['processes'] == 1:
+            processed = _run_worker(*arguments)
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs.'))
+            return
+
+        # Forked processes must not share the DB connections of the parent
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(options['processes']) as pool:
+            results = pool.starmap_async(_run_worker_process, [arguments] * options['processes'])
+            try:
+                processed = sum(results.get())
+            except KeyboardInterrupt:
+                pool.terminate()
+                raise CommandError('Interrupted.')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs.'))
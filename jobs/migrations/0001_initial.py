@@ -0,0 +1,41 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:01
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=100, verbose_name='task')),
+                ('payload', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='payload')),
+                ('status', models.CharField(choices=[('Q', 'Queued'), ('R', 'Running'), ('S', 'Succeeded'), ('F', 'Failed')], default='Q', max_length=1, verbose_name='status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='max attempts')),
+                ('result', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='result')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='worker')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='run after')),
+                ('date_created', models.DateTimeField(auto_now_add=True, verbose_name='date created')),
+                ('date_started', models.DateTimeField(blank=True, null=True, verbose_name='date started')),
+                ('date_finished', models.DateTimeField(blank=True, null=True, verbose_name='date finished')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='job_claim_idx')],
+            },
+        ),
+    ]
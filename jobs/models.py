@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+User = get_user_model()
+
+
+class Job(models.Model):
+    """
+    Represents a background run of a registered task, see `jobs.queue`.
+
+    Queued jobs are claimed by workers with `SELECT ... FOR UPDATE SKIP LOCKED`, so every job is run
+    by one worker at a time. A failed run is retried after a delay until `max_attempts` runs failed.
+
+    Fields:
+        task (str): name of the registered task
+        payload (dict): keyword arguments of the task
+        status (str): job status
+        attempts (int): amount of started runs
+        max_attempts (int): amount of runs after which a failing job is not retried
+        result (any): value returned by the task (optional)
+        error (str): error of the last failed run (optional)
+        worker (str): name of the worker that ran the job last (optional)
+        run_after (dt): date and time the job can be run from
+        date_created (dt): date and time job was created
+        date_started (dt): date and time the last run was started (optional)
+        date_finished (dt): date and time the job succeeded or failed for good (optional)
+        user (fk): `User` OneToMany relation of the user the job was created for (optional)
+    """
+
+    class StatusChoices(models.TextChoices):
+        QUEUED = 'Q', _('Queued')
+        RUNNING = 'R', _('Running')
+        SUCCEEDED = 'S', _('Succeeded')
+        FAILED = 'F', _('Failed')
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('status', 'run_after'), name='job_claim_idx'),
+        )
+
+    task = models.CharField(_('task'), max_length=100)
+    payload = models.JSONField(_('payload'), default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        _('status'),
+        max_length=1,
+        choices=StatusChoices.choices,
+        default=StatusChoices.QUEUED,
+    )
+    attempts = models.PositiveIntegerField(_('attempts'), default=0)
+    max_attempts = models.PositiveIntegerField(_('max attempts'), default=3)
+    result = models.JSONField(_('result'), null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(_('error'), blank=True)
+    worker = models.CharField(_('worker'), max_length=100, blank=True)
+    run_after = models.DateTimeField(_('run after'), default=timezone.now)
+    date_created = models.DateTimeField(_('date created'), auto_now_add=True)
+    date_started = models.DateTimeField(_('date started'), null=True, blank=True)
+    date_finished = models.DateTimeField(_('date finished'), null=True, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
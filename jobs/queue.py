@@ -0,0 +1,166 @@
+import logging
+import traceback
+from datetime import timedelta
+from typing import Callable, NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class UnknownTaskError(Exception):
+    """Raised when a job is created for a task that is not registered."""
+
+
+class PermanentTaskError(Exception):
+    """Raised by a task when running its job again cannot succeed, so the job is failed without retries."""
+
+
+class Task(NamedTuple):
+    """
+    Fields:
+        function (Callable): called with the job payload as keyword arguments, returns a JSON serializable result
+        max_attempts (int): default amount of runs after which a failing job is not retried
+    """
+    function: Callable
+    max_attempts: int
+
+
+TASKS: dict[str, Task] = {}
+
+
+def task(name: str, max_attempts: int = 3) -> Callable:
+    """Registers the decorated function as the task with the name."""
+
+    def decorator(function: Callable) -> Callable:
+        TASKS[name] = Task(function, max_attempts)
+        return function
+
+    return decorator
+
+
+def enqueue(
+        task_name: str,
+        payload: dict = None,
+        user: Optional[User] = None,
+        delay: timedelta = None,
+        max_attempts: int = None,
+) -> Job:
+    """
+    Creates a job of the task. The job becomes visible to workers when the current DB transaction is committed.
+    """
+    if task_name not in TASKS:
+        raise UnknownTaskError(f'Task "{task_name}" is not registered')
+
+    return Job.objects.create(
+        task=task_name,
+        payload=payload or {},
+        user=user,
+        max_attempts=max_attempts or TASKS[task_name].max_attempts,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def get_pending_job(task_name: str, **payload) -> Optional[Job]:
+    """Returns the oldest queued or running job of the task with the payload values, if there is one."""
+    return (
+        Job.objects
+        .filter(
+            task=task_name,
+            status__in=(Job.StatusChoices.QUEUED, Job.StatusChoices.RUNNING),
+            **{f'payload__{key}': value for key, value in payload.items()},
+        )
+        .order_by('id')
+        .first()
+    )
+
+
+def claim_jobs(worker: str, limit: int = 1) -> list[Job]:
+    """
+    Marks up to `limit` due queued jobs as running by the worker and returns them, oldest first.
+
+    Jobs locked by concurrent workers are skipped rather than waited for, so workers never claim the same job.
+    """
+    now = timezone.now()
+    with db_transaction.atomic():
+        ids = list(
+            Job.objects
+            .filter(status=Job.StatusChoices.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:limit]
+        )
+        Job.objects.filter(id__in=ids).update(
+            status=Job.StatusChoices.RUNNING,
+            attempts=F('attempts') + 1,
+            worker=worker,
+            date_started=now,
+        )
+
+    return list(Job.objects.filter(id__in=ids).order_by('run_after', 'id'))
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Returns the delay before the next run of a job failed `attempts` times, doubled after each failure."""
+    return timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def run_job(job: Job) -> Job:
+    """
+    Runs the task of the claimed job and saves the result.
+
+    A failed job is queued again after the retry delay until its attempts are exhausted. Jobs of tasks
+    that are not registered anymore and jobs failed with `PermanentTaskError` are not retried.
+    """
+    try:
+        function = TASKS[job.task].function
+        result = function(**job.payload)
+    except Exception as error:
+        logger.exception('Job #%s of task "%s" failed', job.id, job.task)
+        job.error = ''.join(traceback.format_exception_only(type(error), error)).strip()
+        retryable = job.task in TASKS and not isinstance(error, PermanentTaskError)
+        if retryable and job.attempts < job.max_attempts:
+            job.status = Job.StatusChoices.QUEUED
+            job.run_after = timezone.now() + get_retry_delay(job.attempts)
+        else:
+            job.status = Job.StatusChoices.FAILED
+            job.date_finished = timezone.now()
+        job.save(update_fields=('status', 'error', 'run_after', 'date_finished'))
+        return job
+
+    job.status = Job.StatusChoices.SUCCEEDED
+    job.result = result
+    job.error = ''
+    job.date_finished = timezone.now()
+    job.save(update_fields=('status', 'result', 'error', 'date_finished'))
+
+    return job
+
+
+def requeue_stale_jobs(timeout: float = None) -> int:
+    """
+    Queues again the jobs running longer than `timeout` seconds, left by workers that crashed.
+
+    Stale jobs without attempts left are failed. Returns the amount of requeued and failed jobs.
+    """
+    timeout = timeout if timeout is not None else settings.JOBS_TIMEOUT
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.StatusChoices.RUNNING, date_started__lt=now - timedelta(seconds=timeout))
+    error = f'The job did not finish in {timeout:g} seconds'
+
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.StatusChoices.FAILED,
+        error=error,
+        date_finished=now,
+    )
+    requeued = stale.update(status=Job.StatusChoices.QUEUED, error=error, run_after=now)
+
+    return failed + requeued
@@ -0,0 +1,47 @@
+from rest_framework.serializers import ChoiceField, DictField, IntegerField, ModelSerializer
+
+from jobs.models import Job
+from jobs.queue import TASKS, enqueue
+
+
+class JobSerializer(ModelSerializer):
+    class Meta:
+        model = Job
+        fields = (
+            'id',
+            'task',
+            'status',
+            'attempts',
+            'max_attempts',
+            'result',
+            'error',
+            'run_after',
+            'date_created',
+            'date_started',
+            'date_finished',
+        )
+        read_only_fields = fields
+
+
+class JobCreateSerializer(ModelSerializer):
+    task = ChoiceField(choices=())
+    payload = DictField(required=False)
+    max_attempts = IntegerField(min_value=1, max_value=10, required=False)
+
+    class Meta:
+        model = Job
+        fields = JobSerializer.Meta.fields + ('payload',)
+        read_only_fields = tuple(field for field in JobSerializer.Meta.fields if field not in ('task', 'max_attempts'))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Tasks are registered when the apps are ready, after the serializer class is defined
+        self.fields['task'].choices = sorted(TASKS)
+
+    def create(self, validated_data):
+        return enqueue(
+            validated_data['task'],
+            validated_data.get('payload'),
+            user=validated_data.get('user'),
+            max_attempts=validated_data.get('max_attempts'),
+        )
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.status import (HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN,
+                                   HTTP_404_NOT_FOUND)
+
+from jobs.models import Job
+from jobs.queue import (PermanentTaskError, UnknownTaskError, claim_jobs, enqueue, requeue_stale_jobs, run_job,
+                        task)
+from jobs.worker import Worker
+from utils.tests.api import BaseAPITestCase
+
+LIST_JOBS_ENDPOINT_NAME = 'jobs-list'
+DETAIL_JOB_ENDPOINT_NAME = 'jobs-detail'
+
+
+@task('tests.add')
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@task('tests.fail', max_attempts=2)
+def fail(permanent: bool = False):
+    raise (PermanentTaskError if permanent else RuntimeError)('task failed')
+
+
+@override_settings(JOBS_RETRY_DELAY=10, JOBS_TIMEOUT=60)
+class JobQueueTestCase(BaseAPITestCase):
+    def run_claimed(self) -> list[Job]:
+        return [run_job(job) for job in claim_jobs('test-worker', limit=10)]
+
+    def test_unknown_task(self):
+        with self.assertRaises(UnknownTaskError):
+            enqueue('tests.unknown')
+
+    def test_claim_due_jobs(self):
+        first = enqueue('tests.add', {'a': 1, 'b': 2})
+        enqueue('tests.add', {'a': 1, 'b': 2}, delay=timedelta(minutes=1))
+        second = enqueue('tests.add', {'a': 3, 'b': 4})
+
+        jobs = claim_jobs('test-worker', limit=10)
+
+        self.assertEqual([job.id for job in jobs], [first.id, second.id], msg='delayed job is claimed')
+        self.assertTrue(all(job.status == Job.StatusChoices.RUNNING for job in jobs))
+        self.assertTrue(all(job.attempts == 1 and job.worker == 'test-worker' for job in jobs))
+        self.assertEqual(claim_jobs('test-worker', limit=10), [], msg='running jobs are claimed again')
+
+    def test_run_job(self):
+        enqueue('tests.add', {'a': 1, 'b': 2})
+
+        job, = self.run_claimed()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.SUCCEEDED)
+        self.assertEqual(job.result, 3)
+        self.assertIsNotNone(job.date_finished)
+
+    def test_retry_failed_job(self):
+        enqueue('tests.fail')
+
+        job, = self.run_claimed()
+        self.assertEqual(job.status, Job.StatusChoices.QUEUED, msg='failed job is not retried')
+        self.assertIn('RuntimeError: task failed', job.error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=5), msg='job is retried without delay')
+        self.assertEqual(self.run_claimed(), [], msg='job is retried before the delay')
+
+        Job.objects.update(run_after=timezone.now())
+        job, = self.run_claimed()
+        self.assertEqual(job.status, Job.StatusChoices.FAILED, msg='job is retried after the last attempt')
+        self.assertEqual(job.attempts, 2)
+
+    def test_permanent_failure(self):
+        enqueue('tests.fail', {'permanent': True})
+
+        job, = self.run_claimed()
+
+        self.assertEqual(job.status, Job.StatusChoices.FAILED)
+        self.assertEqual(job.attempts, 1)
+
+    def test_requeue_stale_jobs(self):
+        job = enqueue('tests.add', {'a': 1, 'b': 2})
+        exhausted_job = enqueue('tests.add', {'a': 1, 'b': 2}, max_attempts=1)
+        claim_jobs('crashed-worker', limit=10)
+        Job.objects.update(date_started=timezone.now() - timedelta(minutes=2))
+
+        self.assertEqual(requeue_stale_jobs(), 2)
+
+        job.refresh_from_db()
+        exhausted_job.refresh_from_db()
+        self.assertEqual(job.status, Job.StatusChoices.QUEUED)
+        self.assertEqual(exhausted_job.status, Job.StatusChoices.FAILED)
+
+    def test_worker_runs_queued_jobs(self):
+        for number in range(3):
+            enqueue('tests.add', {'a': number, 'b': 1})
+
+        self.assertEqual(Worker(batch_size=2).run(once=True), 3)
+        self.assertEqual(
+            sorted(Job.objects.values_list('result', flat=True)),
+            [1, 2, 3],
+        )
+
+    def test_worker_command(self):
+        enqueue('tests.add', {'a': 1, 'b': 2})
+
+        output = StringIO()
+        call_command('run_jobs_worker', '--once', stdout=output)
+
+        self.assertIn('Processed 1 jobs', output.getvalue())
+        self.assertEqual(Job.objects.get().status, Job.StatusChoices.SUCCEEDED)
+
+
+class JobEndpointsTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_admin_user()
+        self.admin_job = enqueue('tests.add', {'a': 1, 'b': 2}, user=self.admin_user)
+        self.setup_common_user()
+        self.common_job = enqueue('tests.add', {'a': 1, 'b': 2}, user=self.common_user)
+
+    def test_common_user_sees_own_jobs(self):
+        response = self.client.get(reverse(LIST_JOBS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual([job['id'] for job in response.data['results']], [self.common_job.id])
+
+        cases = (
+            ('Own job', self.common_job, HTTP_200_OK),
+            ('Job of another user', self.admin_job, HTTP_404_NOT_FOUND),
+        )
+        for case_name, job, status_code in cases:
+            with self.subTest(case_name=case_name):
+                response = self.client.get(reverse(DETAIL_JOB_ENDPOINT_NAME, args=(job.id,)))
+                self.assertEqual(response.status_code, status_code, msg='invalid status code')
+
+        response = self.client.get(reverse(DETAIL_JOB_ENDPOINT_NAME, args=(self.common_job.id,)))
+        self.assertEqual(response.data['status'], Job.StatusChoices.QUEUED)
+
+    def test_only_admin_queues_jobs(self):
+        response = self.client.post(reverse(LIST_JOBS_ENDPOINT_NAME), data={'task': 'tests.add'}, format='json')
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN, msg='invalid status code')
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(
+            reverse(LIST_JOBS_ENDPOINT_NAME),
+            data={'task': 'tests.add', 'payload': {'a': 2, 'b': 2}},
+            format='json',
+        )
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+        job = Job.objects.get(id=response.data['id'])
+        self.assertEqual((job.task, job.payload, job.user), ('tests.add', {'a': 2, 'b': 2}, self.admin_user))
+
+        response = self.client.get(reverse(LIST_JOBS_ENDPOINT_NAME))
+        self.assertEqual(len(response.data['results']), 3, msg='admin does not see all the jobs')
+
+        response = self.client.post(reverse(LIST_JOBS_ENDPOINT_NAME), data={'task': 'tests.unknown'}, format='json')
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST, msg='invalid status code')
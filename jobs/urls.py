@@ -0,0 +1,9 @@
+from django.urls import path
+
+from jobs.views import JobDetailAPIView, JobListCreateAPIView
+
+# Common access, admins see and queue jobs of all the users
+urlpatterns = [
+    path('', JobListCreateAPIView.as_view(), name='jobs-list'),
+    path('<int:pk>/', JobDetailAPIView.as_view(), name='jobs-detail'),
+]
@@ -0,0 +1,39 @@
+from rest_framework.generics import ListCreateAPIView, RetrieveAPIView
+
+from jobs.models import Job
+from jobs.serializers import JobCreateSerializer, JobSerializer
+from users.permissions import AdminUserPermission, RegisteredUserPermission
+from utils.pagination import KeysetCursorPagination
+
+
+class JobQuerysetMixin:
+    def get_queryset(self):
+        """Returns all the jobs to admins, and the jobs created for the user to others."""
+        if self.request.user.is_admin():
+            return Job.objects.all()
+
+        return Job.objects.filter(user=self.request.user)
+
+
+class JobListCreateAPIView(JobQuerysetMixin, ListCreateAPIView):
+    """
+    Lists the jobs newest first, admins can also queue a job of any registered task.
+    """
+
+    pagination_class = KeysetCursorPagination
+    filter_backends = ()
+
+    def get_permissions(self):
+        permission_classes = (AdminUserPermission,) if self.request.method == 'POST' else (RegisteredUserPermission,)
+        return [permission() for permission in permission_classes]
+
+    def get_serializer_class(self):
+        return JobCreateSerializer if self.request.method == 'POST' else JobSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class JobDetailAPIView(JobQuerysetMixin, RetrieveAPIView):
+    permission_classes = (RegisteredUserPermission,)
+    serializer_class = JobSerializer
@@ -0,0 +1,84 @@
+import logging
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from jobs.queue import claim_jobs, requeue_stale_jobs, run_job
+
+logger = logging.getLogger(__name__)
+
+
+def get_worker_name() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class Worker:
+    """
+    Runs queued jobs in `threads` threads of the current process, each with its own DB connection.
+
+    Every thread claims up to `batch_size` jobs at once and waits `poll_interval` seconds when the queue is empty.
+    """
+
+    def __init__(self, threads: int = 1, batch_size: int = 1, poll_interval: float = None, name: str = None):
+        self.threads = threads
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOBS_POLL_INTERVAL
+        self.name = name or get_worker_name()
+        self.processed = 0
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self) -> None:
+        """Makes the threads exit once their current jobs are finished."""
+        self._stopped.set()
+
+    def run(self, once: bool = False) -> int:
+        """
+        Runs jobs until the worker is stopped, or until the queue is empty with `once`.
+
+        A single thread worker runs in the calling thread. Returns the amount of processed jobs.
+        """
+        if self.threads == 1:
+            self._run_jobs(once)
+            return self.processed
+
+        threads = [threading.Thread(target=self._run_thread, args=(once,)) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return self.processed
+
+    def _run_thread(self, once: bool) -> None:
+        try:
+            self._run_jobs(once)
+        finally:
+            connection.close()
+
+    def _run_jobs(self, once: bool) -> None:
+        while not self._stopped.is_set():
+            # Like the request cycle, drops broken and expired connections between jobs
+            if not connection.in_atomic_block:
+                close_old_connections()
+            try:
+                jobs = claim_jobs(self.name, self.batch_size)
+                if not jobs:
+                    requeue_stale_jobs()
+            except Exception:
+                logger.exception('Jobs were not claimed by %s', self.name)
+                jobs = []
+
+            if not jobs:
+                if once:
+                    return
+                self._stopped.wait(self.poll_interval)
+                continue
+
+            for job in jobs:
+                run_job(job)
+                with self._lock:
+                    self.processed += 1
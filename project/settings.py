@@ -35,14 +35,18 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'users',
     'finances',
+    'jobs',
+    'utils',
 ]
 
 MIDDLEWARE = [
+    'utils.metrics.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'utils.replicas.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -67,6 +71,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'project.wsgi.application'
 
+# `wsgi` or `asgi`, shared with `gunicorn.conf.py`
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+# Connections are kept open between the requests of a worker thread and checked before reuse.
+# ASGI requests do not stick to threads, so connections are closed after every request there by default;
+# put pgbouncer in front of PostgreSQL instead and set `POSTGRES_PGBOUNCER` for its transaction pooling mode.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -75,9 +85,31 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('POSTGRES_HOST'),
         'PORT': os.getenv('POSTGRES_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('POSTGRES_CONN_MAX_AGE', 0 if SERVER_MODE == 'asgi' else 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': bool(os.getenv('POSTGRES_PGBOUNCER', False)),
     }
 }
 
+# Comma separated hosts of read replicas of the primary, with its port and credentials.
+# List, report and admin changelist reads go to them, see `utils.replicas`
+for number, host in enumerate(filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica_{number}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['utils.replicas.ReplicaRouter']
+# Seconds reads of a user stay on the primary after their write, should be longer than the replication lag
+REPLICA_PIN_SECONDS = float(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+# Shared Redis cache when `REDIS_URL` is set, otherwise a per-process local memory cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    } if os.getenv('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -104,19 +136,68 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploads kept for background jobs, like imported files
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.TelegramBotAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'utils.throttling.TokenBucketThrottle',
+    ],
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=365),
 }
+
+# Shared secret the Telegram bot signs user Telegram IDs with, the bot authentication is disabled without it
+TELEGRAM_BOT_SECRET = os.getenv('TELEGRAM_BOT_SECRET')
+# Token of the bot that sends notifications with `finances.notifiers.TelegramNotifier`
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+
+# Requests per endpoint of every anonymous client, user and bot user as `<requests>/<s|m|h|d>`,
+# see `utils.throttling`. An empty rate disables the limit
+THROTTLE_RATES = {
+    'anon': os.getenv('THROTTLE_ANON_RATE', '60/m'),
+    'user': os.getenv('THROTTLE_USER_RATE', '600/m'),
+    'bot': os.getenv('THROTTLE_BOT_RATE', '600/m'),
+}
+# Keep the rate limits in the shared cache instead of every process memory
+THROTTLE_SHARED = os.getenv('THROTTLE_SHARED', False)
+
+# Query count and latency of every request, see `utils.metrics`
+QUERY_METRICS_ENABLED = os.getenv('QUERY_METRICS_ENABLED', False)
+
+# Budgets are checked in the background after expenses are written, see `finances.alerts`
+BUDGET_ALERTS_ENABLED = os.getenv('BUDGET_ALERTS_ENABLED', False)
+# Seconds expenses of a user are collected for before the alerts are sent
+BUDGET_ALERTS_DELAY = float(os.getenv('BUDGET_ALERTS_DELAY', 5))
+# Share of the budget amount spent from which the user is warned
+BUDGET_ALERTS_WARNING_RATIO = os.getenv('BUDGET_ALERTS_WARNING_RATIO', '0.8')
+BUDGET_ALERTS_BATCH_SIZE = int(os.getenv('BUDGET_ALERTS_BATCH_SIZE', 100))
+# Seconds claimed alerts are left to their sender before other senders can claim them again
+BUDGET_ALERTS_CLAIM_TIMEOUT = int(os.getenv('BUDGET_ALERTS_CLAIM_TIMEOUT', 300))
+BUDGET_ALERTS_NOTIFIER = os.getenv('BUDGET_ALERTS_NOTIFIER', 'finances.notifiers.LogNotifier')
+
+# Hours the responses of finance writes are kept for their retries with the same `Idempotency-Key`,
+# see `finances.idempotency`
+IDEMPOTENCY_KEY_TTL = float(os.getenv('IDEMPOTENCY_KEY_TTL', 24))
+
+# Days the daily balance snapshots are kept for, only the month end ones are kept after, see `finances.snapshots`
+BALANCE_SNAPSHOTS_DAILY_RETENTION = int(os.getenv('BALANCE_SNAPSHOTS_DAILY_RETENTION', 90))
+
+# Background jobs, see `jobs.queue`. Seconds a failed job waits before its first retry, doubled after each retry
+JOBS_RETRY_DELAY = float(os.getenv('JOBS_RETRY_DELAY', 30))
+# Seconds after which a running job is considered abandoned by a crashed worker and queued again
+JOBS_TIMEOUT = float(os.getenv('JOBS_TIMEOUT', 60 * 60))
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', 1))
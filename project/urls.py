@@ -2,12 +2,17 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from utils.views import RequestMetricsAPIView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('token/', TokenObtainPairView.as_view(), name='token-obtain-pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('metrics/', RequestMetricsAPIView.as_view(), name='request-metrics'),
 ]
 
 urlpatterns += [
     path('users/', include('users.urls')),
+    path('finances/', include('finances.urls')),
+    path('jobs/', include('jobs.urls')),
 ]
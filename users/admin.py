@@ -2,9 +2,10 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
 from users.models import Profile, User
+from utils.replicas import ReplicaChangeListMixin
 
 
-class ExtendedUserAdmin(UserAdmin):
+class ExtendedUserAdmin(ReplicaChangeListMixin, UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         (
             None, {'fields': ('telegram_id', 'role')},
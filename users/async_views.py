@@ -0,0 +1,8 @@
+from users.serializers import UserSerializer
+from utils.async_views import async_registered_user_view
+
+
+@async_registered_user_view
+async def user_detail_async_view(request):
+    """Returns the account of the requesting user, loaded during the authentication."""
+    return UserSerializer(request.user).data
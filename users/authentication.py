@@ -0,0 +1,118 @@
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signing import BadSignature, Signer
+from django.http import HttpRequest
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from users.cache import aget_user_by_telegram_id, get_user_by_telegram_id
+
+TELEGRAM_BOT_SIGNER_SALT = 'users.telegram-bot'
+
+User = get_user_model()
+
+
+def get_telegram_bot_signer() -> Signer:
+    return Signer(key=settings.TELEGRAM_BOT_SECRET, salt=TELEGRAM_BOT_SIGNER_SALT)
+
+
+def sign_telegram_id(telegram_id: str) -> str:
+    """Returns the credential the bot sends on behalf of the user with the Telegram ID."""
+    return get_telegram_bot_signer().sign(telegram_id)
+
+
+class TelegramBotAuthentication(BaseAuthentication):
+    """
+    Authenticates bot requests made on behalf of users identified by the Telegram ID.
+
+    The bot sends `Authorization: Bot <credential>` header, where the credential is the Telegram ID
+    signed with `TELEGRAM_BOT_SECRET` (see `sign_telegram_id`). Users are resolved through the users
+    cache, so frequent bot requests do not query the database for the user and the profile.
+    The authentication is disabled while `TELEGRAM_BOT_SECRET` is not set.
+    """
+
+    keyword = 'Bot'
+
+    def get_telegram_id(self, request) -> Optional[str]:
+        """Returns the Telegram ID from the verified bot credential, `None` if the request has no credential."""
+        if not settings.TELEGRAM_BOT_SECRET:
+            return None
+
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed(_('Invalid bot credential header.'))
+
+        try:
+            return get_telegram_bot_signer().unsign(auth[1].decode())
+        except (BadSignature, UnicodeError):
+            raise AuthenticationFailed(_('Invalid bot credential.'))
+
+    def check_user(self, user: Optional[User]) -> User:
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(_('User not found or inactive.'))
+
+        return user
+
+    def authenticate(self, request):
+        telegram_id = self.get_telegram_id(request)
+        if telegram_id is None:
+            return None
+
+        return self.check_user(get_user_by_telegram_id(telegram_id)), None
+
+    async def aauthenticate(self, request):
+        telegram_id = self.get_telegram_id(request)
+        if telegram_id is None:
+            return None
+
+        return self.check_user(await aget_user_by_telegram_id(telegram_id)), None
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await sync_to_async(self.get_user)(validated_token), validated_token
+
+
+# The order of the authentication classes of DRF views
+ASYNC_AUTHENTICATION_CLASSES = (AsyncJWTAuthentication, TelegramBotAuthentication)
+
+
+def get_authenticate_header(request: HttpRequest) -> str:
+    """Returns `WWW-Authenticate` header of unauthenticated async requests, taken from the first class like by DRF."""
+    return ASYNC_AUTHENTICATION_CLASSES[0]().authenticate_header(request)
+
+
+async def aauthenticate(request: HttpRequest) -> Optional[tuple[User, BaseAuthentication]]:
+    """
+    Authenticates a plain Django request with a JWT or a bot credential, for async views.
+
+    DRF authentication classes are sync only, async views call this instead. Returns the user and
+    the authentication that succeeded, like `successful_authenticator` of a DRF request, or `None`
+    if the request has no credentials. Raises `AuthenticationFailed` for invalid ones.
+    """
+    for authentication in (authentication_class() for authentication_class in ASYNC_AUTHENTICATION_CLASSES):
+        result = await authentication.aauthenticate(request)
+        if result is not None:
+            return result[0], authentication
+
+    return None
@@ -0,0 +1,166 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+USER_LOCAL_CACHE_SIZE = 10000
+USER_LOCAL_CACHE_TIMEOUT = 30
+USER_SHARED_CACHE_TIMEOUT = 60 * 60
+
+User = get_user_model()
+
+
+class LocalLRUCache:
+    """
+    Thread-safe in-process LRU cache with expiring entries.
+
+    Entries are not shared between processes, so a process learns about changes made by other processes
+    only when its entries expire. Keep the timeout short for data that can change.
+    Values are kept pickled, so every `get` returns a new copy which a thread can change without affecting others.
+    """
+
+    def __init__(self, max_size: int, timeout: float):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+local_users_cache = LocalLRUCache(USER_LOCAL_CACHE_SIZE, USER_LOCAL_CACHE_TIMEOUT)
+
+
+def _get_telegram_id_key(telegram_id: str) -> str:
+    return f'users:telegram:{telegram_id}'
+
+
+def _get_version_key(telegram_id: str) -> str:
+    return f'users:telegram:{telegram_id}:version'
+
+
+def _get_user_version(telegram_id: str) -> Optional[str]:
+    key = _get_version_key(telegram_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, timeout=USER_SHARED_CACHE_TIMEOUT)
+        version = cache.get(key)
+
+    return version
+
+
+async def _aget_user_version(telegram_id: str) -> Optional[str]:
+    key = _get_version_key(telegram_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid4().hex, timeout=USER_SHARED_CACHE_TIMEOUT)
+        version = await cache.aget(key)
+
+    return version
+
+
+def _get_valid_user(entry: Optional[tuple], version: Optional[str]) -> Optional[User]:
+    """Returns the user of a `(version, user)` cache entry if it was cached at the current version."""
+    if entry is None or version is None or entry[0] != version:
+        return None
+
+    return entry[1]
+
+
+def get_user_by_telegram_id(telegram_id: str) -> Optional[User]:
+    """
+    Returns the user with the Telegram ID and the user profile, if it exists.
+
+    Users are looked up in the in-process LRU cache, then in the shared cache and only then in the database.
+    Cached users are tagged with the user version kept in the shared cache, which is changed on invalidation,
+    so every process drops its local copy right away at the cost of one shared cache read per lookup.
+    Profile balances are updated with set-based queries which do not invalidate the cache,
+    so they must be read from the database rather than from the returned profile.
+    """
+    key = _get_telegram_id_key(telegram_id)
+    version = _get_user_version(telegram_id)
+    user = _get_valid_user(local_users_cache.get(key), version)
+    if user is not None:
+        return user
+
+    user = _get_valid_user(cache.get(key), version)
+    if user is None:
+        user = User.objects.select_related('profile').filter(telegram_id=telegram_id).first()
+        if user is None:
+            return None
+        cache.set(key, (version, user), timeout=USER_SHARED_CACHE_TIMEOUT)
+
+    local_users_cache.set(key, (version, user))
+
+    return user
+
+
+async def aget_user_by_telegram_id(telegram_id: str) -> Optional[User]:
+    """Async version of `get_user_by_telegram_id`, querying the shared cache and the database without blocking."""
+    key = _get_telegram_id_key(telegram_id)
+    version = await _aget_user_version(telegram_id)
+    user = _get_valid_user(local_users_cache.get(key), version)
+    if user is not None:
+        return user
+
+    user = _get_valid_user(await cache.aget(key), version)
+    if user is None:
+        user = await User.objects.select_related('profile').filter(telegram_id=telegram_id).afirst()
+        if user is None:
+            return None
+        await cache.aset(key, (version, user), timeout=USER_SHARED_CACHE_TIMEOUT)
+
+    local_users_cache.set(key, (version, user))
+
+    return user
+
+
+def invalidate_user_cache(*telegram_ids: str) -> None:
+    """
+    Drops cached users with the Telegram IDs from the shared and the local caches.
+
+    The new user versions make the other processes drop their local copies too.
+    """
+    telegram_ids = [telegram_id for telegram_id in telegram_ids if telegram_id]
+    keys = [_get_telegram_id_key(telegram_id) for telegram_id in telegram_ids]
+    cache.delete_many(keys)
+    cache.set_many(
+        {_get_version_key(telegram_id): uuid4().hex for telegram_id in telegram_ids},
+        timeout=USER_SHARED_CACHE_TIMEOUT,
+    )
+    for key in keys:
+        local_users_cache.delete(key)
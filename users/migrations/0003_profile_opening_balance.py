@@ -0,0 +1,44 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:40
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def set_opening_balances(apps, schema_editor):
+    """Sets opening balances of the existing profiles, so their current balances are reconciled."""
+    Profile = apps.get_model('users', 'Profile')
+    Transaction = apps.get_model('finances', 'Transaction')
+
+    decimal_field = models.DecimalField(decimal_places=2, max_digits=15)
+    transferred = (
+        Transaction.objects
+        .filter(user_profile=OuterRef('pk'), type='TR')
+        .order_by()
+        .values('user_profile')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    Profile.objects.update(
+        opening_balance=F('balance') + Coalesce(Subquery(transferred), Value(Decimal('0.00')), output_field=decimal_field),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0008_fund_opening_balance'),
+        ('users', '0002_alter_user_email_alter_user_role_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='opening_balance',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=15, verbose_name='opening balance'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_opening_balances, migrations.RunPython.noop),
+    ]
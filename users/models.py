@@ -28,6 +28,12 @@ class User(AbstractUser):
         password (str): optional, if user is UNREGISTERED, otherwise is mandatory
     """
 
+    class Meta(AbstractUser.Meta):
+        indexes = (
+            # Keyset pagination of the users list
+            models.Index(fields=('date_joined', 'id'), name='user_date_joined_idx'),
+        )
+
     role = models.CharField(_('role'), max_length=3, choices=UserRolesChoices.choices)
     telegram_id = models.CharField(_('telegram ID'), max_length=32, unique=True, db_index=True)
     email = models.EmailField(
@@ -37,6 +43,17 @@ class User(AbstractUser):
     )
     password = models.CharField(_('password'), max_length=128, blank=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Saved Telegram ID, so the signal receivers can drop the user cached under it when it changes
+        instance._loaded_telegram_id = dict(zip(field_names, values)).get('telegram_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_telegram_id = self.telegram_id
+
     def clean(self):
         if self.role in (
                 UserRolesChoices.REGISTERED,
@@ -60,6 +77,7 @@ class Profile(models.Model):
     Fields:
         user (oo): 'User' OneToOne relation
         balance (dec): the amount of non-distributed money
+        opening_balance (dec): balance before the first transfer (the initial balance by default)
         currency (fk): `Currency` OneToMany relation
         date_created (dt): date and time profile was created
         date_updated (dt): date and time profile was updated
@@ -67,6 +85,7 @@ class Profile(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     balance = models.DecimalField(_('balance'), decimal_places=2, max_digits=15)
+    opening_balance = models.DecimalField(_('opening balance'), decimal_places=2, max_digits=15, blank=True)
     currency = models.ForeignKey(
         'finances.Currency',
         on_delete=models.PROTECT,
@@ -75,3 +94,8 @@ class Profile(models.Model):
     )
     date_created = models.DateTimeField(_('date created'), auto_now_add=True)
     date_updated = models.DateTimeField(_('date updated'), auto_now=True)
+
+    def save(self, *args, **kwargs):
+        if self.opening_balance is None:
+            self.opening_balance = self.balance
+        super().save(*args, **kwargs)
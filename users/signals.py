@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.cache import invalidate_user_cache
+from users.models import Profile
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache_on_change(sender, instance, **kwargs):
+    """Drops the cached user once the change is committed, also under the loaded Telegram ID if it was changed."""
+    telegram_ids = (instance.telegram_id, getattr(instance, '_loaded_telegram_id', None))
+    transaction.on_commit(lambda: invalidate_user_cache(*telegram_ids))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_user_cache_on_profile_change(sender, instance, **kwargs):
+    """Drops the cached user together with the profile once the change is committed."""
+    telegram_ids = tuple(User.objects.filter(id=instance.user_id).values_list('telegram_id', flat=True))
+    transaction.on_commit(lambda: invalidate_user_cache(*telegram_ids))
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+
+from users.authentication import sign_telegram_id
+from users.cache import get_user_by_telegram_id, invalidate_user_cache, local_users_cache
+from utils.tests.api import BaseAPITestCase
+
+DETAIL_COMMON_USER_ENDPOINT_NAME = 'users-detail-common'
+BUDGETS_STATUS_ENDPOINT_NAME = 'budgets-status'
+
+User = get_user_model()
+
+
+@override_settings(TELEGRAM_BOT_SECRET='test-telegram-bot-secret')
+class TelegramBotAuthenticationTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.setup_common_user()
+        self.profile = self.setup_profile(self.common_user)
+        self.client.force_authenticate(user=None)
+
+    def get_account(self, credential: str):
+        return self.client.get(reverse(DETAIL_COMMON_USER_ENDPOINT_NAME), HTTP_AUTHORIZATION=f'Bot {credential}')
+
+    def test_authenticate_by_telegram_id(self):
+        response = self.get_account(sign_telegram_id(self.common_user.telegram_id))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(response.data['id'], self.common_user.id, msg='user mismatch')
+
+    def test_invalid_credentials(self):
+        cases = (
+            ('Unsigned Telegram ID', self.common_user.telegram_id),
+            ('Forged signature', f'{self.common_user.telegram_id}:forged-signature'),
+            ('Unknown Telegram ID', sign_telegram_id('9999999999')),
+        )
+        for case_name, credential in cases:
+            with self.subTest(case_name=case_name):
+                response = self.get_account(credential)
+                self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED, msg='invalid status code')
+
+    def test_cached_user_is_not_queried(self):
+        credential = sign_telegram_id(self.common_user.telegram_id)
+        self.client.get(reverse(BUDGETS_STATUS_ENDPOINT_NAME), HTTP_AUTHORIZATION=f'Bot {credential}')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(BUDGETS_STATUS_ENDPOINT_NAME), HTTP_AUTHORIZATION=f'Bot {credential}')
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+        tables = (User._meta.db_table, self.profile._meta.db_table)
+        for query in context.captured_queries:
+            for table in tables:
+                self.assertNotIn(f'"{table}"', query['sql'], msg='cached user or profile is queried')
+
+    def test_cache_is_invalidated_on_user_save(self):
+        credential = sign_telegram_id(self.common_user.telegram_id)
+        self.assertEqual(self.get_account(credential).status_code, HTTP_200_OK, msg='invalid status code')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.common_user.is_active = False
+            self.common_user.save()
+        self.assertEqual(self.get_account(credential).status_code, HTTP_401_UNAUTHORIZED, msg='stale cached user')
+
+    def test_cache_is_invalidated_on_telegram_id_change(self):
+        old_credential = sign_telegram_id(self.common_user.telegram_id)
+        self.assertEqual(self.get_account(old_credential).status_code, HTTP_200_OK, msg='invalid status code')
+
+        user = User.objects.get(id=self.common_user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.telegram_id = '5555555555'
+            with self.assertNumQueries(1, msg='saved Telegram ID is queried'):
+                user.save()
+        self.assertEqual(self.get_account(old_credential).status_code, HTTP_401_UNAUTHORIZED, msg='stale cached user')
+        self.assertEqual(self.get_account(sign_telegram_id('5555555555')).status_code, HTTP_200_OK)
+
+    def test_cache_is_invalidated_in_other_processes(self):
+        credential = sign_telegram_id(self.common_user.telegram_id)
+        self.assertEqual(self.get_account(credential).status_code, HTTP_200_OK, msg='invalid status code')
+
+        # Another process changes the user, the local copy of this process is left in place
+        User.objects.filter(id=self.common_user.id).update(is_active=False)
+        with patch.object(local_users_cache, 'delete'):
+            invalidate_user_cache(self.common_user.telegram_id)
+
+        self.assertEqual(self.get_account(credential).status_code, HTTP_401_UNAUTHORIZED, msg='stale local user')
+
+    def test_cached_user_is_copied(self):
+        user = get_user_by_telegram_id(self.common_user.telegram_id)
+        user.profile.balance += 100
+
+        cached_user = get_user_by_telegram_id(self.common_user.telegram_id)
+        self.assertIsNot(cached_user, user, msg='threads share the cached user')
+        self.assertEqual(cached_user.profile.balance, self.profile.balance, msg='cached user is changed')
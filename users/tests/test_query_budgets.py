@@ -0,0 +1,52 @@
+from django.test import override_settings
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK
+
+from users.authentication import sign_telegram_id
+from users.views import UserCursorPagination
+from utils.tests.performance import QueryBudgetTestCase
+
+LIST_USERS_ENDPOINT_NAME = 'users-list'
+DETAIL_COMMON_USER_ENDPOINT_NAME = 'users-detail-common'
+
+
+class UserQueryBudgetTestCase(QueryBudgetTestCase):
+    def test_users_list_budget(self):
+        self.setup_admin_user()
+        response = self.assertEndpointBudget(
+            'users-list',
+            1,
+            lambda: self.client.get(reverse(LIST_USERS_ENDPOINT_NAME)),
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(
+            len(response.data['results']),
+            UserCursorPagination.page_size,
+            msg='users list is not paginated',
+        )
+        self.assertIsNotNone(response.data['next'], msg='next page link is missing')
+
+    def test_account_budget(self):
+        self.client.force_authenticate(user=self.budget_user)
+        response = self.assertEndpointBudget(
+            'users-account',
+            1,
+            lambda: self.client.get(reverse(DETAIL_COMMON_USER_ENDPOINT_NAME)),
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+
+    @override_settings(TELEGRAM_BOT_SECRET='test-telegram-bot-secret')
+    def test_bot_account_budget(self):
+        self.client.force_authenticate(user=None)
+        headers = {'HTTP_AUTHORIZATION': f'Bot {sign_telegram_id(self.budget_user.telegram_id)}'}
+
+        # The first request loads the user with the profile, the next ones take it from the cache
+        with self.assertMaxQueries(2):
+            self.client.get(reverse(DETAIL_COMMON_USER_ENDPOINT_NAME), **headers)
+        response = self.assertEndpointBudget(
+            'users-account-bot',
+            1,
+            lambda: self.client.get(reverse(DETAIL_COMMON_USER_ENDPOINT_NAME), **headers),
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(response.data['id'], self.budget_user.id, msg='user mismatch')
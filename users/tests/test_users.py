@@ -61,6 +61,7 @@ class AdminUserTestCase(BaseAPITestCase):
     )
 
     def setUp(self) -> None:
+        super().setUp()
         self.setup_admin_user()
 
     def test_create_user(self):
@@ -117,7 +118,7 @@ class AdminUserTestCase(BaseAPITestCase):
 
         response = self.client.get(reverse(LIST_USERS_ENDPOINT_NAME))
         self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
-        self.assertEqual(len(response.data), 2, msg='invalid amount of users in response')
+        self.assertEqual(len(response.data['results']), 2, msg='invalid amount of users in response')
 
     def test_retrieve_user(self):
         user = User.objects.create(
@@ -156,17 +157,18 @@ class AdminUserTestCase(BaseAPITestCase):
 
         response = self.client.get(reverse(LIST_USERS_ENDPOINT_NAME))
         self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
-        self.assertEqual(len(response.data), 2, msg='invalid amount of users in response')
+        self.assertEqual(len(response.data['results']), 2, msg='invalid amount of users in response')
 
         response = self.client.delete(reverse(DETAIL_ADMIN_USER_ENDPOINT_NAME, args=(user.id,)))
         self.assertEqual(response.status_code, HTTP_204_NO_CONTENT, msg='invalid status code')
 
         response = self.client.get(reverse(LIST_USERS_ENDPOINT_NAME))
-        self.assertEqual(len(response.data), 1, msg='user still in response')
+        self.assertEqual(len(response.data['results']), 1, msg='user still in response')
 
 
 class CommonUserTestCase(BaseAPITestCase):
     def setUp(self) -> None:
+        super().setUp()
         self.setup_common_user()
 
     def test_cannot_create_user(self):
@@ -218,6 +220,7 @@ class CommonUserTestCase(BaseAPITestCase):
 
 class UnregisteredUserTestCase(BaseAPITestCase):
     def setUp(self) -> None:
+        super().setUp()
         self.setup_unregistered_user()
 
     def test_cannot_create_user(self):
@@ -1,6 +1,7 @@
 from django.urls import path
 
-from users.views import UserListAPIView, UserDetailAdminAPIView, UserDetailAPIView, UserRegisterAPIView
+from users.async_views import user_detail_async_view
+from users.views import UserListAPIView, UserDetailAdminAPIView, UserDetailAPIView
 
 # Admin access
 urlpatterns = [
@@ -14,3 +15,7 @@ urlpatterns += [
     # path('sign-up/', UserRegisterAPIView.as_view(), name='users-register'),
 ]
 
+# Async read-only access for the bot and the dashboard, served without a thread per request under ASGI
+urlpatterns += [
+    path('async/account/', user_detail_async_view, name='users-detail-common-async'),
+]
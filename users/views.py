@@ -5,14 +5,21 @@ from rest_framework.permissions import AllowAny
 
 from users.permissions import AdminUserPermission, RegisteredUserPermission
 from users.serializers import UserAdminSerializer, UserSerializer
+from utils.pagination import KeysetCursorPagination
+from utils.replicas import ReplicaReadMixin
 
 User = get_user_model()
 
 
-class UserListAPIView(ListCreateAPIView):
+class UserCursorPagination(KeysetCursorPagination):
+    ordering_field = 'date_joined'
+
+
+class UserListAPIView(ReplicaReadMixin, ListCreateAPIView):
     queryset = User.objects.all()
     permission_classes = (AdminUserPermission,)
     serializer_class = UserAdminSerializer
+    pagination_class = UserCursorPagination
 
 
 class UserDetailAdminAPIView(RetrieveUpdateDestroyAPIView):
@@ -0,0 +1,69 @@
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, NotFound, PermissionDenied, Throttled
+from rest_framework.status import HTTP_405_METHOD_NOT_ALLOWED
+
+from users.authentication import aauthenticate, get_authenticate_header
+from utils.throttling import TokenBucketThrottle
+
+
+def async_registered_user_view(view):
+    """
+    Turns an async function into a read-only JSON endpoint for registered users.
+
+    DRF views are sync only, so the decorated view gets a plain Django request with the authenticated
+    `request.user` and returns JSON-serializable data. Errors are reported in the same form as DRF reports them,
+    and the requests are limited by the same token buckets as DRF views.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return JsonResponse(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status=HTTP_405_METHOD_NOT_ALLOWED,
+                headers={'Allow': 'GET'},
+            )
+
+        try:
+            result = await aauthenticate(request)
+        except AuthenticationFailed as error:
+            detail = error.detail if isinstance(error.detail, dict) else {'detail': error.detail}
+            return JsonResponse(
+                detail,
+                status=error.status_code,
+                headers={'WWW-Authenticate': get_authenticate_header(request)},
+            )
+        if result is None:
+            error = NotAuthenticated()
+            return JsonResponse(
+                {'detail': error.detail},
+                status=error.status_code,
+                headers={'WWW-Authenticate': get_authenticate_header(request)},
+            )
+
+        request.user, request.successful_authenticator = result
+        if not request.user.is_registered():
+            error = PermissionDenied()
+            return JsonResponse({'detail': error.detail}, status=error.status_code)
+
+        throttle = TokenBucketThrottle()
+        if not await throttle.aallow_request(request, view):
+            error = Throttled(throttle.wait())
+            return JsonResponse(
+                {'detail': error.detail},
+                status=error.status_code,
+                headers={'Retry-After': str(throttle.wait())},
+            )
+
+        try:
+            data = await view(request, *args, **kwargs)
+        except Http404:
+            error = NotFound()
+            return JsonResponse({'detail': error.detail}, status=error.status_code)
+
+        return JsonResponse(data, encoder=DjangoJSONEncoder)
+
+    return wrapper
@@ -0,0 +1,291 @@
+import itertools
+import json
+import statistics
+import threading
+import time
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Any, Callable, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+from django.db.models import Q
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import UserRolesChoices
+from utils.factories import DEFAULT_PASSWORD, create_funds, create_profiles, create_transactions, create_users
+
+BENCHMARK_USERNAME_PREFIX = 'benchmark_user_'
+BENCHMARK_ADMIN_USERNAME_PREFIX = 'benchmark_admin_'
+BENCHMARK_TELEGRAM_ID_OFFSET = 9_000_000_000
+TRANSACTIONS_WRITE_BATCH_SIZE = 10
+HTTP_TIMEOUT = 30
+# Status of the requests which got no response
+CONNECTION_ERROR_STATUS = 0
+
+User = get_user_model()
+
+
+class BenchmarkUser(NamedTuple):
+    username: str
+    authorization: str
+    fund_ids: list[int]
+
+
+class ScenarioRequest(NamedTuple):
+    """
+    Fields:
+        method (str): HTTP method
+        path (str): URL path of the endpoint
+        data (Any): JSON body (optional)
+        authorization (str): `Authorization` header (optional)
+    """
+    method: str
+    path: str
+    data: Any = None
+    authorization: Optional[str] = None
+
+
+class Scenario(NamedTuple):
+    """
+    Fields:
+        request (Callable): returns the request to send with `(benchmark user, request index)` arguments
+        admin (bool): the request is sent by the benchmark admin rather than by the common users
+    """
+    request: Callable[[BenchmarkUser, int], ScenarioRequest]
+    admin: bool = False
+
+
+class ScenarioResult(NamedTuple):
+    requests: int
+    errors: int
+    duration: float
+    latencies: list[float]
+
+    def to_dict(self) -> dict:
+        percentiles = statistics.quantiles(self.latencies, n=100, method='inclusive')
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'rps': round(self.requests / self.duration, 2),
+            'mean_ms': round(statistics.fmean(self.latencies), 3),
+            'p50_ms': round(percentiles[49], 3),
+            'p95_ms': round(percentiles[94], 3),
+            'p99_ms': round(percentiles[98], 3),
+        }
+
+
+class InProcessTransport:
+    """
+    Sends the requests through the Django test client in the benchmark process, with its own DB connection.
+
+    The middleware, views and the database are measured without the HTTP server and the network.
+    """
+
+    def __init__(self):
+        self.client = Client(raise_request_exception=False)
+
+    def send(self, request: ScenarioRequest) -> int:
+        headers = {'HTTP_AUTHORIZATION': request.authorization} if request.authorization else {}
+        body = json.dumps(request.data) if request.data is not None else ''
+        response = self.client.generic(request.method, request.path, body, 'application/json', **headers)
+
+        return response.status_code
+
+    def close(self) -> None:
+        connection.close()
+
+
+class RequestCycleTransport(InProcessTransport):
+    """Closes old DB connections around every request like the Django request cycle, which the test client skips."""
+
+    def send(self, request: ScenarioRequest) -> int:
+        close_old_connections()
+        try:
+            return super().send(request)
+        finally:
+            close_old_connections()
+
+
+class HTTPTransport:
+    """
+    Sends the requests to a running server at `base_url` over one keep-alive connection.
+
+    Failed connections are counted as errors and opened again by the next request.
+    """
+
+    def __init__(self, base_url: str):
+        url = urlsplit(base_url)
+        connection_class = HTTPSConnection if url.scheme == 'https' else HTTPConnection
+        self.connection = connection_class(url.netloc, timeout=HTTP_TIMEOUT)
+        self.prefix = url.path.rstrip('/')
+
+    def send(self, request: ScenarioRequest) -> int:
+        headers = {'Content-Type': 'application/json'}
+        if request.authorization:
+            headers['Authorization'] = request.authorization
+        body = json.dumps(request.data) if request.data is not None else None
+        try:
+            self.connection.request(request.method, self.prefix + request.path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, HTTPException):
+            self.connection.close()
+            return CONNECTION_ERROR_STATUS
+
+        return response.status
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def _obtain_token(user: BenchmarkUser, index: int) -> ScenarioRequest:
+    data = {'username': user.username, 'password': DEFAULT_PASSWORD}
+    return ScenarioRequest('POST', reverse('token-obtain-pair'), data)
+
+
+def _get_account(user: BenchmarkUser, index: int) -> ScenarioRequest:
+    return ScenarioRequest('GET', reverse('users-detail-common'), authorization=user.authorization)
+
+
+def _list_users(user: BenchmarkUser, index: int) -> ScenarioRequest:
+    return ScenarioRequest('GET', reverse('users-list'), authorization=user.authorization)
+
+
+def _list_transactions(user: BenchmarkUser, index: int) -> ScenarioRequest:
+    return ScenarioRequest('GET', reverse('transactions-list'), authorization=user.authorization)
+
+
+def _create_transactions(user: BenchmarkUser, index: int) -> ScenarioRequest:
+    data = [
+        {'type': 'EX', 'amount': '1.00', 'fund': user.fund_ids[(index + offset) % len(user.fund_ids)]}
+        for offset in range(TRANSACTIONS_WRITE_BATCH_SIZE)
+    ]
+    return ScenarioRequest('POST', reverse('transactions-bulk-create'), data, user.authorization)
+
+
+SCENARIOS = {
+    'token': Scenario(_obtain_token),
+    'account': Scenario(_get_account),
+    'users-list': Scenario(_list_users, admin=True),
+    'transactions-read': Scenario(_list_transactions),
+    'transactions-write': Scenario(_create_transactions),
+}
+
+
+def _get_benchmark_user(user: User, fund_ids: list[int]) -> BenchmarkUser:
+    return BenchmarkUser(user.username, f'Bearer {AccessToken.for_user(user)}', fund_ids)
+
+
+def seed_benchmark_data(
+        users_count: int,
+        funds_per_profile: int,
+        transactions_per_fund: int,
+) -> tuple[list[BenchmarkUser], BenchmarkUser]:
+    """Creates the benchmark users with their data and the benchmark admin, returns them with access tokens."""
+    users = create_users(
+        users_count,
+        prefix=BENCHMARK_USERNAME_PREFIX,
+        first_telegram_id=BENCHMARK_TELEGRAM_ID_OFFSET,
+    )
+    profiles = create_profiles(users)
+    funds = create_funds(profiles, funds_per_profile)
+    create_transactions(funds, transactions_per_fund)
+
+    fund_ids = {}
+    for fund in funds:
+        fund_ids.setdefault(fund.user_profile_id, []).append(fund.id)
+    benchmark_users = [
+        _get_benchmark_user(user, fund_ids[profile.id]) for user, profile in zip(users, profiles)
+    ]
+
+    admin, = create_users(
+        1,
+        prefix=BENCHMARK_ADMIN_USERNAME_PREFIX,
+        role=UserRolesChoices.ADMIN,
+        first_telegram_id=BENCHMARK_TELEGRAM_ID_OFFSET + users_count,
+    )
+
+    return benchmark_users, _get_benchmark_user(admin, [])
+
+
+def delete_benchmark_data() -> int:
+    """Deletes the benchmark users, cascading to their data. Returns the number of deleted users."""
+    _, by_model = User.objects.filter(
+        Q(username__startswith=BENCHMARK_USERNAME_PREFIX) | Q(username__startswith=BENCHMARK_ADMIN_USERNAME_PREFIX)
+    ).delete()
+
+    return by_model.get(User._meta.label, 0)
+
+
+def run_scenario(
+        scenario: Scenario,
+        users: list[BenchmarkUser],
+        requests: int,
+        concurrency: int,
+        transport_factory: Callable = InProcessTransport,
+) -> ScenarioResult:
+    """
+    Sends `requests` scenario requests from `concurrency` threads, each with its own transport.
+
+    Requests are spread over the users round-robin. Responses with status code 400 and above, including server
+    errors raised by the views, and requests without a response are counted as errors. In-process requests
+    are not rate limited, a server has to be started without the rate limits.
+    """
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        transport = transport_factory()
+        try:
+            while (index := next(counter)) < requests:
+                request = scenario.request(users[index % len(users)], index)
+                start = time.perf_counter()
+                status = transport.send(request)
+                latency = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(latency)
+                    if status == CONNECTION_ERROR_STATUS or status >= 400:
+                        errors.append(status)
+        finally:
+            transport.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    # The benchmark measures the server capacity, which the rate limits of its few users would hide
+    with override_settings(THROTTLE_RATES={}):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return ScenarioResult(requests, len(errors), time.perf_counter() - start, latencies)
+
+
+def benchmark_connection_reuse(users: list[BenchmarkUser], requests: int, conn_max_age: int) -> dict:
+    """
+    Sends account requests one by one with the `CONN_MAX_AGE` database setting and returns their statistics.
+
+    The statistics include the amount of opened DB connections, which is one per request without persistent ones.
+    """
+    opened = []
+
+    def on_connection_created(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+    default_conn_max_age = settings_dict['CONN_MAX_AGE']
+    settings_dict['CONN_MAX_AGE'] = conn_max_age
+    connection_created.connect(on_connection_created)
+    try:
+        result = run_scenario(SCENARIOS['account'], users, requests, 1, RequestCycleTransport)
+    finally:
+        connection_created.disconnect(on_connection_created)
+        settings_dict['CONN_MAX_AGE'] = default_conn_max_age
+
+    return {**result.to_dict(), 'conn_max_age': conn_max_age, 'connections': len(opened)}
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from finances.models import Fund, Transaction
+from users.models import Profile, UserRolesChoices
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = 'test-user-password-911'
+
+
+def create_users(
+        count: int,
+        prefix: str = 'user_',
+        role: str = UserRolesChoices.REGISTERED,
+        password: str = DEFAULT_PASSWORD,
+        first_telegram_id: int = 0,
+) -> list[User]:
+    """Creates users named `<prefix><index>` with one bulk insert and returns them ordered by ID."""
+    password_hash = make_password(password)
+    User.objects.bulk_create(
+        User(
+            telegram_id=f'{first_telegram_id + index:010d}',
+            username=f'{prefix}{index}',
+            email=f'{prefix}{index}@example.com',
+            password=password_hash,
+            role=role,
+        )
+        for index in range(count)
+    )
+
+    return list(User.objects.filter(username__startswith=prefix).order_by('id'))
+
+
+def create_profiles(users: list[User], balance: Decimal = Decimal('1000.00')) -> list[Profile]:
+    """Creates profiles of the users and returns them in the order of the users."""
+    Profile.objects.bulk_create(Profile(user=user, balance=balance, opening_balance=balance) for user in users)
+
+    return list(Profile.objects.filter(user__in=users).order_by('user_id'))
+
+
+def create_funds(profiles: list[Profile], funds_per_profile: int = 3) -> list[Fund]:
+    """Creates empty funds of every profile and returns them ordered by ID."""
+    Fund.objects.bulk_create(
+        Fund(
+            name=f'Fund {index}',
+            balance=Decimal('0.00'),
+            opening_balance=Decimal('0.00'),
+            goal=Decimal('0.00'),
+            budget=Decimal('0.00'),
+            user_profile=profile,
+        )
+        for profile in profiles
+        for index in range(funds_per_profile)
+    )
+
+    return list(Fund.objects.filter(user_profile__in=profiles).order_by('id'))
+
+
+def create_transactions(funds: list[Fund], transactions_per_fund: int, batch_size: int = 5000) -> int:
+    """
+    Creates alternating incomes and expenses of every fund, two hours apart backwards from now.
+
+    Balances are not updated, so the transactions are meant for read paths only.
+    Returns the number of created transactions.
+    """
+    types = Transaction.TransactionTypeChoices
+    now = timezone.now()
+    transactions = (
+        Transaction(
+            type=(types.INCOME, types.EXPENSE)[index % 2],
+            amount=Decimal(index % 100 + 1),
+            comment=f'Transaction {index}',
+            date_created=now - timedelta(hours=index * 2),
+            fund=fund,
+            user_profile_id=fund.user_profile_id,
+        )
+        for fund in funds
+        for index in range(transactions_per_fund)
+    )
+
+    return len(Transaction.objects.bulk_create(transactions, batch_size=batch_size))
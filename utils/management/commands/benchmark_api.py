@@ -0,0 +1,99 @@
+import json
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from utils.benchmark import (SCENARIOS, HTTPTransport, InProcessTransport, delete_benchmark_data, run_scenario,
+                             seed_benchmark_data)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds benchmark users and drives the REST API at the given concurrency levels, in-process or over HTTP '
+        'with --url, writing p50/p95/p99 latencies and requests per second of every scenario to a JSON file. '
+        'The server at --url must use the database and the SECRET_KEY of the command, with THROTTLE_*_RATE '
+        'set to empty values. Do not run it against a production database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark.json', help='path of the JSON report')
+        parser.add_argument('--url', help='base URL of a running server, requests are sent in-process without it')
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            choices=SCENARIOS.keys(),
+            default=list(SCENARIOS.keys()),
+            help='benchmarked scenarios',
+        )
+        parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4], help='concurrency levels')
+        parser.add_argument('--requests', type=int, default=200, help='requests per scenario and concurrency level')
+        parser.add_argument('--warmup', type=int, default=10, help='unmeasured requests sent before every scenario')
+        parser.add_argument('--users', type=int, default=100, help='amount of seeded users')
+        parser.add_argument('--funds-per-profile', type=int, default=3, help='amount of seeded funds of every user')
+        parser.add_argument(
+            '--transactions-per-fund',
+            type=int,
+            default=100,
+            help='amount of seeded transactions of every fund',
+        )
+        parser.add_argument('--keep-data', action='store_true', help='keep the seeded data after the benchmark')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('At least 2 requests are needed to compute percentiles.')
+
+        deleted = delete_benchmark_data()
+        if deleted:
+            self.stdout.write(f'Deleted {deleted} benchmark users left by a previous run.')
+
+        users, admin = seed_benchmark_data(
+            options['users'],
+            options['funds_per_profile'],
+            options['transactions_per_fund'],
+        )
+        self.stdout.write(f'Seeded {len(users)} benchmark users.')
+
+        transport_factory = partial(HTTPTransport, options['url']) if options['url'] else InProcessTransport
+
+        results = {}
+        try:
+            for name in options['scenarios']:
+                scenario = SCENARIOS[name]
+                scenario_users = [admin] if scenario.admin else users
+                if options['warmup']:
+                    run_scenario(scenario, scenario_users, options['warmup'], 1, transport_factory)
+
+                results[name] = {}
+                for concurrency in options['concurrency']:
+                    result = run_scenario(
+                        scenario,
+                        scenario_users,
+                        options['requests'],
+                        concurrency,
+                        transport_factory,
+                    ).to_dict()
+                    results[name][concurrency] = result
+                    self.stdout.write(
+                        f'{name} x{concurrency}: {result["rps"]} rps, p50 {result["p50_ms"]} ms, '
+                        f'p95 {result["p95_ms"]} ms, p99 {result["p99_ms"]} ms, {result["errors"]} errors'
+                    )
+        finally:
+            if not options['keep_data']:
+                delete_benchmark_data()
+
+        report = {
+            'date': timezone.now().isoformat(),
+            'target': options['url'] or 'in-process',
+            'database': connection.vendor,
+            'options': {
+                key: options[key]
+                for key in ('requests', 'warmup', 'users', 'funds_per_profile', 'transactions_per_fund')
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f'Benchmark report is written to {options["output"]}.'))
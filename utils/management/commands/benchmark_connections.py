@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from utils.benchmark import benchmark_connection_reuse, delete_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares account request latency with a new DB connection per request and with a persistent one, '
+        'writing the results to a JSON file. Do not run it against a production database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark-connections.json', help='path of the JSON report')
+        parser.add_argument('--requests', type=int, default=500, help='requests per connection mode')
+        parser.add_argument('--conn-max-age', type=int, default=60, help='lifetime of the persistent connection')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('At least 2 requests are needed to compute percentiles.')
+
+        delete_benchmark_data()
+        users, _ = seed_benchmark_data(users_count=1, funds_per_profile=1, transactions_per_fund=0)
+        try:
+            results = {
+                mode: benchmark_connection_reuse(users, options['requests'], conn_max_age)
+                for mode, conn_max_age in (('per-request', 0), ('persistent', options['conn_max_age']))
+            }
+        finally:
+            delete_benchmark_data()
+
+        for mode, result in results.items():
+            self.stdout.write(
+                f'{mode}: {result["connections"]} connections, {result["rps"]} rps, '
+                f'p50 {result["p50_ms"]} ms, p95 {result["p95_ms"]} ms, p99 {result["p99_ms"]} ms'
+            )
+
+        report = {
+            'date': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'results': results,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f'Benchmark report is written to {options["output"]}.'))
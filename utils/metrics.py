@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Counts observations per upper bucket bound, the last bucket holds the values above all the bounds."""
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict:
+        return {
+            'buckets': {
+                **{f'le_{bound}': count for bound, count in zip(self.bounds, self.counts)},
+                'inf': self.counts[-1],
+            },
+            'count': self.total,
+            'avg': round(self.sum / self.total, 3) if self.total else 0,
+            'max': round(self.max, 3),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process store of per-endpoint request histograms.
+
+    Every worker process keeps its own registry, so the reported numbers cover only the process
+    which served the metrics request.
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, query_count: int, db_time_ms: float, total_time_ms: float) -> None:
+        with self._lock:
+            histograms = self._endpoints.get(endpoint)
+            if histograms is None:
+                histograms = self._endpoints[endpoint] = {
+                    'query_count': Histogram(QUERY_COUNT_BUCKETS),
+                    'db_time_ms': Histogram(LATENCY_BUCKETS_MS),
+                    'total_time_ms': Histogram(LATENCY_BUCKETS_MS),
+                }
+            histograms['query_count'].observe(query_count)
+            histograms['db_time_ms'].observe(db_time_ms)
+            histograms['total_time_ms'].observe(total_time_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                endpoint: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                for endpoint, histograms in sorted(self._endpoints.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = MetricsRegistry()
+
+
+class QueryCollector:
+    """Database execute wrapper counting queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryMetricsMiddleware:
+    """
+    Records query count, database time and total latency of every request.
+
+    The numbers are returned in `X-Query-Count` and `Server-Timing` response headers, logged with
+    the `metrics` extra and aggregated per endpoint in `registry`. Enabled by `QUERY_METRICS_ENABLED`. The middleware
+    runs async under ASGI, so it does not push the async views to a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def wrap_connections(stack: ExitStack, collector: QueryCollector) -> None:
+        """Enters the collector to the execute wrappers of the database connections of the current thread."""
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(collector))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        collector = QueryCollector()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            self.wrap_connections(stack, collector)
+            response = self.get_response(request)
+
+        return self.record(request, response, collector, start)
+
+    async def __acall__(self, request):
+        collector = QueryCollector()
+        start = time.perf_counter()
+        # The ORM runs the queries of an async request in the request worker thread, so its connections are wrapped
+        stack = ExitStack()
+        await sync_to_async(self.wrap_connections)(stack, collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        return self.record(request, response, collector, start)
+
+    @staticmethod
+    def record(request, response, collector: QueryCollector, start: float):
+        """Adds the request numbers to the response headers, the log and the registry."""
+        total_time_ms = (time.perf_counter() - start) * 1000
+        db_time_ms = collector.duration * 1000
+
+        resolver_match = request.resolver_match
+        endpoint = f'{request.method} {resolver_match.view_name if resolver_match else "unresolved"}'
+        registry.observe(endpoint, collector.count, db_time_ms, total_time_ms)
+
+        response['X-Query-Count'] = str(collector.count)
+        response['Server-Timing'] = f'db;dur={db_time_ms:.2f}, total;dur={total_time_ms:.2f}'
+        logger.info(
+            'endpoint="%s" status=%s queries=%d db_ms=%.2f total_ms=%.2f',
+            endpoint,
+            response.status_code,
+            collector.count,
+            db_time_ms,
+            total_time_ms,
+            extra={
+                'metrics': {
+                    'endpoint': endpoint,
+                    'status': response.status_code,
+                    'query_count': collector.count,
+                    'db_time_ms': round(db_time_ms, 3),
+                    'total_time_ms': round(total_time_ms, 3),
+                },
+            },
+        )
+
+        return response
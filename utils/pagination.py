@@ -0,0 +1,102 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Paginates a queryset newest first by the `(ordering_field, id)` keyset.
+
+    The cursor holds the keyset of the last item of the page, so every page is fetched with an index
+    range scan instead of skipping all the rows of the previous pages like offset pagination does.
+    """
+
+    ordering_field = 'date_created'
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(f'-{self.ordering_field}', '-id')
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            # The first condition is the index range bound, the second one skips ties on the previous page
+            queryset = queryset.filter(
+                Q(**{f'{self.ordering_field}__lte': value}),
+                Q(**{f'{self.ordering_field}__lt': value}) | Q(id__lt=pk),
+            )
+
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+
+        return self.page
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request) -> Optional[tuple[datetime, int]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            raw_value, raw_pk = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            value = parse_datetime(raw_value)
+            pk = int(raw_pk)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return value, pk
+
+    def encode_cursor(self, item) -> str:
+        value = getattr(item, self.ordering_field).isoformat()
+        encoded = urlsafe_b64encode(f'{value}|{item.id}'.encode('ascii')).decode('ascii')
+
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+
+        return self.encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
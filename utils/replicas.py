@@ -0,0 +1,170 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY_PIN_CACHE_KEY = 'replicas:primary:{user_id}'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def pin_to_primary(user_id: int) -> None:
+    """Sends reads of the user to the primary for `REPLICA_PIN_SECONDS`, so the user sees their own writes."""
+    cache.set(PRIMARY_PIN_CACHE_KEY.format(user_id=user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+async def apin_to_primary(user_id: int) -> None:
+    await cache.aset(PRIMARY_PIN_CACHE_KEY.format(user_id=user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id: Optional[int]) -> bool:
+    return user_id is not None and cache.get(PRIMARY_PIN_CACHE_KEY.format(user_id=user_id), False)
+
+
+def replica_reads_enabled() -> bool:
+    return _replica_reads.get()
+
+
+@contextmanager
+def replica_reads():
+    """Routes the reads made in the block to the replicas, when there are any."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a random database of `DATABASE_REPLICAS` inside `replica_reads` blocks, everything else
+    goes to the primary.
+
+    Reads stay on the primary inside its transactions, where they have to see the uncommitted writes.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if not settings.DATABASE_REPLICAS or not _replica_reads.get():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return self.get_replica()
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db == DEFAULT_DB_ALIAS
+
+    def get_replica(self) -> str:
+        return random.choice(settings.DATABASE_REPLICAS)
+
+
+def should_read_from_replica(request) -> bool:
+    """Whether a request of an authenticated user may be served from a replica."""
+    return (
+        bool(settings.DATABASE_REPLICAS)
+        and request.method in SAFE_METHODS
+        and not is_pinned_to_primary(request.user.id)
+    )
+
+
+class ReplicaReadMixin:
+    """
+    Serves safe requests of a DRF view from the replicas, unless the user wrote recently.
+
+    The user is authenticated on the primary before the switch.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        # Reset even when the view raises an unhandled error, which skips `finalize_response`
+        token = _replica_reads.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if should_read_from_replica(request):
+            _replica_reads.set(True)
+
+
+class ReplicaChangeListMixin:
+    """Serves admin changelist pages from the replicas, unless the user wrote recently."""
+
+    def changelist_view(self, request, extra_context=None):
+        if not should_read_from_replica(request):
+            return super().changelist_view(request, extra_context)
+
+        with replica_reads():
+            response = super().changelist_view(request, extra_context)
+            # Results are fetched while the template is rendered
+            if hasattr(response, 'render'):
+                response.render()
+
+        return response
+
+
+class PrimaryPinMiddleware:
+    """
+    Pins authenticated users to the primary after every successful unsafe request.
+
+    The pins are kept in the cache, which must be shared between the server processes (`REDIS_URL`)
+    for the pins to hold across them. The middleware is not used without `DATABASE_REPLICAS`, and it
+    runs async under ASGI, so it does not push the async views to a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def get_written_user_id(request, response) -> Optional[int]:
+        """Returns ID of the authenticated user that made the successful unsafe request."""
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return None
+
+        # DRF sets the user it authenticated on the underlying request
+        user = getattr(request, 'user', None)
+        return user.id if user is not None and user.is_authenticated else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.get_response(request)
+        user_id = self.get_written_user_id(request, response)
+        if user_id is not None:
+            pin_to_primary(user_id)
+
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method in SAFE_METHODS:
+            return response
+
+        # A lazy session user is loaded from the database
+        user_id = await sync_to_async(self.get_written_user_id)(request, response)
+        if user_id is not None:
+            await apin_to_primary(user_id)
+
+        return response
@@ -1,7 +1,13 @@
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APITestCase
 
-from users.models import UserRolesChoices
+from finances.models import Fund
+from users.cache import local_users_cache
+from users.models import Profile, UserRolesChoices
+from utils.throttling import local_buckets
 
 User = get_user_model()
 
@@ -15,6 +21,12 @@ class BaseAPITestCase(APITestCase):
         cls.common_user = None
         cls.unregistered_user = None
 
+    def setUp(self) -> None:
+        # Object IDs are reused between tests, so cached data of a previous test must not leak
+        cache.clear()
+        local_users_cache.clear()
+        local_buckets.clear()
+
     def setup_admin_user(self, **kwargs) -> User:
         """Creates, saves and returns an admin user for the test."""
         data = {
@@ -71,3 +83,26 @@ class BaseAPITestCase(APITestCase):
         self.unregistered_user = user
 
         return user
+
+    def setup_profile(self, user: User, **kwargs) -> Profile:
+        """Creates, saves and returns a profile of the given user."""
+        data = {
+            'user': user,
+            'balance': Decimal('0.00'),
+        }
+        data.update(kwargs)
+
+        return Profile.objects.create(**data)
+
+    def setup_fund(self, profile: Profile, **kwargs) -> Fund:
+        """Creates, saves and returns a fund of the given profile."""
+        data = {
+            'name': 'Test fund',
+            'balance': Decimal('0.00'),
+            'goal': Decimal('0.00'),
+            'budget': Decimal('0.00'),
+            'user_profile': profile,
+        }
+        data.update(kwargs)
+
+        return Fund.objects.create(**data)
@@ -0,0 +1,123 @@
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from finances.models import BudgetPeriodChoices, FundBudget, UserBudget
+from finances.rollups import rebuild_daily_totals
+from utils.factories import create_funds, create_profiles, create_transactions, create_users
+from utils.tests.api import BaseAPITestCase
+
+# Latency baselines are written to this JSON file when the variable is set
+LATENCY_BASELINES_PATH_ENV = 'LATENCY_BASELINES_PATH'
+
+
+class QueryBudgetTestCase(BaseAPITestCase):
+    """
+    Base test case of endpoint query budgets.
+
+    The class data is seeded with realistic volumes, so an N+1 query or an unbounded scan shows up
+    as a query count over the endpoint budget. Median endpoint latencies are collected as baselines
+    and saved to the `LATENCY_BASELINES_PATH` file, they are not asserted to keep the tests stable.
+    """
+    USERS_COUNT = 2000
+    FUNDS_PER_PROFILE = 3
+    TRANSACTIONS_PER_FUND = 1700
+    LATENCY_RUNS = 5
+
+    latency_baselines = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.seed_users()
+        cls.seed_transactions()
+
+    @classmethod
+    def seed_users(cls) -> None:
+        """Creates users with profiles and funds, the first user is the registered user of the tests."""
+        users = create_users(cls.USERS_COUNT, prefix='budget_user_', password=cls.DEFAULT_PASSWORD)
+        profiles = create_profiles(users)
+        funds = create_funds(profiles, cls.FUNDS_PER_PROFILE)
+
+        cls.budget_user = users[0]
+        cls.budget_profile = profiles[0]
+        cls.budget_funds = [fund for fund in funds if fund.user_profile_id == cls.budget_profile.id]
+
+    @classmethod
+    def seed_transactions(cls) -> None:
+        """Creates transactions of the registered user spread over the last year, with budgets and rollups."""
+        create_transactions(cls.budget_funds, cls.TRANSACTIONS_PER_FUND)
+        rebuild_daily_totals(cls.budget_profile.id)
+
+        end_date = timezone.localdate() + timedelta(days=10)
+        UserBudget.objects.create(
+            period=BudgetPeriodChoices.MONTHLY,
+            amount=Decimal('1000.00'),
+            user_profile=cls.budget_profile,
+            end_date=end_date,
+        )
+        FundBudget.objects.bulk_create(
+            FundBudget(
+                period=BudgetPeriodChoices.WEEKLY,
+                amount=Decimal('100.00'),
+                fund=fund,
+                end_date=end_date,
+                anchor_day=end_date.day,
+            )
+            for fund in cls.budget_funds
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        path = os.getenv(LATENCY_BASELINES_PATH_ENV)
+        if path and cls.latency_baselines:
+            baselines = {}
+            if os.path.exists(path):
+                with open(path) as file:
+                    baselines = json.load(file)
+            baselines.update(cls.latency_baselines)
+            with open(path, 'w') as file:
+                json.dump(baselines, file, indent=2, sort_keys=True)
+
+    @contextmanager
+    def assertMaxQueries(self, max_queries: int):
+        """Fails if the block runs more than `max_queries` queries, listing the executed queries."""
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        executed = [query['sql'] for query in context.captured_queries]
+        self.assertLessEqual(
+            len(executed),
+            max_queries,
+            msg=f'query budget exceeded: {len(executed)} > {max_queries}.\nQueries:\n' + '\n'.join(executed),
+        )
+
+    def assertEndpointBudget(self, name: str, max_queries: int, request):
+        """
+        Runs the `request` callable within the query budget and records its median latency as `name` baseline.
+
+        Returns the response of the first run.
+        """
+        with self.assertMaxQueries(max_queries):
+            response = request()
+
+        durations = []
+        for _ in range(self.LATENCY_RUNS):
+            start = time.perf_counter()
+            request()
+            durations.append((time.perf_counter() - start) * 1000)
+        self.latency_baselines[f'{self.__class__.__name__}.{name}'] = {
+            'max_queries': max_queries,
+            'median_ms': round(statistics.median(durations), 3),
+        }
+
+        return response
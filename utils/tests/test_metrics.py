@@ -0,0 +1,83 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.test import override_settings
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_403_FORBIDDEN
+
+from users.authentication import sign_telegram_id
+from utils.metrics import Histogram, QueryMetricsMiddleware, registry
+from utils.tests.api import BaseAPITestCase
+
+REQUEST_METRICS_ENDPOINT_NAME = 'request-metrics'
+USER_DETAIL_COMMON_ENDPOINT_NAME = 'users-detail-common'
+USER_DETAIL_COMMON_ASYNC_ENDPOINT_NAME = 'users-detail-common-async'
+
+
+@override_settings(QUERY_METRICS_ENABLED=True)
+class QueryMetricsTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        registry.reset()
+
+    def test_metrics_headers_and_histograms(self):
+        self.setup_common_user()
+        response = self.client.get(reverse(USER_DETAIL_COMMON_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(response['X-Query-Count'], '1', msg='query count mismatch')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+, total;dur=[\d.]+$')
+
+        self.setup_admin_user()
+        response = self.client.get(reverse(REQUEST_METRICS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        endpoint_metrics = response.data[f'GET {USER_DETAIL_COMMON_ENDPOINT_NAME}']
+        self.assertEqual(endpoint_metrics['query_count']['count'], 1, msg='request is not recorded')
+        self.assertEqual(endpoint_metrics['query_count']['buckets']['le_1'], 1, msg='query count bucket mismatch')
+
+        response = self.client.delete(reverse(REQUEST_METRICS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_204_NO_CONTENT, msg='invalid status code')
+        self.assertNotIn(f'GET {USER_DETAIL_COMMON_ENDPOINT_NAME}', registry.snapshot(), msg='metrics are not reset')
+
+    @override_settings(TELEGRAM_BOT_SECRET='test-telegram-bot-secret')
+    async def test_async_requests(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(
+            iscoroutinefunction(QueryMetricsMiddleware(get_response)),
+            msg='async requests are adapted to a thread',
+        )
+
+        user = await sync_to_async(self.setup_common_user)()
+        response = await self.async_client.get(
+            reverse(USER_DETAIL_COMMON_ASYNC_ENDPOINT_NAME),
+            AUTHORIZATION=f'Bot {sign_telegram_id(user.telegram_id)}',
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertEqual(response['X-Query-Count'], '1', msg='query count mismatch')
+        self.assertEqual(
+            registry.snapshot()[f'GET {USER_DETAIL_COMMON_ASYNC_ENDPOINT_NAME}']['query_count']['count'],
+            1,
+            msg='request is not recorded',
+        )
+
+    def test_metrics_admin_access(self):
+        self.setup_common_user()
+        response = self.client.get(reverse(REQUEST_METRICS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN, msg='invalid status code')
+
+    @override_settings(QUERY_METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        self.setup_common_user()
+        response = self.client.get(reverse(USER_DETAIL_COMMON_ENDPOINT_NAME))
+        self.assertNotIn('X-Query-Count', response, msg='disabled middleware added headers')
+        self.assertEqual(registry.snapshot(), {}, msg='disabled middleware recorded metrics')
+
+    def test_histogram_buckets(self):
+        histogram = Histogram((1, 10))
+        for value in (0, 1, 5, 10, 11):
+            histogram.observe(value)
+
+        self.assertEqual(
+            histogram.to_dict(),
+            {'buckets': {'le_1': 2, 'le_10': 2, 'inf': 1}, 'count': 5, 'avg': 5.4, 'max': 11},
+            msg='histogram mismatch',
+        )
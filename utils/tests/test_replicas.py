@@ -0,0 +1,127 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED
+
+from finances.models import Transaction
+from utils.replicas import (PrimaryPinMiddleware, ReplicaRouter, is_pinned_to_primary, replica_reads,
+                            replica_reads_enabled)
+from utils.tests.api import BaseAPITestCase
+
+LIST_TRANSACTIONS_ENDPOINT_NAME = 'transactions-list'
+BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME = 'transactions-bulk-create'
+LIST_USERS_ENDPOINT_NAME = 'users-list'
+TRANSACTION_CHANGELIST_URL = '/admin/finances/transaction/'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.router = ReplicaRouter()
+
+    def test_reads_are_routed_in_replica_blocks(self):
+        self.assertIsNone(self.router.db_for_read(Transaction), msg='reads outside the block go to a replica')
+        with replica_reads():
+            self.assertIn(self.router.db_for_read(Transaction), ('replica_1', 'replica_2'))
+            self.assertEqual(self.router.db_for_write(Transaction), 'default')
+        self.assertFalse(replica_reads_enabled(), msg='replica reads leak out of the block')
+
+    def test_reads_stay_in_primary_transaction(self):
+        with replica_reads(), patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(Transaction), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(Transaction))
+
+    def test_migrations_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'finances'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'finances'))
+
+
+@override_settings(DATABASE_REPLICAS=['default'], REPLICA_PIN_SECONDS=60)
+class ReplicaReadsTestCase(BaseAPITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.reads = []
+        patcher = patch.object(ReplicaRouter, 'db_for_read', autospec=True, side_effect=self.record_read)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record_read(self, router, model, **hints):
+        self.reads.append(replica_reads_enabled())
+
+    def test_user_reads_own_writes_from_primary(self):
+        self.setup_common_user()
+        fund = self.setup_fund(self.setup_profile(self.common_user), name='Food')
+
+        self.reads.clear()
+        response = self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertTrue(self.reads and all(self.reads), msg='transactions are not read from a replica')
+
+        data = [{'type': Transaction.TransactionTypeChoices.EXPENSE, 'amount': Decimal('5.00'), 'fund': fund.id}]
+        response = self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=data, format='json')
+        self.assertEqual(response.status_code, HTTP_201_CREATED, msg='invalid status code')
+        self.assertTrue(is_pinned_to_primary(self.common_user.id), msg='user is not pinned after the write')
+
+        self.reads.clear()
+        response = self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME))
+        self.assertEqual(len(response.data['results']), 1, msg='own write is not visible')
+        self.assertFalse(any(self.reads), msg='pinned user reads from a replica')
+
+    def test_replica_reads_end_with_unhandled_errors(self):
+        self.setup_common_user()
+        self.setup_profile(self.common_user)
+
+        with patch('finances.views.TransactionListAPIView.list', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.get(reverse(LIST_TRANSACTIONS_ENDPOINT_NAME))
+        self.assertFalse(replica_reads_enabled(), msg='replica reads leak out of the failed request')
+
+    def test_pins_are_per_user(self):
+        self.setup_common_user()
+        self.client.post(reverse(BULK_CREATE_TRANSACTIONS_ENDPOINT_NAME), data=[], format='json')
+        self.assertFalse(is_pinned_to_primary(self.common_user.id), msg='user is pinned after a failed write')
+
+        self.setup_admin_user()
+        self.assertFalse(is_pinned_to_primary(self.admin_user.id))
+        self.reads.clear()
+        response = self.client.get(reverse(LIST_USERS_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertTrue(any(self.reads), msg='users are not read from a replica')
+
+    def test_admin_changelist(self):
+        self.setup_admin_user(is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin_user)
+
+        self.reads.clear()
+        response = self.client.get(TRANSACTION_CHANGELIST_URL)
+        self.assertEqual(response.status_code, HTTP_200_OK, msg='invalid status code')
+        self.assertTrue(any(self.reads), msg='changelist is not read from a replica')
+
+    async def test_async_middleware_pins_user(self):
+        async def get_response(request):
+            return HttpResponse(status=HTTP_201_CREATED)
+
+        middleware = PrimaryPinMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware), msg='async requests are adapted to a thread')
+
+        request = RequestFactory().post('/')
+        request.user = await sync_to_async(self.setup_common_user)()
+        await middleware(request)
+
+        self.assertTrue(await sync_to_async(is_pinned_to_primary)(request.user.id), msg='user is not pinned')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_middleware_is_not_used_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PrimaryPinMiddleware(lambda request: HttpResponse())
@@ -0,0 +1,126 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED, HTTP_429_TOO_MANY_REQUESTS
+
+from users.authentication import sign_telegram_id
+from utils.tests.api import BaseAPITestCase
+from utils.throttling import LocalBucketStore, parse_rate
+
+USER_DETAIL_COMMON_ENDPOINT_NAME = 'users-detail-common'
+BUDGETS_STATUS_ENDPOINT_NAME = 'budgets-status'
+TOKEN_OBTAIN_ENDPOINT_NAME = 'token-obtain-pair'
+FUNDS_BALANCES_ASYNC_ENDPOINT_NAME = 'funds-balances-async'
+
+
+class LocalBucketStoreTestCase(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('120/m'), (120, 2.0))
+        self.assertEqual(parse_rate('10/hour'), (10, 10 / 3600))
+
+    @patch('utils.throttling.time.monotonic')
+    def test_bucket_refills(self, monotonic):
+        store = LocalBucketStore(max_size=10)
+        monotonic.return_value = 100.0
+
+        self.assertEqual([store.consume('client', 2, 0.5) for _ in range(2)], [0, 0], msg='burst is limited')
+        self.assertEqual(store.consume('client', 2, 0.5), 2.0, msg='wait mismatch')
+        self.assertEqual(store.consume('other_client', 2, 0.5), 0, msg='buckets are shared between clients')
+
+        monotonic.return_value = 101.0
+        self.assertEqual(store.consume('client', 2, 0.5), 1.0, msg='throttled requests take tokens')
+        monotonic.return_value = 102.0
+        self.assertEqual(store.consume('client', 2, 0.5), 0, msg='bucket is not refilled')
+
+    def test_least_recently_used_buckets_are_dropped(self):
+        store = LocalBucketStore(max_size=2)
+        for key in ('first', 'second', 'first', 'third'):
+            store.consume(key, 1, 1)
+
+        self.assertEqual(list(store._buckets), ['first', 'third'])
+
+
+@override_settings(
+    THROTTLE_RATES={'anon': '2/m', 'user': '3/m', 'bot': '2/m'},
+    TELEGRAM_BOT_SECRET='test-telegram-bot-secret',
+)
+class TokenBucketThrottleTestCase(BaseAPITestCase):
+    def get_statuses(self, endpoint_name: str, count: int, **headers) -> list[int]:
+        return [self.client.get(reverse(endpoint_name), **headers).status_code for _ in range(count)]
+
+    def test_users_are_limited_per_endpoint(self):
+        self.setup_profile(self.setup_common_user())
+
+        self.assertEqual(self.get_statuses(USER_DETAIL_COMMON_ENDPOINT_NAME, 3), [HTTP_200_OK] * 3)
+        response = self.client.get(reverse(USER_DETAIL_COMMON_ENDPOINT_NAME))
+        self.assertEqual(response.status_code, HTTP_429_TOO_MANY_REQUESTS, msg='invalid status code')
+        self.assertEqual(response['Retry-After'], '20', msg='retry delay mismatch')
+
+        self.assertEqual(
+            self.get_statuses(BUDGETS_STATUS_ENDPOINT_NAME, 1),
+            [HTTP_200_OK],
+            msg='endpoints share the limit',
+        )
+
+        self.setup_common_user(telegram_id='5555555555', username='other_user', email='other@example.com')
+        self.assertEqual(
+            self.get_statuses(USER_DETAIL_COMMON_ENDPOINT_NAME, 1),
+            [HTTP_200_OK],
+            msg='users share the limit',
+        )
+
+    def test_bot_users_are_limited_by_telegram_id(self):
+        user = self.setup_common_user()
+        self.client.force_authenticate(user=None)
+        headers = {'HTTP_AUTHORIZATION': f'Bot {sign_telegram_id(user.telegram_id)}'}
+
+        self.assertEqual(
+            self.get_statuses(USER_DETAIL_COMMON_ENDPOINT_NAME, 3, **headers),
+            [HTTP_200_OK, HTTP_200_OK, HTTP_429_TOO_MANY_REQUESTS],
+        )
+
+    def test_anonymous_clients_are_limited_by_address(self):
+        data = {'username': 'unknown', 'password': 'wrong-password'}
+        statuses = [self.client.post(reverse(TOKEN_OBTAIN_ENDPOINT_NAME), data).status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [HTTP_401_UNAUTHORIZED, HTTP_401_UNAUTHORIZED, HTTP_429_TOO_MANY_REQUESTS])
+
+    @override_settings(THROTTLE_SHARED=True)
+    def test_shared_buckets(self):
+        self.setup_common_user()
+
+        self.assertEqual(self.get_statuses(USER_DETAIL_COMMON_ENDPOINT_NAME, 4)[-1], HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_async_views_are_limited(self):
+        user = self.setup_common_user()
+        self.setup_profile(user)
+        self.client.force_authenticate(user=None)
+        headers = {'HTTP_AUTHORIZATION': f'Bot {sign_telegram_id(user.telegram_id)}'}
+
+        self.assertEqual(
+            self.get_statuses(FUNDS_BALANCES_ASYNC_ENDPOINT_NAME, 3, **headers),
+            [HTTP_200_OK, HTTP_200_OK, HTTP_429_TOO_MANY_REQUESTS],
+        )
+        response = self.client.get(reverse(FUNDS_BALANCES_ASYNC_ENDPOINT_NAME), **headers)
+        self.assertEqual(response['Retry-After'], '30', msg='retry delay mismatch')
+        self.assertEqual(
+            self.get_statuses(USER_DETAIL_COMMON_ENDPOINT_NAME, 1, **headers),
+            [HTTP_200_OK],
+            msg='async and sync endpoints share the limit',
+        )
+
+    @override_settings(THROTTLE_SHARED=True)
+    async def test_async_views_use_shared_buckets(self):
+        user = await sync_to_async(self.setup_common_user)()
+        await sync_to_async(self.setup_profile)(user)
+        authorization = f'Bot {sign_telegram_id(user.telegram_id)}'
+
+        statuses = [
+            (await self.async_client.get(reverse(FUNDS_BALANCES_ASYNC_ENDPOINT_NAME), AUTHORIZATION=authorization))
+            .status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [HTTP_200_OK, HTTP_200_OK, HTTP_429_TOO_MANY_REQUESTS])
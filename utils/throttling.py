@@ -0,0 +1,152 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from inspect import isfunction
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from users.authentication import TelegramBotAuthentication
+
+LOCAL_BUCKETS_SIZE = 100000
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Returns the bucket capacity and the tokens added per second of a `<requests>/<s|m|h|d>` rate."""
+    requests, period = rate.split('/')
+    requests = int(requests)
+
+    return requests, requests / RATE_PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """
+    Thread-safe in-process token buckets, the least recently used ones are dropped above `max_size`.
+
+    Every process counts the requests it served, so a client balanced over N processes gets up to N times the rate.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        """Takes a token from the bucket, returns 0 if it had one and seconds until it has one otherwise."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens - 1 if tokens >= 1 else tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+
+        return wait
+
+    async def aconsume(self, key: str, capacity: int, refill_rate: float) -> float:
+        # The buckets are in memory, taking a token does not block the event loop
+        return self.consume(key, capacity, refill_rate)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Token buckets in the shared cache, so the rate holds across the server processes.
+
+    A bucket is read and written without a lock, so concurrent requests of one client may take the same token.
+    Every request costs a cache round trip.
+    """
+
+    @staticmethod
+    def take_token(bucket: tuple[float, float], capacity: int, refill_rate: float, now: float) -> tuple:
+        """Returns the bucket after taking a token from it, the seconds to wait and the cache timeout of the bucket."""
+        tokens, updated = bucket
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+        tokens = tokens - 1 if tokens >= 1 else tokens
+        # The bucket is dropped once it would be full again
+        return (tokens, now), wait, math.ceil((capacity - tokens) / refill_rate) + 1
+
+    def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = time.time()
+        key = f'throttling:{key}'
+        bucket, wait, timeout = self.take_token(cache.get(key, (capacity, now)), capacity, refill_rate, now)
+        cache.set(key, bucket, timeout=timeout)
+
+        return wait
+
+    async def aconsume(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = time.time()
+        key = f'throttling:{key}'
+        bucket, wait, timeout = self.take_token(await cache.aget(key, (capacity, now)), capacity, refill_rate, now)
+        await cache.aset(key, bucket, timeout=timeout)
+
+        return wait
+
+
+local_buckets = LocalBucketStore(LOCAL_BUCKETS_SIZE)
+cache_buckets = CacheBucketStore()
+
+
+def get_bucket_store():
+    return cache_buckets if settings.THROTTLE_SHARED else local_buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Limits requests of every client to every endpoint with a token bucket.
+
+    Clients are bot users by Telegram ID, other users by ID and anonymous clients by IP address, with the rates
+    of `THROTTLE_RATES`. A view can override them with its `throttle_rates`. The bucket holds the requests
+    of a whole period, so a client can burst up to the rate and is then limited to its average.
+    Throttled responses have the `Retry-After` header.
+    """
+
+    def get_client(self, request) -> tuple[str, str]:
+        user = request.user
+        if user is not None and user.is_authenticated:
+            if isinstance(request.successful_authenticator, TelegramBotAuthentication):
+                return 'bot', user.telegram_id
+            return 'user', str(user.pk)
+
+        return 'anon', self.get_ident(request)
+
+    def get_bucket(self, request, view) -> Optional[tuple[str, int, float]]:
+        """Returns the key, capacity and refill rate of the client bucket, `None` if the client is not limited."""
+        kind, ident = self.get_client(request)
+        rate = getattr(view, 'throttle_rates', {}).get(kind) or settings.THROTTLE_RATES.get(kind)
+        if not rate:
+            return None
+
+        # Async views are functions rather than view instances
+        view_class = view if isfunction(view) else type(view)
+
+        return f'{kind}:{ident}:{view_class.__module__}.{view_class.__qualname__}', *parse_rate(rate)
+
+    def allow_request(self, request, view) -> bool:
+        bucket = self.get_bucket(request, view)
+        self.wait_seconds = get_bucket_store().consume(*bucket) if bucket else 0
+
+        return not self.wait_seconds
+
+    async def aallow_request(self, request, view) -> bool:
+        """Same as `allow_request`, for async views, the shared buckets are read without blocking."""
+        bucket = self.get_bucket(request, view)
+        self.wait_seconds = await get_bucket_store().aconsume(*bucket) if bucket else 0
+
+        return not self.wait_seconds
+
+    def wait(self) -> int:
+        # `Retry-After` takes whole seconds, rounding down would let the client retry too early
+        return math.ceil(self.wait_seconds)
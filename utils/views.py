@@ -0,0 +1,19 @@
+from rest_framework.response import Response
+from rest_framework.status import HTTP_204_NO_CONTENT
+from rest_framework.views import APIView
+
+from users.permissions import AdminUserPermission
+from utils.metrics import registry
+
+
+class RequestMetricsAPIView(APIView):
+    """Returns per-endpoint histograms collected by `QueryMetricsMiddleware` in the current process."""
+    permission_classes = (AdminUserPermission,)
+
+    def get(self, request):
+        return Response(registry.snapshot())
+
+    def delete(self, request):
+        registry.reset()
+
+        return Response(status=HTTP_204_NO_CONTENT)